@@ -9,7 +9,8 @@ from pathlib import Path
 
 import streamlit as st
 
-from designbridge import get_compiled_graph
+from designbridge import get_compiled_graph, get_graph_diagram_png, get_graph_mermaid, warmup, warmup_status
+from designbridge.config import Config
 
 st.set_page_config(page_title="DesignBridge Test Interface", page_icon="🏠", layout="wide")
 
@@ -66,6 +67,26 @@ else:
         if manual_path and manual_path.strip():
             initial_image = manual_path.strip()
 
+num_candidates = st.sidebar.number_input(
+    "候選圖數量 (num_candidates)",
+    min_value=1,
+    max_value=4,
+    value=1,
+    help="一次批次生成多張候選圖，每張使用不同的 seed",
+)
+
+preview = st.sidebar.checkbox(
+    "先生成低解析度預覽",
+    value=Config.ENABLE_RENDER_PREVIEW,
+    help="兩階段生成：先以低解析度、少步數快速預覽，再生成完整品質圖（僅本機 SDXL）",
+)
+
+stream_mode = st.sidebar.checkbox(
+    "逐節點串流顯示",
+    value=True,
+    help="以 LangGraph stream 執行，每個節點完成就立即顯示結果與耗時（生成圖仍在計算時即可先看需求與深度/分割圖）",
+)
+
 run_button = st.sidebar.button("▶️ 執行工作流", type="primary", width="stretch")
 
 # Example prompts
@@ -89,13 +110,12 @@ if "example_prompt" in st.session_state:
 # Main content: 工作流圖示（Mermaid，可收合）
 with st.expander("Workflow Diagram", expanded=True):
     try:
-        _compiled = get_compiled_graph()
-        _drawable = _compiled.get_graph()
-        _mermaid_str = _drawable.draw_mermaid()
-        try:
-            _png_bytes = _drawable.draw_mermaid_png()
+        # Compiled graph and diagram are cached per process, so reruns don't rebuild/re-render them
+        _mermaid_str = get_graph_mermaid()
+        _png_bytes = get_graph_diagram_png()
+        if _png_bytes:
             st.image(_png_bytes, use_container_width=True)
-        except Exception:
+        else:
             st.caption("圖示以 Mermaid 原始碼顯示於下方。")
         with st.expander("🔍 檢視 / 複製 Mermaid 原始碼"):
             st.code(_mermaid_str, language="mermaid")
@@ -105,163 +125,261 @@ with st.expander("Workflow Diagram", expanded=True):
 
 st.markdown("---")
 
+
+def _show_summary(result: dict, elapsed: float) -> None:
+    """Key results in columns: task id, iteration, routing decision, elapsed seconds."""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Task ID", result.get("task_id", "N/A")[:8] + "...")
+    with col2:
+        st.metric("Iteration", result.get("iteration", 0))
+    with col3:
+        routing = result.get("routing_decision", "N/A")
+        emoji_map = {
+            "layout": "📐",
+            "style": "🎨",
+            "design_adjuster": "🔧",
+            "layout_and_style": "📐🎨",
+        }
+        st.metric("路由決策", f"{emoji_map.get(routing, '❓')} {routing}")
+    with col4:
+        st.metric("執行秒數", f"{elapsed:.2f} s")
+
+
+def _show_generated_image(result: dict) -> None:
+    """Generated image (Renderer output)."""
+    st.subheader("🖼️ 生成圖")
+    gen_path = result.get("generated_image")
+    render_result = result.get("render_result") or {}
+    if gen_path and Path(gen_path).exists():
+        st.image(gen_path, caption="Renderer 輸出", use_container_width=True)
+        st.caption(f"路徑：`{gen_path}`")
+        gp = render_result.get("generation_params") or {}
+        backend = gp.get("backend", "")
+        if backend == "sdxl":
+            st.success("使用本機 SDXL 生成（免費）")
+        elif backend == "imagen":
+            st.caption("使用 Imagen API 生成")
+        elif gp.get("fallback") == "placeholder":
+            st.info("⚠️ Imagen 未可用且 SDXL 未成功，已顯示佔位圖。可安裝 diffusers 啟用本機 SDXL。")
+        if gp.get("cache") == "hit":
+            st.caption("♻️ 相同需求已生成過，直接使用渲染快取")
+        candidates = [p for p in render_result.get("candidate_paths") or [] if Path(p).exists()]
+        if len(candidates) > 1:
+            st.markdown("**所有候選圖**")
+            seeds = gp.get("seeds") or []
+            cols = st.columns(len(candidates))
+            for i, (col, path) in enumerate(zip(cols, candidates)):
+                caption = f"候選 {i + 1}" + (f"（seed {seeds[i]}）" if i < len(seeds) else "")
+                col.image(path, caption=caption, use_container_width=True)
+    elif gen_path:
+        st.warning(f"生成圖路徑不存在：`{gen_path}`")
+    else:
+        st.info("無生成圖")
+
+
+def _show_preview(preview: dict) -> None:
+    """Low-res preview (Preview Renderer output)."""
+    if not preview:
+        st.caption("未啟用預覽")
+        return
+    st.subheader("👀 快速預覽")
+    if Path(preview.get("image_path", "")).exists():
+        st.image(preview["image_path"], caption="低解析度預覽（完整生成圖計算中）", use_container_width=True)
+    st.caption(
+        f"{preview.get('size')}px · {preview.get('steps')} steps · seed {preview.get('seed')} · "
+        f"{preview.get('latency_s', 0):.2f} 秒"
+    )
+
+
+def _show_requirement(req: dict, source: dict | None = None) -> None:
+    """Structured requirement (Requirement JSON)."""
+    st.subheader("📋 結構化需求（Requirement JSON）")
+    if source and source.get("source") == "cache":
+        st.caption(
+            f"♻️ 來自快取（{source.get('match')} · 相似度 {source.get('similarity')} · {source.get('age_s')} 秒前）"
+        )
+    if req:
+        # Display key fields
+        col1, col2, col3, col4 = st.columns(4)
+        meta = req.get("meta", {})
+        style_prefs = req.get("style_preferences", {})
+        edit_scope_info = req.get("edit_scope", {})
+
+        with col1:
+            st.write("**房間類型**")
+            st.code(meta.get("room_type", "N/A"))
+        with col2:
+            st.write("**設計目標**")
+            st.code(meta.get("design_goal", "N/A"))
+        with col3:
+            st.write("**主要風格**")
+            st.code(style_prefs.get("primary_style", "N/A"))
+        with col4:
+            st.write("**Edit Scope**")
+            st.code(f"{edit_scope_info.get('scope_value', 0):.1f}")
+
+        # Priority weights
+        weights = req.get("priority_weights", {})
+        if weights:
+            st.write("**評估權重**")
+            wcol1, wcol2, wcol3 = st.columns(3)
+            with wcol1:
+                st.metric("佈局合理性", f"{weights.get('layout_rationality', 0):.1f}")
+            with wcol2:
+                st.metric("風格一致性", f"{weights.get('style_consistency', 0):.1f}")
+            with wcol3:
+                st.metric("創新程度", f"{weights.get('novelty', 0):.1f}")
+
+        # Constraints summary
+        constraints = req.get("layout_constraints", {})
+        must_add = constraints.get("must_add", [])
+        must_keep = constraints.get("must_keep", [])
+        if must_add or must_keep:
+            st.write("**佈局約束**")
+            if must_keep:
+                st.write(f"必留家具：{', '.join(must_keep)}")
+            if must_add:
+                st.write(f"必加家具：{', '.join(must_add)}")
+
+        with st.expander("🔍 完整 Requirement JSON"):
+            st.json(req)
+    else:
+        st.info("無結構化需求")
+
+
+def _show_vision(vision: dict) -> None:
+    """Vision features (depth / segmentation previews)."""
+    st.subheader("👁️ 視覺前處理結果")
+    if vision:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Segmentation**")
+            seg_path = vision.get("segmentation", "N/A")
+            st.code(seg_path)
+            try:
+                if isinstance(seg_path, str) and Path(seg_path).exists():
+                    st.image(seg_path, caption="Segmentation label map", width="stretch")
+            except Exception:
+                pass
+        with col2:
+            st.write("**Depth Map**")
+            depth_path = vision.get("depth", "N/A")
+            st.code(depth_path)
+            try:
+                if isinstance(depth_path, str) and Path(depth_path).exists():
+                    st.image(depth_path, caption="Depth map", width="stretch")
+            except Exception:
+                pass
+        with st.expander("🔍 完整 vision_features JSON"):
+            st.json(vision)
+    else:
+        st.info("無視覺特徵")
+
+
+def _show_intermediate(intermediate: dict) -> None:
+    """Intermediate outputs."""
+    st.subheader("🔄 中間輸出")
+    if intermediate:
+        st.json(intermediate)
+    else:
+        st.info("無中間輸出")
+
+
+def _show_node_output(node_name: str, state: dict) -> None:
+    """Render the part of the state a node just produced (streaming mode)."""
+    if node_name == "requirement_analyzer":
+        _show_requirement(state.get("structured_requirement", {}), state.get("requirement_source"))
+    elif node_name == "visual_preprocessing":
+        _show_vision(state.get("vision_features", {}))
+    elif node_name == "task_initializer":
+        st.write(f"**Task ID**：`{state.get('task_id', 'N/A')}`")
+    elif node_name == "design_director":
+        st.write(f"**路由決策**：`{state.get('routing_decision', 'N/A')}`")
+    elif node_name == "preview_renderer":
+        _show_preview(state.get("render_preview") or {})
+    elif node_name == "renderer":
+        _show_generated_image(state)
+    else:
+        _show_intermediate(state.get("intermediate_outputs", {}))
+
+
+def _run_streaming(compiled, initial_state: dict) -> tuple[dict, float]:
+    """Drive the graph with compiled.stream and render each node's output as soon as it finishes.
+    Per-node seconds come from the node's own node_timings record (compile with instrument=True):
+    parallel nodes overlap, so the gap between updates is not a node's run time.
+    """
+    state: dict = dict(initial_state)
+    node_timings: list[dict] = []
+    progress = st.empty()
+    t0 = time.perf_counter()
+    progress.info("🔄 執行 DesignBridge 工作流...")
+    for update in compiled.stream(initial_state, stream_mode="updates"):
+        for node_name, node_update in update.items():
+            now = time.perf_counter()
+            node_update = dict(node_update or {})
+            records = node_update.pop("node_timings", None) or []
+            state.update(node_update)
+            state["node_timings"] = state.get("node_timings", []) + records  # list reducer, as in the graph
+            seconds = records[-1].get("wall_s") if records else None
+            node_timings.append({"node": node_name, "seconds": seconds, "finished_at_s": round(now - t0, 3)})
+            progress.info(f"🔄 `{node_name}` 完成，已耗時 {now - t0:.2f} 秒，繼續執行...")
+            with st.container(border=True):
+                took = f"{seconds:.2f} 秒，" if seconds is not None else ""
+                st.caption(f"✅ 節點 `{node_name}` 完成（{took}累計 {now - t0:.2f} 秒）")
+                _show_node_output(node_name, state)
+    elapsed = time.perf_counter() - t0
+    progress.empty()
+    with st.expander("⏱️ 各節點耗時"):
+        st.table(node_timings)
+    return state, elapsed
+
+
 if run_button:
     if not text_prompt.strip():
         st.error("❌ 請輸入文字需求")
     else:
-        with st.spinner("🔄 執行 DesignBridge 工作流..."):
-            # Build initial state
-            user_input = {
-                "text_prompt": text_prompt,
-                "edit_scope": edit_scope,
-            }
-            if initial_image:
-                user_input["initial_image"] = initial_image
-
-            initial_state = {"user_input": user_input}
-
-            # Invoke graph
-            try:
-                compiled = get_compiled_graph()
-                t0 = time.perf_counter()
-                result = compiled.invoke(initial_state)
-                elapsed = time.perf_counter() - t0
+        # Build initial state
+        user_input = {
+            "text_prompt": text_prompt,
+            "edit_scope": edit_scope,
+            "num_candidates": int(num_candidates),
+            "preview": preview,
+        }
+        if initial_image:
+            user_input["initial_image"] = initial_image
+
+        initial_state = {"user_input": user_input}
 
-                # Display results
+        try:
+            compiled = get_compiled_graph()
+            if stream_mode:
+                # Streaming: each node's output shows up as soon as it finishes (instrumented for per-node times)
+                result, elapsed = _run_streaming(get_compiled_graph(instrument=True), initial_state)
                 st.success(f"工作流執行完成！（耗時 {elapsed:.2f} 秒）")
+                _show_summary(result, elapsed)
+            else:
+                # Invoke graph
+                with st.spinner("🔄 執行 DesignBridge 工作流..."):
+                    t0 = time.perf_counter()
+                    result = compiled.invoke(initial_state)
+                    elapsed = time.perf_counter() - t0
 
-                # Key results in columns
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Task ID", result.get("task_id", "N/A")[:8] + "...")
-                with col2:
-                    st.metric("Iteration", result.get("iteration", 0))
-                with col3:
-                    routing = result.get("routing_decision", "N/A")
-                    emoji_map = {
-                        "layout": "📐",
-                        "style": "🎨",
-                        "design_adjuster": "🔧",
-                        "layout_and_style": "📐🎨",
-                    }
-                    st.metric("路由決策", f"{emoji_map.get(routing, '❓')} {routing}")
-                with col4:
-                    st.metric("執行秒數", f"{elapsed:.2f} s")
-
-                # Generated image (Renderer output)
-                st.subheader("🖼️ 生成圖")
-                gen_path = result.get("generated_image")
-                render_result = result.get("render_result") or {}
-                if gen_path and Path(gen_path).exists():
-                    st.image(gen_path, caption="Renderer 輸出", use_container_width=True)
-                    st.caption(f"路徑：`{gen_path}`")
-                    gp = render_result.get("generation_params") or {}
-                    backend = gp.get("backend", "")
-                    if backend == "sdxl":
-                        st.success("使用本機 SDXL 生成（免費）")
-                    elif backend == "imagen":
-                        st.caption("使用 Imagen API 生成")
-                    elif gp.get("fallback") == "placeholder":
-                        st.info("⚠️ Imagen 未可用且 SDXL 未成功，已顯示佔位圖。可安裝 diffusers 啟用本機 SDXL。")
-                elif gen_path:
-                    st.warning(f"生成圖路徑不存在：`{gen_path}`")
-                else:
-                    st.info("無生成圖")
-
-                # Structured requirement
-                st.subheader("📋 結構化需求（Requirement JSON）")
-                req = result.get("structured_requirement", {})
-                if req:
-                    # Display key fields
-                    col1, col2, col3, col4 = st.columns(4)
-                    meta = req.get("meta", {})
-                    style_prefs = req.get("style_preferences", {})
-                    edit_scope_info = req.get("edit_scope", {})
-
-                    with col1:
-                        st.write("**房間類型**")
-                        st.code(meta.get("room_type", "N/A"))
-                    with col2:
-                        st.write("**設計目標**")
-                        st.code(meta.get("design_goal", "N/A"))
-                    with col3:
-                        st.write("**主要風格**")
-                        st.code(style_prefs.get("primary_style", "N/A"))
-                    with col4:
-                        st.write("**Edit Scope**")
-                        st.code(f"{edit_scope_info.get('scope_value', 0):.1f}")
-
-                    # Priority weights
-                    weights = req.get("priority_weights", {})
-                    if weights:
-                        st.write("**評估權重**")
-                        wcol1, wcol2, wcol3 = st.columns(3)
-                        with wcol1:
-                            st.metric("佈局合理性", f"{weights.get('layout_rationality', 0):.1f}")
-                        with wcol2:
-                            st.metric("風格一致性", f"{weights.get('style_consistency', 0):.1f}")
-                        with wcol3:
-                            st.metric("創新程度", f"{weights.get('novelty', 0):.1f}")
-
-                    # Constraints summary
-                    constraints = req.get("layout_constraints", {})
-                    must_add = constraints.get("must_add", [])
-                    must_keep = constraints.get("must_keep", [])
-                    if must_add or must_keep:
-                        st.write("**佈局約束**")
-                        if must_keep:
-                            st.write(f"必留家具：{', '.join(must_keep)}")
-                        if must_add:
-                            st.write(f"必加家具：{', '.join(must_add)}")
-
-                    with st.expander("🔍 完整 Requirement JSON"):
-                        st.json(req)
-                else:
-                    st.info("無結構化需求")
-
-                # Vision features
-                st.subheader("👁️ 視覺前處理結果")
-                vision = result.get("vision_features", {})
-                if vision:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**Segmentation**")
-                        seg_path = vision.get("segmentation", "N/A")
-                        st.code(seg_path)
-                        try:
-                            if isinstance(seg_path, str) and Path(seg_path).exists():
-                                st.image(seg_path, caption="Segmentation label map", width="stretch")
-                        except Exception:
-                            pass
-                    with col2:
-                        st.write("**Depth Map**")
-                        depth_path = vision.get("depth", "N/A")
-                        st.code(depth_path)
-                        try:
-                            if isinstance(depth_path, str) and Path(depth_path).exists():
-                                st.image(depth_path, caption="Depth map", width="stretch")
-                        except Exception:
-                            pass
-                    with st.expander("🔍 完整 vision_features JSON"):
-                        st.json(vision)
-                else:
-                    st.info("無視覺特徵")
-
-                # Intermediate outputs
-                st.subheader("🔄 中間輸出")
-                intermediate = result.get("intermediate_outputs", {})
-                if intermediate:
-                    st.json(intermediate)
-                else:
-                    st.info("無中間輸出")
-
-                # Full state
-                with st.expander("🗂️ 完整 State JSON"):
-                    st.json(result)
-
-            except Exception as e:
-                st.error(f"❌ 執行失敗：{e}")
-                st.exception(e)
+                # Display results
+                st.success(f"工作流執行完成！（耗時 {elapsed:.2f} 秒）")
+                _show_summary(result, elapsed)
+                _show_generated_image(result)
+                _show_requirement(result.get("structured_requirement", {}), result.get("requirement_source"))
+                _show_vision(result.get("vision_features", {}))
+                _show_intermediate(result.get("intermediate_outputs", {}))
+
+            # Full state
+            with st.expander("🗂️ 完整 State JSON"):
+                st.json(result)
+
+        except Exception as e:
+            st.error(f"❌ 執行失敗：{e}")
+            st.exception(e)
 else:
     # Show placeholder
     st.info("👈 請在左側輸入參數，然後點擊「執行工作流」按鈕")
@@ -273,9 +391,10 @@ else:
 ```
 START
   ↓
-Requirement Analyzer (需求解析)
+Task Initializer (建立 task_id)
   ↓
-Visual Preprocessing (視覺前處理, stub)
+  ├─→ Requirement Analyzer (需求解析)      ┐ 平行執行
+  └─→ Visual Preprocessing (視覺前處理)    ┘
   ↓
 Design Director (任務路由)
   ↓
@@ -284,6 +403,10 @@ Design Director (任務路由)
   ├─→ Design Adjuster (微調代理人)
   └─→ Layout + Style Agent (協作)
   ↓
+Preview Renderer (低解析度快速預覽，可選)
+  ↓
+Renderer (完整生成圖)
+  ↓
 END
 ```
     """
@@ -300,6 +423,14 @@ END
     """
     )
 
+# Model warm-up: started once per process, readiness shown on every rerun
+if Config.WARMUP_ON_START:
+    warmup()
+    with st.sidebar.expander("🔥 模型預熱狀態"):
+        for model_name, info in warmup_status().items():
+            load_s = f"（{info['load_s']:.1f} 秒）" if "load_s" in info else ""
+            st.caption(f"`{model_name}`：{info.get('state')}{load_s}")
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("**DesignBridge v0.1**")
@@ -0,0 +1 @@
+"""Offline benchmarks for DesignBridge (run with ``python -m benchmarks.<name>``)."""
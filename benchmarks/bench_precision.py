@@ -0,0 +1,173 @@
+# benchmarks/bench_precision.py
+"""CPU latency, weight memory and output drift of the precision modes (fp32 / bf16 / int8).
+
+Vision: Depth Anything V2 and UPerNet on synthetic room photos; drift is the mean absolute
+difference of the normalized depth map (0-255) and the segmentation label agreement vs fp32.
+Diffusion (with --sdxl-model): one fixed-seed SDXL render per mode; drift is PSNR vs fp32.
+
+    python -m benchmarks.bench_precision --tiny                       # offline, random weights
+    python -m benchmarks.bench_precision --sdxl-model stabilityai/stable-diffusion-xl-base-1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from benchmarks.stubs import leased
+from designbridge import nodes, vision
+from designbridge.config import Config
+from designbridge.models import get_model_registry
+from designbridge.precision import PRECISIONS, apply_precision, weight_bytes
+
+
+def make_images(count: int, size: tuple[int, int]) -> list[Any]:
+    """Synthetic room-like photos (vertical gradient + noise), deterministic."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    width, height = size
+    gradient = np.linspace(40, 220, height, dtype=np.float32)[:, None, None]
+    return [
+        Image.fromarray((gradient + rng.normal(0, 12, (height, width, 3))).clip(0, 255).astype(np.uint8))
+        for _ in range(count)
+    ]
+
+
+def _load_vision(kind: str, model_name: str, tiny: bool) -> Any:
+    if tiny:
+        from benchmarks.stubs import tiny_depth_model, tiny_upernet
+
+        return tiny_depth_model() if kind == "depth" else tiny_upernet()
+    with mock.patch.object(Config, "VISION_PRECISION", "fp32"):
+        return vision._build_depth_model(model_name) if kind == "depth" else vision._build_upernet(model_name)
+
+
+def _run_vision(kind: str, pair: Any, images: list[Any], repeats: int) -> tuple[list[Any], float]:
+    """Run the repo's inference path with the given (processor, model); returns outputs and s/image."""
+    lease = "_lease_depth_model" if kind == "depth" else "_lease_upernet"
+    with mock.patch.object(vision, lease, lambda name: leased(pair)):
+        infer = (
+            (lambda: vision._infer_depth(images, model_name="bench"))
+            if kind == "depth"
+            else (lambda: [seg for seg, _ in vision._infer_segmentation(images, model_name="bench")[0]])
+        )
+        infer()  # warm-up
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            outputs = infer()
+        return outputs, (time.perf_counter() - t0) / (repeats * len(images))
+
+
+def bench_vision(*, tiny: bool, images: list[Any], repeats: int, modes: list[str]) -> dict[str, Any]:
+    import numpy as np
+
+    results: dict[str, Any] = {}
+    for kind, model_name in (("depth", Config.DEPTH_MODEL), ("segmentation", Config.SEGMENTATION_MODEL)):
+        processor, base = _load_vision(kind, model_name, tiny)
+        reference, _ = _run_vision(kind, (processor, base), images, 1)
+        results[kind] = {}
+        for mode in modes:
+            try:
+                model = apply_precision(copy.deepcopy(base), mode)
+                outputs, s_per_image = _run_vision(kind, (processor, model), images, repeats)
+            except Exception as e:
+                results[kind][mode] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            stats: dict[str, Any] = {"s_per_image": round(s_per_image, 4), "weights_mb": round(weight_bytes(model) / 2**20, 2)}
+            if kind == "depth":
+                stats["depth_mad"] = round(
+                    float(np.mean([np.abs(a.astype(np.int16) - b.astype(np.int16)).mean() for a, b in zip(outputs, reference)])), 3
+                )
+            else:
+                stats["label_agreement"] = round(float(np.mean([(a == b).mean() for a, b in zip(outputs, reference)])), 4)
+            results[kind][mode] = stats
+    return results
+
+
+def bench_diffusion(*, model: str, size: int, steps: int, modes: list[str]) -> dict[str, Any]:
+    import numpy as np
+
+    results: dict[str, Any] = {}
+    reference = None
+    for mode in modes:
+        try:
+            with mock.patch.object(Config, "SDXL_MODEL", model), mock.patch.object(Config, "DIFFUSION_PRECISION", mode):
+                get_model_registry().evict(nodes.SDXL_ENTRY)
+                with contextlib.ExitStack() as stack:
+                    # Hold the lease throughout: the renders and the weight count see the same pipeline
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        pipe = stack.enter_context(nodes._lease_sdxl_pipeline())
+                    job = {"prompt": "Interior design visualization: a living room, Scandinavian style.", "seeds": [0]}
+                    nodes._run_sdxl_batch(("sdxl", 1, size), [job])  # warm-up
+                    t0 = time.perf_counter()
+                    image = nodes._run_sdxl_batch(("sdxl", steps, size), [job])[0][0]
+                    elapsed = time.perf_counter() - t0
+                    weights = sum(weight_bytes(getattr(pipe, n)) for n in ("unet", "text_encoder", "text_encoder_2"))
+        except Exception as e:
+            results[mode] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        arr = np.asarray(image.convert("RGB")).astype(np.float64)
+        if reference is None:
+            reference = arr
+        mse = float(np.mean((arr - reference) ** 2))
+        results[mode] = {
+            "s_per_image": round(elapsed, 3),
+            "weights_mb": round(weights / 2**20, 1),
+            "psnr_vs_fp32_db": round(float("inf") if mse == 0 else 10 * np.log10(255.0**2 / mse), 2),
+        }
+    get_model_registry().evict(nodes.SDXL_ENTRY)
+    return results
+
+
+def print_report(summary: dict[str, Any]) -> None:
+    for kind, modes in summary["vision"].items():
+        drift_key = "depth_mad" if kind == "depth" else "label_agreement"
+        print(f"{kind:<14}{'mode':<6}{'s/image':>10}{'weights MB':>12}{drift_key:>17}")
+        for mode, stats in modes.items():
+            if "error" in stats:
+                print(f"{'':<14}{mode:<6}  unavailable ({stats['error']})")
+            else:
+                print(f"{'':<14}{mode:<6}{stats['s_per_image']:>10.4f}{stats['weights_mb']:>12.2f}{stats[drift_key]:>17}")
+    if summary.get("diffusion"):
+        print(f"{'sdxl':<14}{'mode':<6}{'s/image':>10}{'weights MB':>12}{'PSNR vs fp32':>17}")
+        for mode, stats in summary["diffusion"].items():
+            if "error" in stats:
+                print(f"{'':<14}{mode:<6}  unavailable ({stats['error']})")
+            else:
+                print(f"{'':<14}{mode:<6}{stats['s_per_image']:>10.3f}{stats['weights_mb']:>12.1f}{stats['psnr_vs_fp32_db']:>17}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiny", action="store_true", help="Use tiny random-weight vision models (offline)")
+    parser.add_argument("--images", type=int, default=2, help="Synthetic images per batch")
+    parser.add_argument("--image-size", type=int, nargs=2, default=[640, 480], help="Width height")
+    parser.add_argument("--repeats", type=int, default=3, help="Measured repeats per mode")
+    parser.add_argument("--modes", nargs="+", default=list(PRECISIONS), choices=PRECISIONS)
+    parser.add_argument("--sdxl-model", type=str, default=None, help="Also benchmark SDXL (name or local path)")
+    parser.add_argument("--size", type=int, default=512, help="SDXL render resolution (px)")
+    parser.add_argument("--steps", type=int, default=8, help="SDXL steps per render")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    modes = ["fp32"] + [m for m in args.modes if m != "fp32"]  # fp32 first: it is the drift reference
+    images = make_images(args.images, tuple(args.image_size))
+    summary: dict[str, Any] = {"vision": bench_vision(tiny=args.tiny, images=images, repeats=args.repeats, modes=modes)}
+    if args.sdxl_model:
+        summary["diffusion"] = bench_diffusion(model=args.sdxl_model, size=args.size, steps=args.steps, modes=modes)
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_requirements_batch.py
+"""Throughput of batch requirement analysis vs one requirement_analyzer call per prompt.
+
+Gemini is stubbed with a fixed simulated latency (benchmarks/stubs.py), so the numbers show
+how far bounded concurrency hides the round-trip time. Results are checked to be identical
+to the sequential ones, in input order.
+
+    python -m benchmarks.bench_requirements_batch --prompts 120 --gemini-latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.bench_workflow import PROMPTS
+from benchmarks.stubs import install_stubs
+from designbridge import analyze_requirements_batch, nodes
+
+
+def make_inputs(count: int) -> list[dict[str, Any]]:
+    """Distinct prompts (so nothing is deduplicated) cycling through the workflow corpus."""
+    return [
+        {"text_prompt": f"{text}（#{i}）", "edit_scope": edit_scope}
+        for i, (text, edit_scope) in enumerate(PROMPTS[i % len(PROMPTS)] for i in range(count))
+    ]
+
+
+def run_benchmark(*, prompts: int, gemini_latency_s: float, concurrencies: list[int]) -> dict[str, Any]:
+    inputs = make_inputs(prompts)
+    with tempfile.TemporaryDirectory(prefix="designbridge-bench-") as tmp, install_stubs(
+        artifacts_dir=tmp, gemini_latency_s=gemini_latency_s
+    ), contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        sequential = [nodes.requirement_analyzer({"user_input": u})["structured_requirement"] for u in inputs]
+        sequential_s = time.perf_counter() - t0
+        results: dict[str, Any] = {
+            "sequential": {"elapsed_s": round(sequential_s, 3), "requirements_per_second": round(prompts / sequential_s, 2)}
+        }
+        for concurrency in concurrencies:
+            batch = analyze_requirements_batch(inputs, concurrency=concurrency)
+            results[f"batch x{concurrency}"] = {
+                **batch.report(),
+                "speedup": round(sequential_s / batch.elapsed_s, 2),
+                "matches_sequential": batch.requirements == sequential,
+            }
+    return {"prompts": prompts, "gemini_latency_s": gemini_latency_s, "results": results}
+
+
+def print_report(summary: dict[str, Any]) -> None:
+    print(f"prompts: {summary['prompts']}  simulated Gemini latency: {summary['gemini_latency_s']}s")
+    print(f"{'mode':<14}{'elapsed (s)':>12}{'req/s':>9}{'speedup':>9}  identical")
+    for mode, stats in summary["results"].items():
+        print(f"{mode:<14}{stats['elapsed_s']:>12.3f}{stats['requirements_per_second']:>9.2f}"
+              f"{stats.get('speedup', 1.0):>9.2f}  {stats.get('matches_sequential', '-')}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=120, help="Prompts to analyze")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="Simulated Gemini latency (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16], help="Batch concurrency levels")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    summary = run_benchmark(prompts=args.prompts, gemini_latency_s=args.gemini_latency, concurrencies=args.concurrency)
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_rule_matcher.py
+"""Microbenchmark of the compiled keyword matcher (designbridge/keywords.py).
+
+Compares KeywordMatcher against per-term `in` scans (the analyzer's previous approach)
+on the workflow corpus prompts, with the shipped tables and with tables padded to
+hundreds of extra room / style terms, and checks both give the same fields.
+
+    python -m benchmarks.bench_rule_matcher --repeats 2000 --extra-terms 100 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.bench_workflow import PROMPTS
+from designbridge.keywords import HINT_TABLES, ROOM_TABLE, STYLE_TABLE, KeywordMatcher, KeywordTable
+from designbridge.nodes import _rule_based_requirement_analyzer
+
+
+def linear_match(tables: tuple[KeywordTable, ...], text: str) -> dict[str, str]:
+    """Reference: check every value's synonyms with `in`, in priority order."""
+    found: dict[str, str] = {}
+    for table in tables:
+        for value, synonyms in table.entries:
+            if any(term in text for term in synonyms):
+                found[table.field] = value
+                break
+    return found
+
+
+def padded_tables(extra_terms: int) -> tuple[KeywordTable, ...]:
+    """Shipped tables plus extra_terms synthetic synonyms split between rooms and styles (never matched)."""
+    rooms = tuple(
+        (value, synonyms + tuple(f"room{i}_{value}" for i in range(extra_terms // 2 // len(ROOM_TABLE.entries))))
+        for value, synonyms in ROOM_TABLE.entries
+    )
+    styles = STYLE_TABLE.entries + tuple((f"style{i}", (f"style{i}", f"風格{i}號")) for i in range(extra_terms // 4))
+    return (KeywordTable("room", rooms), KeywordTable("style", styles), *HINT_TABLES)
+
+
+def _time(fn: Any, texts: list[str], repeats: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - t0) / (repeats * len(texts)) * 1e6
+
+
+def run_benchmark(*, repeats: int, extra_terms: list[int]) -> dict[str, Any]:
+    texts = [text.lower() for text, _ in PROMPTS]
+    results: dict[str, Any] = {}
+    for extra in [0, *extra_terms]:
+        tables = padded_tables(extra) if extra else (ROOM_TABLE, STYLE_TABLE, *HINT_TABLES)
+        matcher = KeywordMatcher(tables)
+        term_count = sum(len(synonyms) for table in tables for _, synonyms in table.entries)
+        linear_us = _time(lambda t: linear_match(tables, t), texts, repeats)
+        compiled_us = _time(matcher.match, texts, repeats)
+        results[f"{term_count} terms"] = {
+            "terms": term_count,
+            "linear_us": round(linear_us, 2),
+            "compiled_us": round(compiled_us, 2),
+            "speedup": round(linear_us / compiled_us, 2),
+            "identical": all(matcher.match(t) == linear_match(tables, t) for t in texts),
+        }
+    analyzer_us = _time(lambda t: _rule_based_requirement_analyzer(t, 0.5), texts, repeats)
+    return {"prompts": len(texts), "repeats": repeats, "analyzer_us": round(analyzer_us, 2), "tables": results}
+
+
+def print_report(summary: dict[str, Any]) -> None:
+    print(f"prompts: {summary['prompts']} x {summary['repeats']}  "
+          f"_rule_based_requirement_analyzer: {summary['analyzer_us']:.2f} us/call")
+    print(f"{'terms':>7}{'linear us':>11}{'compiled us':>13}{'speedup':>9}  identical")
+    for stats in summary["tables"].values():
+        print(f"{stats['terms']:>7}{stats['linear_us']:>11.2f}{stats['compiled_us']:>13.2f}"
+              f"{stats['speedup']:>9.2f}  {stats['identical']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=2000, help="Passes over the prompt corpus")
+    parser.add_argument("--extra-terms", type=int, nargs="+", default=[100, 500], help="Synthetic terms to add")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    summary = run_benchmark(repeats=args.repeats, extra_terms=args.extra_terms)
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_samplers.py
+"""Quality vs latency of the SDXL sampler presets (designbridge/samplers.py).
+
+Renders the same prompts and seeds with every preset and compares each image against a
+high-step reference render (default scheduler) by PSNR and mean absolute pixel difference.
+Presets whose weights cannot be loaded (e.g. LoRA / Turbo offline) are reported as unavailable.
+
+    python -m benchmarks.bench_samplers --model stabilityai/stable-diffusion-xl-base-1.0 --size 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from designbridge import nodes
+from designbridge.config import Config
+from designbridge.models import get_model_registry
+from designbridge.samplers import PRESETS
+
+PROMPTS: list[str] = [
+    "Interior design visualization: a living room, Scandinavian style, warm wood, neutral tones.",
+    "Interior design visualization: a bedroom, industrial style, exposed brick, soft light.",
+]
+
+
+def _psnr(a: Any, b: Any) -> float:
+    import numpy as np
+
+    mse = float(np.mean((a.astype(np.float64) - b.astype(np.float64)) ** 2))
+    return float("inf") if mse == 0 else 10 * np.log10(255.0**2 / mse)
+
+
+def _render(sampler: str, *, size: int, seeds: list[int], steps: int | None = None) -> dict[str, Any]:
+    """Load the pipeline for one preset and render every prompt; returns images and timings."""
+    import numpy as np
+
+    overrides: dict[str, Any] = {"SDXL_SAMPLER": sampler, "SDXL_CPU_MAX_STEPS": 1000}
+    if steps is not None:
+        overrides["SDXL_STEPS"] = steps
+    with contextlib.ExitStack() as stack:
+        for name, value in overrides.items():
+            stack.enter_context(mock.patch.object(Config, name, value))
+        # Each preset loads its own pipeline (scheduler / LoRA / checkpoint differ)
+        get_model_registry().evict(nodes.SDXL_ENTRY)
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            nodes._get_sdxl_pipeline()
+        load_s = time.perf_counter() - t0
+        run_steps = nodes._sdxl_steps()
+        images: list[Any] = []
+        latencies: list[float] = []
+        for prompt in PROMPTS:
+            t0 = time.perf_counter()
+            batch = nodes._run_sdxl_batch(("sdxl", run_steps, size), [{"prompt": prompt, "seeds": seeds}])[0]
+            latencies.append((time.perf_counter() - t0) / len(seeds))
+            images.extend(np.asarray(img.convert("RGB")) for img in batch)
+    return {"load_s": load_s, "steps": run_steps, "images": images, "latencies": latencies}
+
+
+def run_benchmark(*, size: int, seeds: list[int], reference_steps: int, presets: list[str]) -> dict[str, Any]:
+    """Render the reference, then every preset, and score each against the reference."""
+    import numpy as np
+
+    reference = _render("default", size=size, seeds=seeds, steps=reference_steps)
+    results: dict[str, Any] = {}
+    for name in presets:
+        try:
+            run = _render(name, size=size, seeds=seeds)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        psnr = [_psnr(a, b) for a, b in zip(run["images"], reference["images"])]
+        mad = [float(np.mean(np.abs(a.astype(np.int16) - b.astype(np.int16)))) for a, b in zip(run["images"], reference["images"])]
+        results[name] = {
+            "steps": run["steps"],
+            "load_s": round(run["load_s"], 3),
+            "s_per_image": round(float(np.mean(run["latencies"])), 4),
+            "images_per_s": round(1.0 / float(np.mean(run["latencies"])), 4),
+            "psnr_vs_reference_db": round(float(np.mean(psnr)), 2),
+            "mean_abs_diff": round(float(np.mean(mad)), 2),
+        }
+    default_s = results.get("default", {}).get("s_per_image")
+    for stats in results.values():
+        if default_s and "s_per_image" in stats:
+            stats["speedup_vs_default"] = round(default_s / stats["s_per_image"], 2)
+    return {
+        "model": Config.SDXL_MODEL,
+        "size": size,
+        "seeds": seeds,
+        "reference_steps": reference_steps,
+        "reference_s_per_image": round(float(np.mean(reference["latencies"])), 4),
+        "presets": results,
+    }
+
+
+def print_report(summary: dict[str, Any]) -> None:
+    print(f"model: {summary['model']}  size: {summary['size']}px  "
+          f"reference: {summary['reference_steps']} steps, {summary['reference_s_per_image']:.3f}s/image")
+    print(f"{'preset':<18}{'steps':>6}{'s/image':>10}{'speedup':>9}{'PSNR dB':>9}{'MAD':>7}")
+    for name, stats in summary["presets"].items():
+        if "error" in stats:
+            print(f"{name:<18}  unavailable ({stats['error']})")
+            continue
+        print(f"{name:<18}{stats['steps']:>6}{stats['s_per_image']:>10.3f}{stats.get('speedup_vs_default', 0):>9.2f}"
+              f"{stats['psnr_vs_reference_db']:>9.2f}{stats['mean_abs_diff']:>7.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", type=str, default=Config.SDXL_MODEL, help="SDXL checkpoint (name or local path)")
+    parser.add_argument("--size", type=int, default=512, help="Render resolution (px)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1], help="Seeds rendered per prompt")
+    parser.add_argument("--reference-steps", type=int, default=40, help="Steps of the default-scheduler reference")
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS), help="Presets to compare")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    with mock.patch.object(Config, "SDXL_MODEL", args.model):
+        summary = run_benchmark(
+            size=args.size, seeds=args.seeds, reference_steps=args.reference_steps, presets=args.presets
+        )
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
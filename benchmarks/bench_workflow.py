@@ -0,0 +1,187 @@
+# benchmarks/bench_workflow.py
+"""End-to-end workflow benchmark with stubbed backends (fully offline, CPU only).
+
+Runs get_compiled_graph(instrument=True) over a fixed corpus of prompts and synthetic room
+images, then reports p50/p95 latency per node and total throughput. Every run is checked to
+have gone through the stubs (SDXL stub render, depth + segmentation from the tiny models).
+
+    python -m benchmarks.bench_workflow --runs 24 --gemini-latency 0.2 --json bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.stubs import install_stubs
+from designbridge import get_compiled_graph
+
+# Fixed corpus: prompts covering every routing decision, plus synthetic photos at common sizes.
+PROMPTS: list[tuple[str, float]] = [
+    ("客廳動線不順暢，希望重新規劃布局", 0.7),
+    ("想要改成現代簡約風格", 0.5),
+    ("只想調整沙發位置和顏色", 0.2),
+    ("北歐風格，開放式空間，動線順暢", 0.8),
+    ("Scandinavian bedroom with warm wood materials", 0.6),
+    ("Industrial style study, better layout for two desks", 0.6),
+]
+IMAGE_SIZES: list[tuple[int, int] | None] = [None, (640, 480), (480, 640), (1024, 768)]
+
+
+def make_corpus(image_dir: Path) -> list[dict[str, Any]]:
+    """Build the deterministic (prompt x image) corpus of initial states."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    image_paths: list[str | None] = []
+    for size in IMAGE_SIZES:
+        if size is None:
+            image_paths.append(None)
+            continue
+        width, height = size
+        # Vertical gradient + noise: a crude "room" with floor/wall contrast
+        gradient = np.linspace(40, 220, height, dtype=np.float32)[:, None, None]
+        pixels = gradient + rng.normal(0, 12, (height, width, 3))
+        path = image_dir / f"room_{width}x{height}.png"
+        Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path)
+        image_paths.append(str(path))
+
+    corpus = []
+    for i, (text_prompt, edit_scope) in enumerate(PROMPTS):
+        user_input: dict[str, Any] = {"text_prompt": text_prompt, "edit_scope": edit_scope}
+        image_path = image_paths[i % len(image_paths)]
+        if image_path:
+            user_input["initial_image"] = image_path
+        corpus.append({"user_input": user_input})
+    return corpus
+
+
+def check_stubbed_run(state: dict[str, Any], result: dict[str, Any]) -> None:
+    """Fail loudly unless the run went through the stubs (nodes swallow backend failures, so a
+    broken stub would otherwise be timed as fast placeholder / empty-vision runs)."""
+    backend = ((result.get("render_result") or {}).get("generation_params") or {}).get("backend")
+    if backend != "sdxl":
+        raise RuntimeError(f"Render used backend {backend!r}, not the stub SDXL pipeline")
+    features = result.get("vision_features") or {}
+    if state["user_input"].get("initial_image") and not (features.get("depth") and features.get("segmentation")):
+        raise RuntimeError(f"Visual preprocessing didn't produce depth + segmentation: {sorted(features)}")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def summarize(node_records: list[dict[str, Any]], run_walls: list[float], total_s: float) -> dict[str, Any]:
+    """Aggregate per-node p50/p95/mean and overall throughput."""
+    per_node: dict[str, list[float]] = {}
+    for record in node_records:
+        per_node.setdefault(record["node"], []).append(record["wall_s"])
+    return {
+        "runs": len(run_walls),
+        "total_s": round(total_s, 4),
+        "throughput_runs_per_s": round(len(run_walls) / total_s, 4) if total_s else 0.0,
+        "run_p50_s": round(percentile(run_walls, 50), 4),
+        "run_p95_s": round(percentile(run_walls, 95), 4),
+        "nodes": {
+            name: {
+                "count": len(walls),
+                "p50_s": round(percentile(walls, 50), 4),
+                "p95_s": round(percentile(walls, 95), 4),
+                "mean_s": round(sum(walls) / len(walls), 4),
+            }
+            for name, walls in per_node.items()
+        },
+    }
+
+
+def run_benchmark(
+    *,
+    runs: int,
+    warmup: int = 1,
+    gemini_latency_s: float = 0.0,
+    diffusion_size: int = 64,
+    enable_vision_cache: bool = False,
+    enable_render_cache: bool = False,
+    verbose: bool = False,
+) -> dict[str, Any]:
+    """Run the stubbed workflow `runs` times over the corpus and return the summary."""
+    with tempfile.TemporaryDirectory(prefix="designbridge-bench-") as tmp:
+        tmp_path = Path(tmp)
+        corpus = make_corpus(tmp_path)
+        with install_stubs(
+            artifacts_dir=str(tmp_path / "artifacts"),
+            gemini_latency_s=gemini_latency_s,
+            diffusion_size=diffusion_size,
+            enable_vision_cache=enable_vision_cache,
+            enable_render_cache=enable_render_cache,
+        ):
+            compiled = get_compiled_graph(instrument=True)
+            node_records: list[dict[str, Any]] = []
+            run_walls: list[float] = []
+            quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with quiet:
+                # Warm-up passes load the models and touch every corpus entry once
+                for _ in range(warmup):
+                    for state in corpus:
+                        check_stubbed_run(state, compiled.invoke(state))
+                t_start = time.perf_counter()
+                for i in range(runs):
+                    state = corpus[i % len(corpus)]
+                    t0 = time.perf_counter()
+                    result = compiled.invoke(state)
+                    run_walls.append(time.perf_counter() - t0)
+                    check_stubbed_run(state, result)
+                    node_records.extend(result.get("node_timings") or [])
+                total_s = time.perf_counter() - t_start
+    return summarize(node_records, run_walls, total_s)
+
+
+def print_report(summary: dict[str, Any]) -> None:
+    print(f"runs: {summary['runs']}  total: {summary['total_s']:.3f}s  "
+          f"throughput: {summary['throughput_runs_per_s']:.2f} runs/s")
+    print(f"run latency  p50: {summary['run_p50_s']:.4f}s  p95: {summary['run_p95_s']:.4f}s")
+    print(f"{'node':<26}{'count':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'mean (s)':>10}")
+    for name, stats in summary["nodes"].items():
+        print(f"{name:<26}{stats['count']:>7}{stats['p50_s']:>10.4f}{stats['p95_s']:>10.4f}{stats['mean_s']:>10.4f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=24, help="Measured graph invocations")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured passes over the corpus (model init)")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="Simulated Gemini latency (s)")
+    parser.add_argument("--diffusion-size", type=int, default=64, help="Stub render resolution (px)")
+    parser.add_argument("--vision-cache", action="store_true", help="Enable the vision artifact cache")
+    parser.add_argument("--render-cache", action="store_true", help="Enable the render result cache")
+    parser.add_argument("--json", type=str, default=None, help="Write the summary to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show node log output")
+    args = parser.parse_args()
+
+    summary = run_benchmark(
+        runs=args.runs,
+        warmup=args.warmup,
+        gemini_latency_s=args.gemini_latency,
+        diffusion_size=args.diffusion_size,
+        enable_vision_cache=args.vision_cache,
+        enable_render_cache=args.render_cache,
+        verbose=args.verbose,
+    )
+    print_report(summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# benchmarks/stubs.py
+"""Local stand-ins for DesignBridge's external backends, so benchmarks run fully offline on CPU.
+
+- FakeGeminiResponder: replaces the Gemini requirement call with a deterministic local response.
+- Tiny random-weight Depth Anything / UPerNet models (same HF classes, a few K parameters).
+- StubDiffusionPipeline: SDXL-shaped pipeline doing a fixed amount of conv work per step.
+- Imagen is always reported as unavailable, as on accounts without billing.
+
+Use ``with install_stubs(...):`` around graph invocations; everything is restored on exit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Iterator
+from unittest import mock
+
+from designbridge import nodes, vision
+from designbridge.config import Config
+
+
+class FakeGeminiResponder:
+    """Drop-in for nodes._call_gemini_requirement_analyzer with a fixed simulated network latency."""
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def __call__(self, text_prompt: str, edit_scope: float, initial_image: str, api_key: str) -> dict[str, Any]:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return nodes._rule_based_requirement_analyzer(text_prompt, edit_scope)
+
+    async def acall(self, text_prompt: str, edit_scope: float, initial_image: str, api_key: str) -> dict[str, Any]:
+        """Async variant for the async graph; simulated latency doesn't block the event loop."""
+        self.calls += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        return nodes._rule_based_requirement_analyzer(text_prompt, edit_scope)
+
+
+@lru_cache(maxsize=1)
+def tiny_depth_model(seed: int = 0) -> Any:
+    """Random-weight Depth Anything V2 with the real HF architecture, scaled down."""
+    import torch
+    from transformers import (
+        DepthAnythingConfig,
+        DepthAnythingForDepthEstimation,
+        Dinov2Config,
+        DPTImageProcessor,
+    )
+
+    torch.manual_seed(seed)
+    backbone = Dinov2Config(
+        hidden_size=32,
+        num_hidden_layers=4,
+        num_attention_heads=2,
+        intermediate_size=64,
+        image_size=70,
+        patch_size=14,
+        out_features=["stage1", "stage2", "stage3", "stage4"],
+        reshape_hidden_states=False,
+    )
+    config = DepthAnythingConfig(
+        backbone_config=backbone,
+        reassemble_hidden_size=32,
+        neck_hidden_sizes=[8, 16, 32, 32],
+        fusion_hidden_size=16,
+        head_hidden_size=8,
+        patch_size=14,
+    )
+    model = DepthAnythingForDepthEstimation(config).eval()
+    processor = DPTImageProcessor(
+        size={"height": 70, "width": 70}, keep_aspect_ratio=True, ensure_multiple_of=14, do_pad=False
+    )
+    return processor, model
+
+
+@lru_cache(maxsize=1)
+def tiny_upernet(seed: int = 0, num_labels: int = 150) -> Any:
+    """Random-weight UPerNet (ConvNeXt backbone) with the ADE20K label count, scaled down."""
+    import torch
+    from transformers import ConvNextConfig, SegformerImageProcessor, UperNetConfig, UperNetForSemanticSegmentation
+
+    torch.manual_seed(seed)
+    backbone = ConvNextConfig(
+        num_channels=3,
+        hidden_sizes=[8, 16, 32, 64],
+        depths=[1, 1, 1, 1],
+        out_features=["stage1", "stage2", "stage3", "stage4"],
+    )
+    config = UperNetConfig(
+        backbone_config=backbone,
+        hidden_size=16,
+        auxiliary_in_channels=32,
+        num_labels=num_labels,
+        use_auxiliary_head=False,
+    )
+    model = UperNetForSemanticSegmentation(config).eval()
+    processor = SegformerImageProcessor(size={"height": 64, "width": 64})
+    return processor, model
+
+
+class StubDiffusionPipeline:
+    """SDXL-shaped pipeline: accepts the same call arguments, runs a small conv stack per step."""
+
+    def __init__(self, size: int = 64, channels: int = 32, seed: int = 0) -> None:
+        import torch
+
+        torch.manual_seed(seed)
+        self.size = size
+        self.unet = torch.nn.Sequential(
+            torch.nn.Conv2d(4, channels, 3, padding=1),
+            torch.nn.SiLU(),
+            torch.nn.Conv2d(channels, 4, 3, padding=1),
+        ).eval()
+        self.calls = 0
+
+    def __call__(
+        self,
+        prompt: str | list[str] | None = None,
+        num_inference_steps: int = 20,
+        num_images_per_prompt: int = 1,
+        generator: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        import numpy as np
+        import torch
+        from PIL import Image
+
+        self.calls += 1
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        batch = len(prompts) * num_images_per_prompt
+        size = kwargs.get("height") or self.size
+        latent_size = max(1, size // 8)
+        # One generator per image (as diffusers does) gives each candidate its own latents
+        generators = generator if isinstance(generator, list) else [generator] * batch
+        latents = torch.cat(
+            [torch.randn(1, 4, latent_size, latent_size, generator=gen) for gen in generators[:batch]]
+        )
+        with torch.no_grad():
+            for _ in range(num_inference_steps):
+                latents = latents - 0.1 * self.unet(latents)
+        images = []
+        for latent in latents:
+            arr = latent[:3].sigmoid().mul(255).byte().permute(1, 2, 0).numpy()
+            images.append(Image.fromarray(np.ascontiguousarray(arr)).resize((size, size)))
+        return SimpleNamespace(images=images)
+
+
+@contextlib.contextmanager
+def leased(obj: Any) -> Iterator[Any]:
+    """Stand-in for a ModelRegistry lease (vision._lease_*, nodes._lease_*) that yields obj."""
+    yield obj
+
+
+def _imagen_unavailable(prompt: str, out_paths: Any) -> None:
+    raise RuntimeError("Imagen disabled in benchmark (no billing)")
+
+
+async def _aimagen_unavailable(prompt: str, out_paths: Any) -> None:
+    _imagen_unavailable(prompt, out_paths)
+
+
+@contextlib.contextmanager
+def install_stubs(
+    *,
+    artifacts_dir: str,
+    gemini_latency_s: float = 0.0,
+    diffusion_size: int = 64,
+    enable_vision_cache: bool = False,
+    enable_render_cache: bool = False,
+    enable_requirement_cache: bool = False,
+) -> Iterator[SimpleNamespace]:
+    """Swap every external backend for a local stand-in for the duration of the block."""
+    responder = FakeGeminiResponder(gemini_latency_s)
+    pipeline = StubDiffusionPipeline(size=diffusion_size)
+    with contextlib.ExitStack() as stack:
+        for name, value in {
+            "GEMINI_API_KEY": "benchmark-fake-key",
+            "ARTIFACTS_DIR": artifacts_dir,
+            "ENABLE_VISION_CACHE": enable_vision_cache,
+            "VISION_CACHE_DIR": f"{artifacts_dir}/cache/vision",
+            "ENABLE_RENDER_CACHE": enable_render_cache,
+            "RENDER_CACHE_DIR": f"{artifacts_dir}/cache/render",
+            "ENABLE_REQUIREMENT_CACHE": enable_requirement_cache,
+            "ENABLE_SDXL_FALLBACK": True,
+        }.items():
+            stack.enter_context(mock.patch.object(Config, name, value))
+        stack.enter_context(mock.patch.object(nodes, "_call_gemini_requirement_analyzer", responder))
+        stack.enter_context(mock.patch.object(nodes, "_acall_gemini_requirement_analyzer", responder.acall))
+        stack.enter_context(mock.patch.object(nodes, "_render_imagen", _imagen_unavailable))
+        stack.enter_context(mock.patch.object(nodes, "_arender_imagen", _aimagen_unavailable))
+        # Inference runs under registry leases; the plain getters are still used for preloading
+        stack.enter_context(mock.patch.object(nodes, "_get_sdxl_pipeline", lambda: pipeline))
+        stack.enter_context(mock.patch.object(nodes, "_get_controlnet_pipeline", lambda: pipeline))
+        stack.enter_context(mock.patch.object(nodes, "_lease_sdxl_pipeline", lambda: leased(pipeline)))
+        stack.enter_context(mock.patch.object(nodes, "_lease_controlnet_pipeline", lambda: leased(pipeline)))
+        stack.enter_context(mock.patch.object(nodes, "_vision_cache", None))
+        stack.enter_context(mock.patch.object(nodes, "_render_cache", None))
+        stack.enter_context(mock.patch.object(nodes, "_imagen_breaker", None))
+        stack.enter_context(mock.patch.object(nodes, "_requirement_cache", None))
+        stack.enter_context(mock.patch.object(vision, "_load_depth_model", lambda name: tiny_depth_model()))
+        stack.enter_context(mock.patch.object(vision, "_load_upernet", lambda name: tiny_upernet()))
+        stack.enter_context(mock.patch.object(vision, "_lease_depth_model", lambda name: leased(tiny_depth_model())))
+        stack.enter_context(mock.patch.object(vision, "_lease_upernet", lambda name: leased(tiny_upernet())))
+        yield SimpleNamespace(gemini=responder, pipeline=pipeline)
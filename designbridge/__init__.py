@@ -1,10 +1,20 @@
 # designbridge/__init__.py
 """DesignBridge: LangGraph multi-agent workflow for interior design."""
 
-from designbridge.graph import build_graph, get_compiled_graph
+from designbridge.graph import (
+    build_async_graph,
+    build_graph,
+    get_async_compiled_graph,
+    get_compiled_graph,
+    get_graph_diagram_png,
+    get_graph_mermaid,
+)
+from designbridge.models import get_model_registry
+from designbridge.nodes import RequirementBatchResult, aanalyze_requirements_batch, analyze_requirements_batch
 from designbridge.schemas import (
     EvalFeedbackJSON,
     RequirementJSON,
+    RenderPreviewJSON,
     RenderResultJSON,
     SceneGraphJSON,
     StyleParamsJSON,
@@ -12,6 +22,7 @@ from designbridge.schemas import (
     VisionJSON,
 )
 from designbridge.state import DesignBridgeState, RoutingDecision, UserInput
+from designbridge.warmup import wait_until_ready, warmup, warmup_status
 
 __all__ = [
     "DesignBridgeState",
@@ -22,8 +33,20 @@ __all__ = [
     "TaskPlanJSON",
     "StyleParamsJSON",
     "SceneGraphJSON",
+    "RenderPreviewJSON",
     "RenderResultJSON",
     "EvalFeedbackJSON",
     "build_graph",
+    "build_async_graph",
     "get_compiled_graph",
+    "get_async_compiled_graph",
+    "get_graph_diagram_png",
+    "get_graph_mermaid",
+    "get_model_registry",
+    "analyze_requirements_batch",
+    "aanalyze_requirements_batch",
+    "RequirementBatchResult",
+    "warmup",
+    "warmup_status",
+    "wait_until_ready",
 ]
@@ -0,0 +1,106 @@
+# designbridge/cache.py
+"""Content-addressed artifact cache on disk.
+
+Each entry is a directory named by a key (sha256 of the inputs) holding one or more files.
+Recency is tracked through the entry directory mtime, so the LRU order survives restarts.
+When the total size exceeds ``max_bytes``, the least recently used entries are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+def hash_file(path: str | Path, *, chunk_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts: object) -> str:
+    """Build a cache key from arbitrary parts (content hashes, model names, params)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Size-bounded LRU cache of artifact files, keyed by content hash."""
+
+    def __init__(self, root: str | Path, *, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str, out_dir: Path) -> dict[str, str] | None:
+        """Copy a cached entry's files into out_dir and return {file_name: path}, or None on miss."""
+        entry = self._entry_dir(key)
+        with self._lock:
+            files = [p for p in entry.iterdir() if p.is_file()] if entry.is_dir() else []
+            if not files:
+                self.misses += 1
+                return None
+            out_dir.mkdir(parents=True, exist_ok=True)
+            copied: dict[str, str] = {}
+            for src in files:
+                dst = out_dir / src.name
+                shutil.copyfile(src, dst)
+                copied[src.name] = str(dst)
+            now = time.time()
+            os.utime(entry, (now, now))
+            self.hits += 1
+            return copied
+
+    def put(self, key: str, files: dict[str, str | Path]) -> None:
+        """Store files under key ({file_name: source_path}) and evict old entries if over budget."""
+        entry = self._entry_dir(key)
+        tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        with self._lock:
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True, exist_ok=True)
+            for name, src in files.items():
+                shutil.copyfile(src, tmp / name)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        if not self.root.is_dir():
+            return
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for shard in self.root.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in shard.iterdir():
+                if not entry.is_dir() or ".tmp-" in entry.name:
+                    continue
+                size = sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+                entries.append((entry.stat().st_mtime, size, entry))
+                total += size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def stats(self) -> dict[str, int]:
+        """Return cumulative hit/miss counts for this process."""
+        return {"hits": self.hits, "misses": self.misses}
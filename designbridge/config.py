@@ -13,13 +13,66 @@ class Config:
     GEMINI_MODEL: str = "gemini-2.5-flash"
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
     GEMINI_TEMPERATURE: float = 0.3
+    # Requirement analysis calls: per-attempt timeout, retries of transient errors (jittered
+    # exponential backoff from GEMINI_RETRY_BACKOFF_S) and a total latency budget per analysis,
+    # after which the rule-based analyzer is used
+    GEMINI_TIMEOUT_S: float = float(os.getenv("DESIGNBRIDGE_GEMINI_TIMEOUT_S", "20"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("DESIGNBRIDGE_GEMINI_MAX_RETRIES", "2"))
+    GEMINI_RETRY_BACKOFF_S: float = float(os.getenv("DESIGNBRIDGE_GEMINI_RETRY_BACKOFF_S", "0.5"))
+    GEMINI_LATENCY_BUDGET_S: float = float(os.getenv("DESIGNBRIDGE_GEMINI_LATENCY_BUDGET_S", "30"))
+    # Room photos sent to Gemini are downscaled / recompressed to JPEG above these limits
+    # (0 disables the limit), and uploaded file handles are reused by content hash for
+    # GEMINI_UPLOAD_TTL_S (Gemini keeps uploaded files for 48 h; 0 = upload every call)
+    GEMINI_IMAGE_MAX_SIDE: int = int(os.getenv("DESIGNBRIDGE_GEMINI_IMAGE_MAX_SIDE", "1536"))
+    GEMINI_IMAGE_MAX_KB: int = int(os.getenv("DESIGNBRIDGE_GEMINI_IMAGE_MAX_KB", "1024"))
+    GEMINI_IMAGE_JPEG_QUALITY: int = int(os.getenv("DESIGNBRIDGE_GEMINI_IMAGE_JPEG_QUALITY", "85"))
+    GEMINI_UPLOAD_TTL_S: float = float(os.getenv("DESIGNBRIDGE_GEMINI_UPLOAD_TTL_S", str(46 * 3600)))
+
+    # Requirement analysis cache: exact key = normalized prompt + edit_scope bucket + image hash;
+    # near-duplicate prompts (opt-in, < 1.0) match by character-bigram Jaccard similarity >= REQUIREMENT_CACHE_SIMILARITY
+    # when they also name the same rooms / styles / colours / negations
+    ENABLE_REQUIREMENT_CACHE: bool = os.getenv("DESIGNBRIDGE_ENABLE_REQUIREMENT_CACHE", "true").lower() in ("1", "true", "yes")
+    REQUIREMENT_CACHE_TTL_S: float = float(os.getenv("DESIGNBRIDGE_REQUIREMENT_CACHE_TTL_S", "86400"))
+    REQUIREMENT_CACHE_MAX_ENTRIES: int = int(os.getenv("DESIGNBRIDGE_REQUIREMENT_CACHE_MAX_ENTRIES", "512"))
+    REQUIREMENT_CACHE_SIMILARITY: float = float(os.getenv("DESIGNBRIDGE_REQUIREMENT_CACHE_SIMILARITY", "1.0"))  # 1.0 = exact only
+    REQUIREMENT_CACHE_SCOPE_BUCKET: float = float(os.getenv("DESIGNBRIDGE_REQUIREMENT_CACHE_SCOPE_BUCKET", "0.1"))
+    # analyze_requirements_batch: max Gemini requirement calls in flight
+    REQUIREMENT_BATCH_CONCURRENCY: int = int(os.getenv("DESIGNBRIDGE_REQUIREMENT_BATCH_CONCURRENCY", "8"))
 
     # Image generation (Imagen) - same API key as Gemini; requires billing
     IMAGEN_MODEL: str = os.getenv("DESIGNBRIDGE_IMAGEN_MODEL", "imagen-4.0-generate-001")
+    # Imagen circuit breaker: after this many consecutive failures (or one billing/quota/auth
+    # error) the renderer skips Imagen and goes straight to SDXL for the cool-down period
+    IMAGEN_BREAKER_THRESHOLD: int = int(os.getenv("DESIGNBRIDGE_IMAGEN_BREAKER_THRESHOLD", "3"))
+    IMAGEN_BREAKER_COOLDOWN_S: float = float(os.getenv("DESIGNBRIDGE_IMAGEN_BREAKER_COOLDOWN_S", "300"))
+
     # Local SDXL fallback (free); set DESIGNBRIDGE_SDXL_MODEL to use another model
     SDXL_MODEL: str = os.getenv("DESIGNBRIDGE_SDXL_MODEL", "stabilityai/stable-diffusion-xl-base-1.0")
     SDXL_STEPS: int = int(os.getenv("DESIGNBRIDGE_SDXL_STEPS", "25"))
+    SDXL_CPU_MAX_STEPS: int = int(os.getenv("DESIGNBRIDGE_SDXL_CPU_MAX_STEPS", "20"))
+    # Sampler preset (see designbridge/samplers.py): default | dpmpp_2m_karras | unipc | lcm_lora | turbo
+    # lcm_lora / turbo are few-step distilled variants for CPU-only deployments (2-4 steps).
+    SDXL_SAMPLER: str = os.getenv("DESIGNBRIDGE_SDXL_SAMPLER", "default")
+    # Per-field overrides of the preset
+    SDXL_SCHEDULER: Optional[str] = os.getenv("DESIGNBRIDGE_SDXL_SCHEDULER") or None
+    SDXL_GUIDANCE_SCALE: Optional[float] = float(os.environ["DESIGNBRIDGE_SDXL_GUIDANCE_SCALE"]) if os.getenv("DESIGNBRIDGE_SDXL_GUIDANCE_SCALE") else None
+    SDXL_LORA: Optional[str] = os.getenv("DESIGNBRIDGE_SDXL_LORA") or None
     ENABLE_SDXL_FALLBACK: bool = os.getenv("DESIGNBRIDGE_ENABLE_SDXL_FALLBACK", "true").lower() in ("1", "true", "yes")
+    # Render queue: SDXL requests arriving within the window are batched into one pipeline call
+    # (grouped by pipeline type and step count); RENDER_MAX_BATCH caps images per call, so a job
+    # with several candidates counts once per candidate
+    ENABLE_RENDER_QUEUE: bool = os.getenv("DESIGNBRIDGE_ENABLE_RENDER_QUEUE", "true").lower() in ("1", "true", "yes")
+    RENDER_BATCH_WINDOW_MS: int = int(os.getenv("DESIGNBRIDGE_RENDER_BATCH_WINDOW_MS", "50"))
+    RENDER_MAX_BATCH: int = int(os.getenv("DESIGNBRIDGE_RENDER_MAX_BATCH", "4"))
+    # Candidates rendered per task in one batched call (overridable via user_input["num_candidates"])
+    RENDER_NUM_CANDIDATES: int = int(os.getenv("DESIGNBRIDGE_RENDER_NUM_CANDIDATES", "1"))
+    # Base seed for candidates (seed, seed+1, ...); unset = random, overridable via user_input["seed"]
+    RENDER_SEED: Optional[int] = int(os.environ["DESIGNBRIDGE_RENDER_SEED"]) if os.getenv("DESIGNBRIDGE_RENDER_SEED") else None
+    # Two-phase render: a fast low-res, low-step SDXL preview streamed out before the full render.
+    # Skipped while Imagen is expected to serve the final render (it would only load SDXL for nothing)
+    ENABLE_RENDER_PREVIEW: bool = os.getenv("DESIGNBRIDGE_RENDER_PREVIEW", "false").lower() in ("1", "true", "yes")
+    PREVIEW_SIZE: int = int(os.getenv("DESIGNBRIDGE_PREVIEW_SIZE", "512"))
+    PREVIEW_STEPS: int = int(os.getenv("DESIGNBRIDGE_PREVIEW_STEPS", "6"))
     
     # ControlNet for SDXL (depth + segmentation guidance)
     ENABLE_CONTROLNET: bool = os.getenv("DESIGNBRIDGE_ENABLE_CONTROLNET", "true").lower() in ("1", "true", "yes")
@@ -36,10 +89,52 @@ class Config:
     DEPTH_MODEL: str = "depth-anything/Depth-Anything-V2-Large-hf"
     # Semantic segmentation (UPerNet). Example checkpoint on HuggingFace.
     SEGMENTATION_MODEL: str = "openmmlab/upernet-convnext-small"
+    # How segmentation output is upsampled to the photo size:
+    # "logits" (bilinear on C x H x W logits, most memory) | "labels" (argmax first, nearest on the
+    # label map; avoids multi-GB allocations on large photos) | "auto" (labels only for large photos)
+    SEGMENTATION_UPSAMPLE: str = os.getenv("DESIGNBRIDGE_SEGMENTATION_UPSAMPLE", "auto")
+
+    # Decode the image once and run depth + segmentation concurrently (thread pool / CUDA streams)
+    VISION_CONCURRENT: bool = os.getenv("DESIGNBRIDGE_VISION_CONCURRENT", "true").lower() in ("1", "true", "yes")
 
     # Where to write artifacts (depth/segmentation outputs)
     ARTIFACTS_DIR: str = os.getenv("DESIGNBRIDGE_ARTIFACTS_DIR", "artifacts")
 
+    # Persistent cache of depth/segmentation outputs, keyed by image bytes hash + model name.
+    # Re-submitting the same photo (e.g. with a different text_prompt) skips model inference.
+    ENABLE_VISION_CACHE: bool = os.getenv("DESIGNBRIDGE_ENABLE_VISION_CACHE", "true").lower() in ("1", "true", "yes")
+    VISION_CACHE_DIR: str = os.getenv("DESIGNBRIDGE_VISION_CACHE_DIR", os.path.join(ARTIFACTS_DIR, "cache", "vision"))
+    VISION_CACHE_MAX_MB: int = int(os.getenv("DESIGNBRIDGE_VISION_CACHE_MAX_MB", "1024"))  # LRU eviction above this
+
+    # Persistent cache of rendered images, keyed by prompt, backend, model, control image hash and
+    # generation params (steps, ControlNet scale, candidate count, explicit seed).
+    ENABLE_RENDER_CACHE: bool = os.getenv("DESIGNBRIDGE_ENABLE_RENDER_CACHE", "true").lower() in ("1", "true", "yes")
+    RENDER_CACHE_DIR: str = os.getenv("DESIGNBRIDGE_RENDER_CACHE_DIR", os.path.join(ARTIFACTS_DIR, "cache", "render"))
+    RENDER_CACHE_MAX_MB: int = int(os.getenv("DESIGNBRIDGE_RENDER_CACHE_MAX_MB", "2048"))  # LRU eviction above this
+
+    # Per-node instrumentation (wall/CPU time, peak RSS, CUDA memory) recorded in state["node_timings"]
+    ENABLE_INSTRUMENTATION: bool = os.getenv("DESIGNBRIDGE_INSTRUMENT", "false").lower() in ("1", "true", "yes")
+    # Optional JSONL file that receives one record per instrumented node execution
+    TRACE_FILE: Optional[str] = os.getenv("DESIGNBRIDGE_TRACE_FILE") or None
+
+    # Reduced-precision CPU inference: "fp32" (default) | "bf16" | "int8" (dynamic quantization of
+    # Linear layers). Vision = Depth Anything / UPerNet; diffusion = SDXL UNet + text encoders
+    # (and ControlNet). Ignored on CUDA. See benchmarks/bench_precision.py for latency/drift.
+    VISION_PRECISION: str = os.getenv("DESIGNBRIDGE_VISION_PRECISION", "fp32")
+    DIFFUSION_PRECISION: str = os.getenv("DESIGNBRIDGE_DIFFUSION_PRECISION", "fp32")
+
+    # Model registry (designbridge/models.py): memory budget for resident models (0 = unlimited).
+    # Least recently used models are evicted ("evict", reloaded from disk on next use) or, on
+    # CUDA, moved to CPU RAM ("cpu") when a new model would exceed the budget.
+    MODEL_MEMORY_BUDGET_MB: int = int(os.getenv("DESIGNBRIDGE_MODEL_MEMORY_BUDGET_MB", "0"))
+    MODEL_OFFLOAD: str = os.getenv("DESIGNBRIDGE_MODEL_OFFLOAD", "evict")
+
+    # Background warm-up (designbridge.warmup): load heavy models at startup instead of on first request
+    WARMUP_ON_START: bool = os.getenv("DESIGNBRIDGE_WARMUP", "false").lower() in ("1", "true", "yes")
+    WARMUP_MODELS: str = os.getenv("DESIGNBRIDGE_WARMUP_MODELS", "depth,segmentation,sdxl,controlnet")
+    # Also run one tiny inference per model to warm kernels / allocator pools
+    WARMUP_DUMMY_INFERENCE: bool = os.getenv("DESIGNBRIDGE_WARMUP_DUMMY_INFERENCE", "false").lower() in ("1", "true", "yes")
+
     @classmethod
     def get_gemini_api_key(cls) -> str:
         """Get Gemini API key from config or environment."""
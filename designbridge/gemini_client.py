@@ -0,0 +1,221 @@
+# designbridge/gemini_client.py
+"""Shared Gemini text client with per-call deadlines and bounded, jittered retries.
+
+google-generativeai keeps one transport per genai.configure(); the client configures it
+once per API key and caches the GenerativeModel, so calls reuse the same pooled
+connection instead of rebuilding it every time. Every analysis gets a latency budget:
+each attempt is capped at min(timeout_s, time left) and retried (transient errors only,
+full-jitter exponential backoff) while budget remains; then GeminiTimeoutError is raised
+and callers fall back to the rule-based analyzer.
+
+Sync calls (and image uploads, via run()) go through a small worker pool. A call that
+overruns its deadline is abandoned, but its thread stays busy until the request returns,
+so at most max_in_flight calls may be running: beyond that GeminiBusyError is raised at
+once instead of queueing behind hung calls (a queued call's timeout would otherwise be
+spent waiting for a worker).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+from designbridge.config import Config
+from designbridge.health import error_status_code, is_fatal_error
+
+# Error text worth retrying (server overload, dropped connections, timeouts)
+RETRYABLE_ERROR_MARKERS: tuple[str, ...] = (
+    "timeout",
+    "timed out",
+    "deadline",
+    "unavailable",
+    "internal",
+    "connection",
+    "reset by peer",
+)
+# HTTP statuses and exception class names (google.api_core / google.genai) meaning the same
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({408, 500, 502, 503, 504})
+RETRYABLE_ERROR_TYPES: frozenset[str] = frozenset(
+    {"ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout", "BadGateway", "ServerError"}
+)
+
+
+class GeminiTimeoutError(TimeoutError):
+    """The latency budget ran out before Gemini answered."""
+
+
+class GeminiBusyError(GeminiTimeoutError):
+    """Every worker is still tied up by earlier (abandoned) calls; failing fast instead of queueing."""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """True for transient failures; quota / billing / auth errors are never retried."""
+    if is_fatal_error(error):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_TYPES or error_status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RETRYABLE_ERROR_MARKERS)
+
+
+class GeminiClient:
+    """A configured genai module + cached model, called with deadlines and retries."""
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        model_name: str,
+        temperature: float,
+        timeout_s: float,
+        max_retries: int,
+        backoff_s: float,
+        budget_s: float,
+        max_in_flight: int = 8,
+    ) -> None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.api_key = api_key
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.temperature = temperature
+        self.timeout_s = timeout_s
+        self.max_retries = max(0, max_retries)
+        self.backoff_s = backoff_s
+        self.budget_s = budget_s
+        # Sync calls run here so a hung request can be abandoned at its deadline; a slot is held
+        # until the call really returns, so work never waits in the executor's queue
+        self.max_in_flight = max(1, max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="gemini")
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.busy = 0
+
+    def deadline(self) -> float:
+        """Monotonic deadline for one analysis (start it before any upload so that counts too)."""
+        return time.monotonic() + self.budget_s
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise GeminiTimeoutError(f"Gemini latency budget of {self.budget_s:.1f}s exhausted")
+        return min(self.timeout_s, remaining)
+
+    def _backoff(self, attempt: int, deadline: float) -> float | None:
+        """Full-jitter sleep before the next attempt, or None if no retry fits in the budget."""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, self.backoff_s * 2**attempt)
+        if time.monotonic() + delay >= deadline:
+            return None
+        self.retries += 1
+        return delay
+
+    def run(self, fn: Callable[[], Any], *, deadline: float) -> Any:
+        """fn() on a worker thread, abandoned with GeminiTimeoutError at the deadline (e.g. an upload)."""
+        timeout = self._attempt_timeout(deadline)
+        if not self._slots.acquire(blocking=False):
+            self.busy += 1
+            raise GeminiBusyError(f"{self.max_in_flight} Gemini calls still in flight")
+        try:
+            future = self._executor.submit(fn)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            raise GeminiTimeoutError(f"Gemini call exceeded {timeout:.1f}s") from None
+
+    def _request(self, contents: Any, timeout: float) -> dict[str, Any]:
+        return {
+            "contents": contents,
+            "generation_config": self.genai.GenerationConfig(temperature=self.temperature),
+            "request_options": {"timeout": timeout},
+        }
+
+    def generate(self, contents: Any, *, deadline: float | None = None) -> str:
+        """generate_content(...).text within the deadline (default: a fresh latency budget)."""
+        deadline = self.deadline() if deadline is None else deadline
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout(deadline)
+            self.calls += 1
+            request = self._request(contents, timeout)
+            try:
+                return self.run(lambda: self.model.generate_content(**request).text, deadline=deadline)
+            except Exception as e:
+                error: BaseException = e
+            delay = self._backoff(attempt, deadline) if is_retryable_error(error) else None
+            if delay is None:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    async def agenerate(self, contents: Any, *, deadline: float | None = None) -> str:
+        """Async generate(): awaits generate_content_async with the same deadlines and retries."""
+        deadline = self.deadline() if deadline is None else deadline
+        attempt = 0
+        while True:
+            timeout = self._attempt_timeout(deadline)
+            self.calls += 1
+            try:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(**self._request(contents, timeout)), timeout
+                )
+                return response.text
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                error: BaseException = GeminiTimeoutError(f"Gemini call exceeded {timeout:.1f}s")
+            except Exception as e:
+                error = e
+            delay = self._backoff(attempt, deadline) if is_retryable_error(error) else None
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "busy": self.busy,
+        }
+
+
+_client: GeminiClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client(api_key: str) -> GeminiClient:
+    """Return the process-wide Gemini client (rebuilt only if the API key or model changes)."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.api_key != api_key or _client.model_name != Config.GEMINI_MODEL:
+            if _client is not None:
+                _client._executor.shutdown(wait=False)
+            _client = GeminiClient(
+                api_key,
+                model_name=Config.GEMINI_MODEL,
+                temperature=Config.GEMINI_TEMPERATURE,
+                timeout_s=Config.GEMINI_TIMEOUT_S,
+                max_retries=Config.GEMINI_MAX_RETRIES,
+                backoff_s=Config.GEMINI_RETRY_BACKOFF_S,
+                budget_s=Config.GEMINI_LATENCY_BUDGET_S,
+            )
+        return _client
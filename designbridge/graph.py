@@ -3,17 +3,28 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Any
+
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
+from designbridge.config import Config
+from designbridge.instrumentation import instrument_node
 from designbridge.nodes import (
     adjuster_agent_stub,
+    apreview_renderer,
+    arenderer,
+    arequirement_analyzer,
+    avisual_preprocessing_local,
     design_director,
     layout_agent_stub,
     layout_and_style_agent_stub,
+    preview_renderer,
     requirement_analyzer,
     renderer,
     style_agent_stub,
+    task_initializer,
     visual_preprocessing_local,
 )
 from designbridge.state import DesignBridgeState, RoutingDecision
@@ -32,26 +43,23 @@ def _route_after_director(state: DesignBridgeState) -> str:
     }.get(decision, "layout_and_style_agent")
 
 
-def build_graph() -> StateGraph:
-    """
-    Build DesignBridge workflow:
-    START -> requirement_analyzer -> visual_preprocessing -> design_director
-      -> (layout_agent | style_agent | adjuster_agent | layout_and_style_agent) -> renderer -> END
-    """
+def _assemble_graph(nodes: dict[str, Any], instrument: bool | None, trace_path: str | None) -> StateGraph:
+    """Add nodes (optionally instrumented) and wire the DesignBridge edges."""
     graph: StateGraph[DesignBridgeState] = StateGraph(DesignBridgeState)
+    if instrument is None:
+        instrument = Config.ENABLE_INSTRUMENTATION
+    if trace_path is None:
+        trace_path = Config.TRACE_FILE
 
-    graph.add_node("requirement_analyzer", requirement_analyzer)
-    graph.add_node("visual_preprocessing", visual_preprocessing_local)
-    graph.add_node("design_director", design_director)
-    graph.add_node("layout_agent", layout_agent_stub)
-    graph.add_node("style_agent", style_agent_stub)
-    graph.add_node("adjuster_agent", adjuster_agent_stub)
-    graph.add_node("layout_and_style_agent", layout_and_style_agent_stub)
-    graph.add_node("renderer", renderer)
-
-    graph.add_edge(START, "requirement_analyzer")
-    graph.add_edge("requirement_analyzer", "visual_preprocessing")
-    graph.add_edge("visual_preprocessing", "design_director")
+    for name, fn in nodes.items():
+        graph.add_node(name, instrument_node(name, fn, trace_path=trace_path) if instrument else fn)
+
+    # Requirement analysis (network-bound) and visual preprocessing (local inference) are
+    # independent, so they run as parallel branches and join at design_director.
+    graph.add_edge(START, "task_initializer")
+    graph.add_edge("task_initializer", "requirement_analyzer")
+    graph.add_edge("task_initializer", "visual_preprocessing")
+    graph.add_edge(["requirement_analyzer", "visual_preprocessing"], "design_director")
     graph.add_conditional_edges(
         "design_director",
         _route_after_director,
@@ -62,15 +70,109 @@ def build_graph() -> StateGraph:
             "layout_and_style_agent": "layout_and_style_agent",
         },
     )
-    graph.add_edge("layout_agent", "renderer")
-    graph.add_edge("style_agent", "renderer")
-    graph.add_edge("adjuster_agent", "renderer")
-    graph.add_edge("layout_and_style_agent", "renderer")
+    graph.add_edge("layout_agent", "preview_renderer")
+    graph.add_edge("style_agent", "preview_renderer")
+    graph.add_edge("adjuster_agent", "preview_renderer")
+    graph.add_edge("layout_and_style_agent", "preview_renderer")
+    # preview_renderer is a no-op unless the two-phase render is enabled
+    graph.add_edge("preview_renderer", "renderer")
     graph.add_edge("renderer", END)
 
     return graph
 
 
-def get_compiled_graph():
-    """Return compiled graph ready for invoke/stream."""
-    return build_graph().compile()
+def build_graph(instrument: bool | None = None, trace_path: str | None = None) -> StateGraph:
+    """
+    Build DesignBridge workflow:
+    START -> task_initializer -> (requirement_analyzer || visual_preprocessing) -> design_director
+      -> (layout_agent | style_agent | adjuster_agent | layout_and_style_agent)
+      -> preview_renderer -> renderer -> END
+
+    instrument wraps every node to record timings into state["node_timings"]
+    (defaults to Config.ENABLE_INSTRUMENTATION); trace_path defaults to Config.TRACE_FILE.
+    """
+    nodes = {
+        "task_initializer": task_initializer,
+        "requirement_analyzer": requirement_analyzer,
+        "visual_preprocessing": visual_preprocessing_local,
+        "design_director": design_director,
+        "layout_agent": layout_agent_stub,
+        "style_agent": style_agent_stub,
+        "adjuster_agent": adjuster_agent_stub,
+        "layout_and_style_agent": layout_and_style_agent_stub,
+        "preview_renderer": preview_renderer,
+        "renderer": renderer,
+    }
+    return _assemble_graph(nodes, instrument, trace_path)
+
+
+def build_async_graph(instrument: bool | None = None, trace_path: str | None = None) -> StateGraph:
+    """
+    Build the same workflow as build_graph with async nodes, for ainvoke/astream.
+    Gemini and Imagen calls are awaited; local model inference runs in worker threads,
+    so one event loop can keep many design tasks in flight.
+    """
+    nodes = {
+        "task_initializer": task_initializer,
+        "requirement_analyzer": arequirement_analyzer,
+        "visual_preprocessing": avisual_preprocessing_local,
+        "design_director": design_director,
+        "layout_agent": layout_agent_stub,
+        "style_agent": style_agent_stub,
+        "adjuster_agent": adjuster_agent_stub,
+        "layout_and_style_agent": layout_and_style_agent_stub,
+        "preview_renderer": apreview_renderer,
+        "renderer": arenderer,
+    }
+    return _assemble_graph(nodes, instrument, trace_path)
+
+
+@lru_cache(maxsize=None)
+def _compile_graph(instrument: bool, trace_path: str | None):
+    return build_graph(instrument=instrument, trace_path=trace_path).compile()
+
+
+def get_compiled_graph(instrument: bool | None = None, trace_path: str | None = None):
+    """Return compiled graph ready for invoke/stream.
+    Compiled once per process (per instrument/trace_path) and reused; safe to invoke concurrently.
+    """
+    if instrument is None:
+        instrument = Config.ENABLE_INSTRUMENTATION
+    if trace_path is None:
+        trace_path = Config.TRACE_FILE
+    return _compile_graph(instrument, trace_path)
+
+
+@lru_cache(maxsize=None)
+def _compile_async_graph(instrument: bool, trace_path: str | None):
+    return build_async_graph(instrument=instrument, trace_path=trace_path).compile()
+
+
+def get_async_compiled_graph(instrument: bool | None = None, trace_path: str | None = None):
+    """Return the compiled async graph ready for ainvoke/astream (compiled once per process)."""
+    if instrument is None:
+        instrument = Config.ENABLE_INSTRUMENTATION
+    if trace_path is None:
+        trace_path = Config.TRACE_FILE
+    return _compile_async_graph(instrument, trace_path)
+
+
+@lru_cache(maxsize=1)
+def get_graph_mermaid() -> str:
+    """Return the workflow diagram as Mermaid source (rendered once per process)."""
+    return get_compiled_graph().get_graph().draw_mermaid()
+
+
+# Rendered diagram PNG; only successful renders are kept, so a transient failure is retried
+_diagram_png: bytes | None = None
+
+
+def get_graph_diagram_png() -> bytes | None:
+    """Return the workflow diagram as PNG bytes (rendered once per process), or None if rendering fails."""
+    global _diagram_png
+    if _diagram_png is None:
+        try:
+            _diagram_png = get_compiled_graph().get_graph().draw_mermaid_png()
+        except Exception:
+            return None
+    return _diagram_png
@@ -0,0 +1,130 @@
+# designbridge/health.py
+"""Backend health tracking with a circuit breaker.
+
+After ``failure_threshold`` consecutive failures (or one fatal failure such as a billing,
+quota or auth error) the breaker opens and callers skip the backend for ``cooldown_s``.
+After the cool-down one trial call is let through (half-open): success closes the
+breaker, failure re-opens it for another cool-down.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Any
+
+# Error text that won't fix itself between requests: open the breaker immediately
+FATAL_ERROR_MARKERS: tuple[str, ...] = (
+    "billing",
+    "billed",
+    "quota",
+    "resource_exhausted",
+    "permission_denied",
+    "unauthenticated",
+    "api key",
+    "api_key",
+)
+# HTTP statuses and exception class names (google.api_core / google.genai) meaning the same
+FATAL_STATUS_CODES: frozenset[int] = frozenset({401, 403, 429})
+FATAL_ERROR_TYPES: frozenset[str] = frozenset(
+    {"ResourceExhausted", "PermissionDenied", "Unauthenticated", "TooManyRequests", "Unauthorized", "Forbidden"}
+)
+
+# A status code leading the message ("429 Resource exhausted") or labelled ("status code: 503")
+_STATUS_IN_TEXT = re.compile(r"^\W*([1-5]\d\d)\b|\b(?:status|code|http)\W{0,3}([1-5]\d\d)\b")
+
+
+def error_status_code(error: BaseException) -> int | None:
+    """The HTTP status of an API error: its code / status_code attribute, else a labelled number in the text."""
+    for candidate in (
+        getattr(error, "code", None),
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(candidate, int) and 100 <= candidate < 600:
+            return candidate
+    match = _STATUS_IN_TEXT.search(str(error).lower())
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def is_fatal_error(error: BaseException) -> bool:
+    """True for quota / billing / auth failures (retrying soon won't help)."""
+    if type(error).__name__ in FATAL_ERROR_TYPES or error_status_code(error) in FATAL_STATUS_CODES:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in FATAL_ERROR_MARKERS)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half_open -> closed)."""
+
+    def __init__(self, name: str, *, failure_threshold: int = 3, cooldown_s: float = 300.0) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.last_error: str | None = None
+        self.calls = 0
+        self.skipped = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether the caller may try the backend now (False = skip it)."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - (self.opened_at or 0.0) < self.cooldown_s:
+                    self.skipped += 1
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                # Only one trial call at a time while probing
+                if self._trial_in_flight:
+                    self.skipped += 1
+                    return False
+                self._trial_in_flight = True
+            self.calls += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open trial without a verdict (the call was cancelled or aborted)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, error: BaseException | None = None) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error is not None else None
+            fatal = error is not None and is_fatal_error(error)
+            if self.state == "half_open" or fatal or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def retry_in_s(self) -> float:
+        """Seconds until the next trial call (0 unless open)."""
+        if self.state != "open" or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown_s - (time.monotonic() - self.opened_at))
+
+    def status(self) -> dict[str, Any]:
+        """Snapshot for logs / generation_params."""
+        return {
+            "backend": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_s": round(self.retry_in_s(), 1),
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,167 @@
+# designbridge/instrumentation.py
+"""Opt-in per-node latency and memory instrumentation for the DesignBridge graph.
+
+Each instrumented node appends one record to state["node_timings"] (list reducer) with
+wall time, CPU time, peak RSS and, when torch is loaded with CUDA, peak CUDA memory.
+Records can also be appended to a JSONL trace file for offline analysis.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+_trace_lock = threading.Lock()
+
+
+def _peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process in bytes (None where unsupported, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _cuda_available() -> bool:
+    """True if torch is already imported and CUDA is available (never imports torch itself)."""
+    torch = sys.modules.get("torch")
+    try:
+        return bool(torch is not None and torch.cuda.is_available())
+    except Exception:
+        return False
+
+
+def append_trace(trace_path: str | Path, record: dict[str, Any]) -> None:
+    """Append one JSON record to a JSONL trace file."""
+    path = Path(trace_path)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _trace_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class _NodeTimer:
+    """Collect wall/CPU time and memory around one node execution."""
+
+    def __init__(self, node_name: str) -> None:
+        self.node_name = node_name
+        self.cuda = _cuda_available()
+
+    def __enter__(self) -> _NodeTimer:
+        if self.cuda:
+            import torch
+
+            torch.cuda.reset_peak_memory_stats()
+        self.rss_before = _peak_rss_bytes()
+        self.wall0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.wall_s = time.perf_counter() - self.wall0
+        self.cpu_s = time.process_time() - self.cpu0
+        self.rss_after = _peak_rss_bytes()
+        self.cuda_peak = None
+        if self.cuda:
+            import torch
+
+            self.cuda_peak = int(torch.cuda.max_memory_allocated())
+        self.failed = exc[0] is not None
+
+    def record(self, task_id: str | None) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "node": self.node_name,
+            "task_id": task_id,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_rss_bytes": self.rss_after,
+            # How much the process high-water mark grew while this node ran
+            "peak_rss_delta_bytes": (
+                self.rss_after - self.rss_before
+                if self.rss_after is not None and self.rss_before is not None
+                else None
+            ),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        if self.cuda_peak is not None:
+            record["cuda_peak_bytes"] = self.cuda_peak
+        if self.failed:
+            record["error"] = True
+        return record
+
+
+def _finish(timer: _NodeTimer, state: Any, update: Any, trace_path: str | None) -> Any:
+    task_id = (update or {}).get("task_id") if isinstance(update, dict) else None
+    record = timer.record(task_id or (state or {}).get("task_id"))
+    if trace_path:
+        append_trace(trace_path, record)
+    if isinstance(update, dict):
+        return {**update, "node_timings": [record]}
+    return update
+
+
+def instrument_node(
+    node_name: str, fn: Callable[..., Any], *, trace_path: str | None = None
+) -> Callable[..., Any]:
+    """Wrap a graph node so each call records its timing into state["node_timings"].
+    Async nodes get an async wrapper (CPU time is process-wide, so it includes concurrent tasks).
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(state: Any) -> Any:
+            timer = _NodeTimer(node_name)
+            try:
+                with timer:
+                    update = await fn(state)
+            except Exception:
+                if trace_path:
+                    append_trace(trace_path, timer.record((state or {}).get("task_id")))
+                raise
+            return _finish(timer, state, update, trace_path)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state: Any) -> Any:
+        timer = _NodeTimer(node_name)
+        try:
+            with timer:
+                update = fn(state)
+        except Exception:
+            # Still trace failed nodes; the exception propagates as usual
+            if trace_path:
+                append_trace(trace_path, timer.record((state or {}).get("task_id")))
+            raise
+        return _finish(timer, state, update, trace_path)
+
+    return wrapper
+
+
+def summarize_timings(node_timings: list[dict[str, Any]]) -> dict[str, Any]:
+    """Per-run breakdown: total wall/CPU seconds and each node's share of wall time."""
+    total_wall = sum(r.get("wall_s", 0.0) for r in node_timings)
+    return {
+        "total_wall_s": round(total_wall, 4),
+        "total_cpu_s": round(sum(r.get("cpu_s", 0.0) for r in node_timings), 4),
+        "peak_rss_bytes": max((r.get("peak_rss_bytes") or 0 for r in node_timings), default=0),
+        "nodes": [
+            {
+                "node": r["node"],
+                "wall_s": r.get("wall_s"),
+                "share": round(r.get("wall_s", 0.0) / total_wall, 3) if total_wall else 0.0,
+            }
+            for r in node_timings
+        ],
+    }
@@ -0,0 +1,107 @@
+# designbridge/keywords.py
+"""Keyword tables for the rule-based requirement analyzer, compiled into one matcher.
+
+Each KeywordTable maps a field (room, style, hint) to values in priority order, each with
+its synonyms. KeywordMatcher compiles every synonym of every table into a single regex
+scanned once over the prompt, so adding terms doesn't add passes over the text. A field
+resolves to its highest-priority value with any synonym present, which is exactly what
+checking the values one by one with `in` would give.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class KeywordTable:
+    """Values of one field in priority order, each with its (lowercase) synonyms."""
+
+    field: str
+    entries: tuple[tuple[str, tuple[str, ...]], ...]
+
+
+ROOM_TABLE = KeywordTable(
+    "room",
+    (
+        ("living_room", ("客廳", "living_room")),
+        ("bedroom", ("臥室", "bedroom")),
+        ("study", ("書房", "study")),
+        ("kitchen", ("廚房", "kitchen")),
+    ),
+)
+
+STYLE_TABLE = KeywordTable(
+    "style",
+    tuple(
+        (style, (style,))
+        for style in ("北歐", "現代", "工業", "簡約", "minimal", "modern", "scandinavian")
+    ),
+)
+
+HINT_TABLES: tuple[KeywordTable, ...] = (
+    KeywordTable("hint_layout", (("layout", ("動線", "布局", "layout", "空間配置")),)),
+    KeywordTable("hint_style", (("style", ("風格", "style", "色彩", "材質")),)),
+    KeywordTable("hint_adjuster", (("adjuster", ("局部", "微調", "單一")),)),
+)
+
+
+def _trie_regex(terms: list[str]) -> str:
+    """Regex for a set of literal terms, factored into a prefix trie.
+
+    Python's re tries alternatives one by one; sharing prefixes means each position only
+    follows the branch of its next character. Optional tails are greedy, so the longest
+    term starting at a position wins.
+    """
+    trie: dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """One-pass matcher over several KeywordTables."""
+
+    def __init__(self, tables: tuple[KeywordTable, ...]) -> None:
+        # term -> [(field, priority, value)]; one term may belong to several fields
+        self._targets: dict[str, list[tuple[str, int, str]]] = {}
+        for table in tables:
+            for priority, (value, synonyms) in enumerate(table.entries):
+                for term in synonyms:
+                    self._targets.setdefault(term.lower(), []).append((table.field, priority, value))
+        terms = list(self._targets)
+        # Zero-width lookahead tries every start position (overlapping matches); the longest
+        # term wins at each position, so also credit the shorter terms it contains
+        self._pattern = re.compile("(?=(" + _trie_regex(terms) + "))") if terms else None
+        self._contained = {t: [u for u in terms if u in t] for t in terms}
+
+    def match(self, text: str) -> dict[str, str]:
+        """Return {field: highest-priority value found} for the (already lowercased) text."""
+        if self._pattern is None:
+            return {}
+        found: set[str] = set()
+        for term in {m.group(1) for m in self._pattern.finditer(text)}:
+            found.update(self._contained[term])
+        best: dict[str, tuple[int, str]] = {}
+        for term in found:
+            for field, priority, value in self._targets[term]:
+                if field not in best or priority < best[field][0]:
+                    best[field] = (priority, value)
+        return {field: value for field, (_, value) in best.items()}
+
+
+REQUIREMENT_MATCHER = KeywordMatcher((ROOM_TABLE, STYLE_TABLE, *HINT_TABLES))
@@ -0,0 +1,345 @@
+# designbridge/models.py
+"""Memory-aware registry of the heavy local models (vision models, diffusion pipelines).
+
+Every loader goes through ModelRegistry.get(name, loader); loads are serialized (one
+model loads at a time, warm-up included), cache hits are not. Entries are kept in LRU order
+with their weight size; when loading a model would exceed the memory budget, the least
+recently used entries are evicted (dropped and reloaded from the on-disk HF cache on next
+use) or, with offload="cpu" on a CUDA machine, moved to CPU RAM until needed again.
+
+Entries may depend on others (the ControlNet pipeline shares the SDXL base's modules):
+using an entry touches its dependencies, and evicting/offloading one also evicts/offloads
+its dependents, since shared weights can't be released or moved independently.
+
+Callers running a model hold a lease (ModelRegistry.lease) so that another thread making
+room for its own model never evicts or offloads one mid-inference.
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from designbridge.config import Config
+
+
+def _torch_modules(obj: Any) -> list[Any]:
+    """torch modules held by a model entry: a module, a (processor, model) tuple or a diffusers pipeline."""
+    try:
+        import torch
+    except ImportError:
+        return []
+    if isinstance(obj, torch.nn.Module):
+        return [obj]
+    if isinstance(obj, (tuple, list)):
+        return [m for item in obj for m in _torch_modules(item)]
+    components = getattr(obj, "components", None)
+    if isinstance(components, dict):
+        return [c for c in components.values() if isinstance(c, torch.nn.Module)]
+    return []
+
+
+def tensor_storage(obj: Any) -> dict[int, int]:
+    """Map storage pointer -> bytes for every parameter/buffer of an entry's torch modules.
+
+    int8 dynamic-quantized layers keep their weights in packed params rather than parameters;
+    those are keyed by the packed-params module (unpacking returns fresh tensors each time).
+    """
+    tensors: dict[int, int] = {}
+    for module in _torch_modules(obj):
+        for t in list(module.parameters()) + list(module.buffers()):
+            tensors[t.data_ptr()] = t.numel() * t.element_size()
+        for sub in module.modules():
+            # The quantized layer delegates _weight_bias to its packed-params child: count the child
+            if hasattr(sub, "_weight_bias") and not hasattr(getattr(sub, "_packed_params", None), "_weight_bias"):
+                packed = [t for t in sub._weight_bias() if t is not None]
+                tensors[id(sub)] = sum(t.numel() * t.element_size() for t in packed)
+    return tensors
+
+
+def _device_of(obj: Any) -> str:
+    for module in _torch_modules(obj):
+        for t in module.parameters():
+            return t.device.type
+    return "cpu"
+
+
+def _move(obj: Any, device: str) -> Any:
+    """Move an entry's modules to device (in place for pipelines and modules)."""
+    if isinstance(obj, tuple):
+        return tuple(_move(item, device) for item in obj)
+    if hasattr(obj, "to") and _torch_modules(obj):
+        return obj.to(device)
+    return obj
+
+
+@dataclass
+class _Entry:
+    name: str
+    obj: Any
+    nbytes: int
+    depends_on: tuple[str, ...] = ()
+    device: str = "cpu"
+    state: str = "resident"  # resident | offloaded
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+    leases: int = 0  # Callers currently running the model (leased entries are never evicted/offloaded)
+
+
+class ModelRegistry:
+    """LRU model cache with a memory budget (budget_bytes=None means unlimited)."""
+
+    def __init__(self, *, budget_bytes: int | None = None, offload: str = "evict") -> None:
+        if offload not in ("evict", "cpu"):
+            raise ValueError(f"offload must be 'evict' or 'cpu', got {offload!r}")
+        self.budget_bytes = budget_bytes
+        self.offload = offload
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._known_sizes: dict[str, int] = {}
+        self._lock = threading.RLock()
+        # One load at a time across all models: first-time transformers/diffusers loads running
+        # concurrently (warm-up thread vs. a live request) race. Reentrant for nested loads
+        # (the ControlNet loader gets the SDXL base).
+        self._load_lock = threading.RLock()
+        self.loads: dict[str, int] = {}
+        self.evictions: dict[str, int] = {}
+        self.offloads: dict[str, int] = {}
+        self.load_seconds: dict[str, float] = {}
+
+    # ---- lookup / load ----
+
+    def get(self, name: str, loader: Callable[[], Any], *, depends_on: tuple[str, ...] = ()) -> Any:
+        """Return the named model, loading it with loader() (after making room) if not resident."""
+        return self._acquire(name, loader, depends_on, lease=False)
+
+    @contextmanager
+    def lease(self, name: str, loader: Callable[[], Any], *, depends_on: tuple[str, ...] = ()) -> Iterator[Any]:
+        """get() that also pins the model (and its dependencies) until the block exits.
+
+        Hold a lease while running inference: another thread making room for its own model
+        then skips this one instead of evicting it or moving it to CPU mid-call.
+        """
+        obj = self._acquire(name, loader, depends_on, lease=True)
+        try:
+            yield obj
+        finally:
+            with self._lock:
+                self._unpin(name)
+
+    def _acquire(self, name: str, loader: Callable[[], Any], depends_on: tuple[str, ...], *, lease: bool) -> Any:
+        obj = self._touch(name, lease=lease)
+        if obj is not None:
+            return obj
+        with self._load_lock:
+            # Another thread may have loaded it while we waited
+            obj = self._touch(name, lease=lease)
+            if obj is not None:
+                return obj
+            # Make room using the size seen on a previous load, so peak memory stays in budget
+            self._make_room(self._known_sizes.get(name, 0), keep={name, *depends_on})
+            t0 = time.perf_counter()
+            obj = loader()
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                # Shared tensors (e.g. ControlNet pipeline -> SDXL base) are charged to their owner
+                owned: dict[int, int] = {}
+                for entry in self._entries.values():
+                    owned.update(tensor_storage(entry.obj))
+                nbytes = sum(b for ptr, b in tensor_storage(obj).items() if ptr not in owned)
+                self._entries[name] = _Entry(name, obj, nbytes, depends_on, _device_of(obj))
+                if lease:
+                    self._pin(name)
+                self._known_sizes[name] = nbytes
+                self.loads[name] = self.loads.get(name, 0) + 1
+                self.load_seconds[name] = round(self.load_seconds.get(name, 0.0) + elapsed, 3)
+                self._make_room(0, keep={name, *depends_on})
+            return obj
+
+    def peek(self, name: str) -> Any:
+        """Return a resident model without touching LRU order or loading it (None if absent)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.obj if entry is not None and entry.state == "resident" else None
+
+    def _touch(self, name: str, *, lease: bool = False) -> Any:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            for dep in entry.depends_on:
+                if dep not in self._entries:
+                    # Dependency was dropped underneath us: reload both
+                    self._drop(name)
+                    return None
+            for dep in (*entry.depends_on, name):
+                self._entries[dep].last_used = time.time()
+                self._entries.move_to_end(dep)
+            if lease:
+                # Pin before restoring, so making room for it can't offload its dependencies
+                self._pin(name)
+            if entry.state == "offloaded":
+                try:
+                    self._restore(name)
+                except BaseException:
+                    if lease:
+                        self._unpin(name)
+                    raise
+            entry.hits += 1
+            return entry.obj
+
+    def _pin(self, name: str) -> None:
+        for leased in (name, *self._entries[name].depends_on):
+            self._entries[leased].leases += 1
+
+    def _unpin(self, name: str) -> None:
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        for leased in (name, *entry.depends_on):
+            if leased in self._entries:
+                self._entries[leased].leases -= 1
+
+    def _leased(self, name: str) -> bool:
+        """Whether name or anything depending on it is in use (so it can't be dropped or moved)."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        return entry.leases > 0 or any(self._leased(d) for d in self._dependents(name))
+
+    # ---- budget ----
+
+    def resident_bytes(self) -> int:
+        """Bytes held by resident entries (offloaded entries don't count against the budget)."""
+        with self._lock:
+            return sum(e.nbytes for e in self._entries.values() if e.state == "resident")
+
+    def _make_room(self, needed: int, *, keep: set[str]) -> None:
+        if self.budget_bytes is None:
+            return
+        with self._lock:
+            for name in list(self._entries):
+                if self.resident_bytes() + needed <= self.budget_bytes:
+                    break
+                entry = self._entries.get(name)
+                if entry is None or name in keep or entry.state != "resident" or self._leased(name):
+                    continue
+                if any(name in self._entries[k].depends_on for k in keep if k in self._entries):
+                    continue
+                if self.offload == "cpu" and entry.device == "cuda":
+                    self._offload(name)
+                else:
+                    self._drop(name)
+            if self.resident_bytes() + needed > self.budget_bytes:
+                print(
+                    f"⚠️  Model memory budget exceeded: {self.resident_bytes() / 2**20:.0f} MB resident "
+                    f"+ {needed / 2**20:.0f} MB needed > {self.budget_bytes / 2**20:.0f} MB"
+                )
+
+    def _dependents(self, name: str) -> list[str]:
+        return [n for n, e in self._entries.items() if name in e.depends_on]
+
+    def _drop(self, name: str) -> None:
+        for dependent in self._dependents(name):
+            self._drop(dependent)
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        self.evictions[name] = self.evictions.get(name, 0) + 1
+        _release_memory()
+
+    def _offload(self, name: str) -> None:
+        for dependent in self._dependents(name):
+            if self._entries[dependent].state == "resident":
+                self._offload(dependent)
+        entry = self._entries[name]
+        entry.obj = _move(entry.obj, "cpu")
+        entry.state = "offloaded"
+        self.offloads[name] = self.offloads.get(name, 0) + 1
+        _release_memory()
+
+    def _restore(self, name: str) -> None:
+        entry = self._entries[name]
+        for dep in entry.depends_on:
+            if self._entries[dep].state == "offloaded":
+                self._restore(dep)
+        self._make_room(entry.nbytes, keep={name, *entry.depends_on})
+        entry.obj = _move(entry.obj, entry.device)
+        entry.state = "resident"
+
+    # ---- management / reporting ----
+
+    def evict(self, name: str) -> bool:
+        """Drop a model (and its dependents). Returns False if it wasn't loaded or is leased."""
+        with self._lock:
+            if name not in self._entries or self._leased(name):
+                return False
+            self._drop(name)
+            return True
+
+    def clear(self) -> None:
+        """Drop every model that isn't leased."""
+        with self._lock:
+            for name in list(self._entries):
+                if name in self._entries and not self._leased(name):
+                    self._drop(name)
+
+    def residency(self) -> dict[str, dict[str, Any]]:
+        """Per-model state (resident/offloaded), size, device and usage, in LRU order (oldest first)."""
+        with self._lock:
+            return {
+                name: {
+                    "state": e.state,
+                    "mb": round(e.nbytes / 2**20, 1),
+                    "device": e.device if e.state == "resident" else "cpu",
+                    "hits": e.hits,
+                    "leases": e.leases,
+                    "depends_on": list(e.depends_on),
+                    "last_used": e.last_used,
+                }
+                for name, e in self._entries.items()
+            }
+
+    def stats(self) -> dict[str, Any]:
+        """Budget, resident size and cumulative load/evict/offload counts per model."""
+        with self._lock:
+            return {
+                "budget_mb": round(self.budget_bytes / 2**20, 1) if self.budget_bytes is not None else None,
+                "resident_mb": round(self.resident_bytes() / 2**20, 1),
+                "offload": self.offload,
+                "loads": dict(self.loads),
+                "evictions": dict(self.evictions),
+                "offloads": dict(self.offloads),
+                "load_seconds": dict(self.load_seconds),
+            }
+
+
+def _release_memory() -> None:
+    gc.collect()
+    try:
+        import sys
+
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+_registry: ModelRegistry | None = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry (budget from Config.MODEL_MEMORY_BUDGET_MB)."""
+    global _registry
+    if _registry is None:
+        budget_mb = Config.MODEL_MEMORY_BUDGET_MB
+        _registry = ModelRegistry(
+            budget_bytes=budget_mb * 1024 * 1024 if budget_mb > 0 else None,
+            offload=Config.MODEL_OFFLOAD,
+        )
+    return _registry
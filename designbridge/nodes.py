@@ -3,23 +3,44 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
+import os
+import tempfile
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, ContextManager, Sequence
 
+from designbridge.cache import ArtifactCache, hash_file, make_key
 from designbridge.config import Config
+from designbridge.gemini_client import GeminiClient, get_gemini_client
+from designbridge.health import CircuitBreaker
+from designbridge.keywords import REQUIREMENT_MATCHER
+from designbridge.models import get_model_registry, tensor_storage
+from designbridge.precision import apply_precision, resolve_precision, torch_dtype
 from designbridge.prompts import REQUIREMENT_ANALYZER_PROMPT
-from designbridge.state import DesignBridgeState, RoutingDecision
+from designbridge.render_queue import RenderQueue
+from designbridge.requirement_cache import RequirementCache
+from designbridge.samplers import configure_pipeline, resolve_sampler
+from designbridge.state import DesignBridgeState, RoutingDecision, UserInput
+from designbridge.uploads import UploadRegistry
 from designbridge.vision import run_visual_preprocessing
 
 
-def requirement_analyzer(state: DesignBridgeState) -> dict[str, Any]:
-    """
-    Parse user_input into structured_requirement (JSON) using Gemini API.
-    Falls back to rule-based if API key not set or API fails.
-    """
+def task_initializer(state: DesignBridgeState) -> dict[str, Any]:
+    """Assign task_id / iteration up front so the parallel branches below share one task_id."""
+    return {
+        "task_id": state.get("task_id") or str(uuid.uuid4()),
+        "iteration": state.get("iteration", 0),
+    }
+
+
+def _requirement_inputs(state: DesignBridgeState) -> tuple[str, float, str, str, int]:
+    """Extract (text_prompt, edit_scope, initial_image, task_id, iteration) from state."""
     user = state.get("user_input") or {}
     text_prompt = (user.get("text_prompt") or "").strip()
     edit_scope = float(user.get("edit_scope", 0.5))
@@ -27,24 +48,188 @@ def requirement_analyzer(state: DesignBridgeState) -> dict[str, Any]:
 
     task_id = state.get("task_id") or str(uuid.uuid4())
     iteration = state.get("iteration", 0)
+    return text_prompt, edit_scope, initial_image, task_id, iteration
+
+
+# Shared Gemini requirement analysis cache (created on first use)
+_requirement_cache: RequirementCache | None = None
+
+
+def _get_requirement_cache() -> RequirementCache | None:
+    """Return the process-wide requirement analysis cache, or None if disabled."""
+    global _requirement_cache
+    if not Config.ENABLE_REQUIREMENT_CACHE:
+        return None
+    if _requirement_cache is None:
+        _requirement_cache = RequirementCache(
+            ttl_s=Config.REQUIREMENT_CACHE_TTL_S,
+            max_entries=Config.REQUIREMENT_CACHE_MAX_ENTRIES,
+            similarity_threshold=Config.REQUIREMENT_CACHE_SIMILARITY,
+            scope_bucket_width=Config.REQUIREMENT_CACHE_SCOPE_BUCKET,
+        )
+    return _requirement_cache
+
+
+def _requirement_cache_args(text_prompt: str, edit_scope: float, initial_image: str) -> tuple[Any, ...]:
+    image_hash = hash_file(initial_image) if _is_valid_image_path(initial_image) else None
+    return text_prompt, edit_scope, image_hash, Config.GEMINI_MODEL
 
-    # Try Gemini API first
+
+def _lookup_requirement(
+    text_prompt: str, edit_scope: float, initial_image: str
+) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    """Return (structured_requirement, requirement_source) from the cache, or None on a miss."""
+    cache = _get_requirement_cache()
+    if cache is None:
+        return None
+    try:
+        hit = cache.get(*_requirement_cache_args(text_prompt, edit_scope, initial_image))
+    except Exception as e:
+        print(f"⚠️  Requirement cache lookup failed ({e})")
+        return None
+    if hit is None:
+        return None
+    requirement = hit.value
+    # Same bucket, not necessarily the same value: keep the requested scope
+    requirement.setdefault("edit_scope", {})["scope_value"] = edit_scope
+    source = {"source": "cache", "match": hit.match, "similarity": hit.similarity, "age_s": hit.age_s}
+    return requirement, source
+
+
+def _store_requirement(text_prompt: str, edit_scope: float, initial_image: str, requirement: dict[str, Any]) -> None:
+    """Cache a Gemini result (rule-based results are cheap and not cached)."""
+    cache = _get_requirement_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(*_requirement_cache_args(text_prompt, edit_scope, initial_image), requirement)
+    except Exception as e:
+        print(f"⚠️  Requirement cache write failed ({e})")
+
+
+def requirement_analyzer(state: DesignBridgeState) -> dict[str, Any]:
+    """
+    Parse user_input into structured_requirement (JSON) using Gemini API.
+    Identical / near-identical requests are served from the requirement cache.
+    Falls back to rule-based if API key not set or API fails.
+    """
+    text_prompt, edit_scope, initial_image, task_id, iteration = _requirement_inputs(state)
+
+    cached = _lookup_requirement(text_prompt, edit_scope, initial_image)
+    if cached is not None:
+        structured_requirement, requirement_source = cached
+    else:
+        # Try Gemini API first
+        try:
+            api_key = Config.get_gemini_api_key()
+            structured_requirement = _call_gemini_requirement_analyzer(
+                text_prompt, edit_scope, initial_image, api_key
+            )
+            requirement_source = {"source": "gemini"}
+            _store_requirement(text_prompt, edit_scope, initial_image, structured_requirement)
+        except (ValueError, Exception) as e:
+            print(f"⚠️  Gemini API not available or failed ({e}), falling back to rule-based")
+            structured_requirement = _rule_based_requirement_analyzer(text_prompt, edit_scope)
+            requirement_source = {"source": "rule_based", "reason": str(e)[:200]}
+
+    return {
+        "task_id": task_id,
+        "iteration": iteration,
+        "structured_requirement": structured_requirement,
+        "requirement_source": requirement_source,
+    }
+
+
+async def _aanalyze_requirement(
+    text_prompt: str, edit_scope: float, initial_image: str
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Cache, then Gemini, then rule-based; returns (structured_requirement, requirement_source)."""
+    cached = await asyncio.to_thread(_lookup_requirement, text_prompt, edit_scope, initial_image)
+    if cached is not None:
+        return cached
     try:
         api_key = Config.get_gemini_api_key()
-        structured_requirement = _call_gemini_requirement_analyzer(
+        structured_requirement = await _acall_gemini_requirement_analyzer(
             text_prompt, edit_scope, initial_image, api_key
         )
+        await asyncio.to_thread(_store_requirement, text_prompt, edit_scope, initial_image, structured_requirement)
+        return structured_requirement, {"source": "gemini"}
     except (ValueError, Exception) as e:
         print(f"⚠️  Gemini API not available or failed ({e}), falling back to rule-based")
         structured_requirement = _rule_based_requirement_analyzer(text_prompt, edit_scope)
+        return structured_requirement, {"source": "rule_based", "reason": str(e)[:200]}
+
+
+async def arequirement_analyzer(state: DesignBridgeState) -> dict[str, Any]:
+    """Async requirement_analyzer: awaits the Gemini call instead of blocking the event loop."""
+    text_prompt, edit_scope, initial_image, task_id, iteration = _requirement_inputs(state)
+    structured_requirement, requirement_source = await _aanalyze_requirement(text_prompt, edit_scope, initial_image)
 
     return {
         "task_id": task_id,
         "iteration": iteration,
         "structured_requirement": structured_requirement,
+        "requirement_source": requirement_source,
     }
 
 
+@dataclass(frozen=True)
+class RequirementBatchResult:
+    """Output of analyze_requirements_batch: one requirement and source per input, in input order."""
+
+    requirements: list[dict[str, Any]]
+    sources: list[dict[str, Any]]
+    elapsed_s: float
+
+    @property
+    def requirements_per_second(self) -> float:
+        return len(self.requirements) / self.elapsed_s if self.elapsed_s > 0 else float("inf")
+
+    def report(self) -> dict[str, Any]:
+        """Aggregate throughput and how many requirements came from each source."""
+        counts: dict[str, int] = {}
+        for source in self.sources:
+            counts[source["source"]] = counts.get(source["source"], 0) + 1
+        return {
+            "count": len(self.requirements),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "requirements_per_second": round(self.requirements_per_second, 2),
+            "sources": counts,
+        }
+
+
+async def aanalyze_requirements_batch(
+    inputs: Sequence[UserInput], *, concurrency: int | None = None
+) -> RequirementBatchResult:
+    """Analyze many user inputs with at most `concurrency` Gemini calls in flight.
+    Identical inputs are analyzed once; each item falls back to rule-based on its own failure.
+    """
+    limit = asyncio.Semaphore(max(1, concurrency or Config.REQUIREMENT_BATCH_CONCURRENCY))
+    keys = [_requirement_inputs({"user_input": user_input})[:3] for user_input in inputs]
+
+    async def analyze(key: tuple[str, float, str]) -> tuple[dict[str, Any], dict[str, Any]]:
+        async with limit:
+            return await _aanalyze_requirement(*key)
+
+    t0 = time.perf_counter()
+    unique = list(dict.fromkeys(keys))
+    results = dict(zip(unique, await asyncio.gather(*(analyze(key) for key in unique))))
+    elapsed = time.perf_counter() - t0
+    # Duplicates get their own copies so callers can mutate one without affecting the others
+    return RequirementBatchResult(
+        requirements=[copy.deepcopy(results[key][0]) for key in keys],
+        sources=[dict(results[key][1]) for key in keys],
+        elapsed_s=elapsed,
+    )
+
+
+def analyze_requirements_batch(
+    inputs: Sequence[UserInput], *, concurrency: int | None = None
+) -> RequirementBatchResult:
+    """Sync aanalyze_requirements_batch (runs its own event loop; await the async one inside async code)."""
+    return asyncio.run(aanalyze_requirements_batch(inputs, concurrency=concurrency))
+
+
 def _is_valid_image_path(image_path: str) -> bool:
     """Return True if image_path is a non-empty, valid file path (not placeholder)."""
     if not image_path or not isinstance(image_path, str):
@@ -55,64 +240,120 @@ def _is_valid_image_path(image_path: str) -> bool:
     return Path(s).is_file()
 
 
+# Gemini file handles of uploaded room photos, reused by content hash (created on first use)
+_upload_registry: UploadRegistry | None = None
+
+
+def _get_upload_registry() -> UploadRegistry:
+    """Return the process-wide Gemini upload registry."""
+    global _upload_registry
+    if _upload_registry is None:
+        _upload_registry = UploadRegistry(
+            ttl_s=Config.GEMINI_UPLOAD_TTL_S,
+            max_side=Config.GEMINI_IMAGE_MAX_SIDE,
+            max_kb=Config.GEMINI_IMAGE_MAX_KB,
+            jpeg_quality=Config.GEMINI_IMAGE_JPEG_QUALITY,
+        )
+    return _upload_registry
+
+
+def _forget_uploaded_image(contents: Any) -> None:
+    """After a failed call, drop a reused file handle so the next call uploads the image again."""
+    if isinstance(contents, list) and _upload_registry is not None:
+        _upload_registry.forget(contents[0])
+
+
+def _prepare_gemini_request(
+    text_prompt: str, edit_scope: float, initial_image: str, api_key: str, deadline: float
+) -> tuple[GeminiClient, Any]:
+    """Get the shared Gemini client and build the contents for the requirement prompt.
+    When initial_image is a valid file path, the image is attached (Gemini Vision, multimodal);
+    oversized photos are downscaled first and an earlier upload of the same image is reused.
+    The upload is abandoned at the deadline (the image is then sent inline).
+    """
+    client = get_gemini_client(api_key)
+
+    prompt = REQUIREMENT_ANALYZER_PROMPT.format(
+        text_prompt=text_prompt,
+        edit_scope=edit_scope,
+        initial_image=initial_image,
+    )
+
+    # Build content: image + text when image path is valid (Gemini Vision)
+    use_vision = _is_valid_image_path(initial_image)
+    if use_vision:
+        uploads = _get_upload_registry()
+        try:
+            uploaded_file = client.run(
+                lambda: uploads.upload(initial_image, client.genai.upload_file, namespace=api_key), deadline=deadline
+            )
+            contents = [uploaded_file, prompt]
+        except Exception:
+            # Fallback: inline image data (e.g. if upload_file fails or is unavailable)
+            contents = [uploads.inline_part(initial_image), prompt]
+    else:
+        contents = prompt
+    return client, contents
+
+
+def _parse_requirement_response(text: str) -> dict[str, Any]:
+    """Extract the RequirementJSON object from a Gemini text response."""
+    text = text.strip()
+    # Remove markdown code blocks if present
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    text = text.strip()
+
+    structured = json.loads(text)
+    return structured
+
+
 def _call_gemini_requirement_analyzer(
     text_prompt: str, edit_scope: float, initial_image: str, api_key: str
 ) -> dict[str, Any]:
     """Call Gemini API to analyze requirements and return structured JSON.
     When initial_image is a valid file path, sends the image to Gemini Vision (multimodal).
+    The whole call (upload included) must finish within Config.GEMINI_LATENCY_BUDGET_S.
     """
     try:
-        import base64
-
-        import google.generativeai as genai
+        deadline = time.monotonic() + Config.GEMINI_LATENCY_BUDGET_S
+        client, contents = _prepare_gemini_request(text_prompt, edit_scope, initial_image, api_key, deadline)
+        try:
+            text = client.generate(contents, deadline=deadline)
+        except Exception:
+            _forget_uploaded_image(contents)
+            raise
+        return _parse_requirement_response(text)
 
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(Config.GEMINI_MODEL)
-
-        prompt = REQUIREMENT_ANALYZER_PROMPT.format(
-            text_prompt=text_prompt,
-            edit_scope=edit_scope,
-            initial_image=initial_image,
+    except ImportError:
+        raise ValueError(
+            "google-generativeai not installed. Run: pip install google-generativeai"
         )
+    except Exception as e:
+        raise RuntimeError(f"Gemini API call failed: {e}")
 
-        # Build content: image + text when image path is valid (Gemini Vision)
-        use_vision = _is_valid_image_path(initial_image)
-        if use_vision:
-            try:
-                uploaded_file = genai.upload_file(path=initial_image)
-                contents = [uploaded_file, prompt]
-            except Exception:
-                # Fallback: inline image data (e.g. if upload_file fails or is unavailable)
-                path = Path(initial_image)
-                suffix = path.suffix.lower()
-                mime_map = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp", ".gif": "image/gif"}
-                mime_type = mime_map.get(suffix, "image/jpeg")
-                img_bytes = path.read_bytes()
-                image_part = {"inline_data": {"mime_type": mime_type, "data": base64.b64encode(img_bytes).decode("ascii")}}
-                contents = [image_part, prompt]
-        else:
-            contents = prompt
 
-        response = model.generate_content(
-            contents,
-            generation_config=genai.GenerationConfig(
-                temperature=Config.GEMINI_TEMPERATURE,
-            ),
+async def _acall_gemini_requirement_analyzer(
+    text_prompt: str, edit_scope: float, initial_image: str, api_key: str
+) -> dict[str, Any]:
+    """Async _call_gemini_requirement_analyzer: image upload runs in a worker thread,
+    the generate call uses Gemini's native async API.
+    """
+    try:
+        deadline = time.monotonic() + Config.GEMINI_LATENCY_BUDGET_S
+        client, contents = await asyncio.to_thread(
+            _prepare_gemini_request, text_prompt, edit_scope, initial_image, api_key, deadline
         )
-
-        # Extract JSON from response
-        text = response.text.strip()
-        # Remove markdown code blocks if present
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.startswith("```"):
-            text = text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
-        text = text.strip()
-
-        structured = json.loads(text)
-        return structured
+        try:
+            text = await client.agenerate(contents, deadline=deadline)
+        except Exception:
+            _forget_uploaded_image(contents)
+            raise
+        return _parse_requirement_response(text)
 
     except ImportError:
         raise ValueError(
@@ -124,29 +365,15 @@ def _call_gemini_requirement_analyzer(
 
 def _rule_based_requirement_analyzer(text_prompt: str, edit_scope: float) -> dict[str, Any]:
     """Fallback rule-based requirement analyzer: produce RequirementJSON structure."""
-    text = text_prompt.lower()
-
-    # Simple keyword extraction
-    room_map = {
-        "客廳": "living_room",
-        "臥室": "bedroom",
-        "書房": "study",
-        "廚房": "kitchen",
-    }
-    for cn, en in room_map.items():
-        if cn in text or en in text:
-            room_type = en
-            break
-    else:
-        room_type = "living_room"
-
-    styles = ["北歐", "現代", "工業", "簡約", "minimal", "modern", "scandinavian"]
-    primary_style = next((s for s in styles if s in text), "現代")
+    # Keyword extraction: room, style and hints in one pass (tables in designbridge/keywords.py)
+    found = REQUIREMENT_MATCHER.match(text_prompt.lower())
+    room_type = found.get("room", "living_room")
+    primary_style = found.get("style", "現代")
 
     # Detect hints
-    hint_layout = any(kw in text for kw in ["動線", "布局", "layout", "空間配置"])
-    hint_style = any(kw in text for kw in ["風格", "style", "色彩", "材質"])
-    hint_adjuster = any(kw in text for kw in ["局部", "微調", "單一"]) or edit_scope < 0.3
+    hint_layout = "hint_layout" in found
+    hint_style = "hint_style" in found
+    hint_adjuster = "hint_adjuster" in found or edit_scope < 0.3
 
     # Determine allowed_operations
     if edit_scope < 0.3:
@@ -206,6 +433,22 @@ def _rule_based_requirement_analyzer(text_prompt: str, edit_scope: float) -> dic
     return structured_requirement
 
 
+# Shared vision artifact cache (created on first use)
+_vision_cache: ArtifactCache | None = None
+
+
+def _get_vision_cache() -> ArtifactCache | None:
+    """Return the process-wide vision artifact cache, or None if disabled."""
+    global _vision_cache
+    if not Config.ENABLE_VISION_CACHE:
+        return None
+    if _vision_cache is None:
+        _vision_cache = ArtifactCache(
+            Config.VISION_CACHE_DIR, max_bytes=Config.VISION_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _vision_cache
+
+
 def visual_preprocessing_local(state: DesignBridgeState) -> dict[str, Any]:
     """Local Visual Preprocessing: run depth + segmentation on the initial image (if provided)."""
     user = state.get("user_input") or {}
@@ -215,6 +458,7 @@ def visual_preprocessing_local(state: DesignBridgeState) -> dict[str, Any]:
         return {"vision_features": {"geometry_constraints": {}}}
 
     task_id = state.get("task_id") or "no_task_id"
+    cache = _get_vision_cache()
     try:
         artifacts = run_visual_preprocessing(
             image_path,
@@ -224,6 +468,9 @@ def visual_preprocessing_local(state: DesignBridgeState) -> dict[str, Any]:
             depth_model=Config.DEPTH_MODEL,
             segmentation_model=Config.SEGMENTATION_MODEL,
             artifacts_root=Path(Config.ARTIFACTS_DIR),
+            cache=cache,
+            concurrent=Config.VISION_CONCURRENT,
+            segmentation_upsample=Config.SEGMENTATION_UPSAMPLE,
         )
     except Exception as e:
         # Keep the workflow usable even if vision dependencies/models aren't available yet.
@@ -237,10 +484,23 @@ def visual_preprocessing_local(state: DesignBridgeState) -> dict[str, Any]:
         vision_features["segmentation"] = artifacts.segmentation_path
     if artifacts.segmentation_meta_path:
         vision_features["segmentation_meta"] = artifacts.segmentation_meta_path
+    if cache is not None:
+        statuses = list(artifacts.cache_status.values())
+        vision_features["cache"] = {
+            **artifacts.cache_status,
+            "hits": statuses.count("hit"),
+            "misses": statuses.count("miss"),
+            "total": cache.stats(),
+        }
 
     return {"vision_features": vision_features}
 
 
+async def avisual_preprocessing_local(state: DesignBridgeState) -> dict[str, Any]:
+    """Async visual_preprocessing_local: model inference runs in a worker thread."""
+    return await asyncio.to_thread(visual_preprocessing_local, state)
+
+
 def _route_decision(state: DesignBridgeState) -> RoutingDecision:
     """
     Design Director: decide routing from structured_requirement + vision_features.
@@ -345,110 +605,435 @@ def _renderer_placeholder_image(out_path: Path, task_id: str, prompt: str) -> No
     img.save(out_path)
 
 
-# Cached SDXL pipeline (loaded once, reused for subsequent renders)
-_sdxl_pipeline: Any = None
-_controlnet_pipeline: Any = None
+# SDXL pipelines live in the model registry (memory budget + LRU eviction).
+# The ControlNet pipeline is a view over the same UNet/VAE/text encoders plus the ControlNet,
+# so plain and depth-guided rendering share one set of SDXL weights; it depends on the
+# SDXL entry and is evicted with it.
+SDXL_ENTRY = "sdxl"
+CONTROLNET_ENTRY = "controlnet"
 
 
 def _get_sdxl_pipeline():
-    """Load SDXL pipeline once and cache it. GPU if available (~15–30s/image), else CPU (slower)."""
-    global _sdxl_pipeline
-    if _sdxl_pipeline is not None:
-        return _sdxl_pipeline
+    """Return the SDXL pipeline from the model registry. GPU if available (~15–30s/image), else CPU (slower).
+    The scheduler / distillation LoRA come from the active sampler profile (Config.SDXL_SAMPLER).
+    """
+    return get_model_registry().get(SDXL_ENTRY, _build_sdxl_pipeline)
+
+
+def _lease_sdxl_pipeline() -> ContextManager[Any]:
+    """_get_sdxl_pipeline, pinned in the registry while a render runs."""
+    return get_model_registry().lease(SDXL_ENTRY, _build_sdxl_pipeline)
+
+
+def _diffusion_precision() -> str:
+    """CPU precision mode for the diffusion models (Config.DIFFUSION_PRECISION; CUDA uses fp16)."""
+    import torch
+
+    return resolve_precision(Config.DIFFUSION_PRECISION, "cuda" if torch.cuda.is_available() else "cpu")
+
+
+def _diffusion_dtype() -> Any:
+    import torch
+
+    return torch.float16 if torch.cuda.is_available() else torch_dtype(_diffusion_precision())
+
+
+def _build_sdxl_pipeline():
     from diffusers import StableDiffusionXLPipeline
     import torch
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    _sdxl_pipeline = StableDiffusionXLPipeline.from_pretrained(
-        Config.SDXL_MODEL,
-        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+    profile = resolve_sampler()
+    pipe = StableDiffusionXLPipeline.from_pretrained(
+        _sdxl_model_name(),
+        torch_dtype=_diffusion_dtype(),
         use_safetensors=True,
     )
-    _sdxl_pipeline = _sdxl_pipeline.to(device)
-    return _sdxl_pipeline
+    pipe = configure_pipeline(pipe, profile).to(device)
+    if _diffusion_precision() == "int8":
+        # Dynamic int8 for the transformer-heavy parts (after any LoRA is fused); VAE stays fp32
+        for name in ("unet", "text_encoder", "text_encoder_2"):
+            if getattr(pipe, name, None) is not None:
+                apply_precision(getattr(pipe, name), "int8")
+    print(f"ℹ️  SDXL pipeline loaded: {pipeline_memory_report(pipe)}")
+    return pipe
 
 
 def _get_controlnet_pipeline():
-    """Load SDXL + ControlNet pipeline once and cache it. Uses depth ControlNet for layout guidance."""
-    global _controlnet_pipeline
-    if _controlnet_pipeline is not None:
-        return _controlnet_pipeline
+    """Return the depth ControlNet pipeline attached to the SDXL base (no second copy of the SDXL weights)."""
+    return get_model_registry().get(CONTROLNET_ENTRY, _build_controlnet_pipeline, depends_on=(SDXL_ENTRY,))
+
+
+def _lease_controlnet_pipeline() -> ContextManager[Any]:
+    """_get_controlnet_pipeline, pinned (with the SDXL base) in the registry while a render runs."""
+    return get_model_registry().lease(CONTROLNET_ENTRY, _build_controlnet_pipeline, depends_on=(SDXL_ENTRY,))
+
+
+def _build_controlnet_pipeline():
     from diffusers import StableDiffusionXLControlNetPipeline, ControlNetModel
     import torch
     device = "cuda" if torch.cuda.is_available() else "cpu"
-    
+    base = _get_sdxl_pipeline()
+
     # Load ControlNet model (depth)
     controlnet = ControlNetModel.from_pretrained(
         Config.CONTROLNET_DEPTH_MODEL,
-        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-    )
-    
-    # Load SDXL pipeline with ControlNet
-    _controlnet_pipeline = StableDiffusionXLControlNetPipeline.from_pretrained(
-        Config.SDXL_MODEL,
-        controlnet=controlnet,
-        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-        use_safetensors=True,
-    )
-    _controlnet_pipeline = _controlnet_pipeline.to(device)
-    return _controlnet_pipeline
+        torch_dtype=_diffusion_dtype(),
+    ).to(device)
+    if _diffusion_precision() == "int8":
+        apply_precision(controlnet, "int8")
+
+    # Reuse the base pipeline's components; only the ControlNet weights are new
+    pipe = StableDiffusionXLControlNetPipeline.from_pipe(base, controlnet=controlnet)
+    print(f"ℹ️  ControlNet attached to shared SDXL base: {pipeline_memory_report(base, pipe)}")
+    return pipe
+
+
+def pipeline_memory_report(sdxl_pipeline: Any = None, controlnet_pipeline: Any = None) -> dict[str, float]:
+    """Weights held by the diffusion pipelines (default: those resident in the registry), in MB.
+
+    resident_mb counts shared tensors once; separate_copies_mb is what the same pipelines
+    would hold if each loaded its own SDXL base (the previous behaviour).
+    """
+    registry = get_model_registry()
+    sdxl_pipeline = sdxl_pipeline or registry.peek(SDXL_ENTRY)
+    controlnet_pipeline = controlnet_pipeline or registry.peek(CONTROLNET_ENTRY)
+    base = tensor_storage(sdxl_pipeline) if sdxl_pipeline is not None else {}
+    controlnet = tensor_storage(controlnet_pipeline) if controlnet_pipeline is not None else {}
+    mb = 1024 * 1024
+    resident = sum({**base, **controlnet}.values())
+    separate = sum(base.values()) + sum(controlnet.values())
+    return {
+        "sdxl_base_mb": round(sum(base.values()) / mb, 1),
+        "controlnet_pipeline_mb": round(sum(controlnet.values()) / mb, 1),
+        "resident_mb": round(resident / mb, 1),
+        "separate_copies_mb": round(separate / mb, 1),
+    }
+
+
+# Shared render queue (created on first use): batches concurrent SDXL renders into one pipe() call
+_render_queue: RenderQueue | None = None
 
 
-def _render_sdxl(prompt: str, out_path: Path, control_image: str | Path | None = None) -> bool:
+def _get_render_queue() -> RenderQueue:
+    """Return the process-wide SDXL render queue."""
+    global _render_queue
+    if _render_queue is None:
+        _render_queue = RenderQueue(
+            _run_sdxl_batch,
+            window_s=Config.RENDER_BATCH_WINDOW_MS / 1000.0,
+            max_batch=Config.RENDER_MAX_BATCH,
+            weight=lambda job: len(job["seeds"]),  # images, so candidates count toward the cap
+        )
+    return _render_queue
+
+
+def _run_sdxl_batch(key: tuple[str, int, int | None], jobs: list[dict[str, Any]]) -> list[list[Any]]:
+    """Render a batch of jobs sharing (pipeline kind, steps, size) in one pipeline call.
+    Each job renders one image per seed; returns the list of images for each job.
+    size None keeps the pipeline's default resolution.
     """
-    Generate image with local SDXL. If control_image is provided and ControlNet is enabled,
-    uses ControlNet pipeline with depth guidance. Returns True on success.
+    import torch
+
+    kind, steps, size = key
+    call_kwargs: dict[str, Any] = {"height": size, "width": size} if size else {}
+    guidance_scale = resolve_sampler().guidance_scale
+    if guidance_scale is not None:
+        call_kwargs["guidance_scale"] = guidance_scale
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    prompts: list[str] = []
+    generators: list[Any] = []
+    control_images: list[Any] = []
+    for job in jobs:
+        for seed in job["seeds"]:
+            prompts.append(job["prompt"])
+            generators.append(torch.Generator(device=device).manual_seed(seed))
+            if kind == "controlnet":
+                control_images.append(job["control_image"])
+
+    if kind == "controlnet":
+        with _lease_controlnet_pipeline() as pipe:
+            images = pipe(
+                prompt=prompts,
+                image=control_images,
+                num_inference_steps=steps,
+                controlnet_conditioning_scale=Config.CONTROLNET_CONDITIONING_SCALE,
+                generator=generators,
+                **call_kwargs,
+            ).images
+    else:
+        with _lease_sdxl_pipeline() as pipe:
+            images = pipe(prompt=prompts, num_inference_steps=steps, generator=generators, **call_kwargs).images
+
+    # Fan the flat batch back out per job
+    results: list[list[Any]] = []
+    start = 0
+    for job in jobs:
+        results.append(images[start : start + len(job["seeds"])])
+        start += len(job["seeds"])
+    return results
+
+
+def _sdxl_model_name() -> str:
+    """SDXL checkpoint in use (the sampler profile may swap in a distilled one)."""
+    return resolve_sampler().model or Config.SDXL_MODEL
+
+
+def _sdxl_steps() -> int:
+    """Inference steps for local SDXL: the sampler profile's steps, else SDXL_STEPS (capped on CPU)."""
+    import torch
+
+    steps = resolve_sampler().steps or Config.SDXL_STEPS
+    if torch.cuda.is_available():
+        return steps
+    return min(steps, Config.SDXL_CPU_MAX_STEPS)
+
+
+def _render_sdxl(
+    prompt: str,
+    out_paths: list[Path],
+    control_image: str | Path | None = None,
+    seeds: list[int] | None = None,
+    steps: int | None = None,
+    size: int | None = None,
+) -> bool:
+    """
+    Generate len(out_paths) images with local SDXL in one batched call (one per seed).
+    If control_image is provided and ControlNet is enabled, uses ControlNet pipeline with
+    depth guidance. steps/size override the defaults (e.g. for low-res previews).
+    Returns True on success.
+    With Config.ENABLE_RENDER_QUEUE, concurrent calls are batched through the render queue.
     """
     try:
-        import torch
         from PIL import Image
         
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        steps = Config.SDXL_STEPS
-        if device == "cpu":
-            steps = min(steps, 20)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+        steps = steps or _sdxl_steps()
+        out_paths[0].parent.mkdir(parents=True, exist_ok=True)
         
         # Use ControlNet if enabled and control_image is provided
+        job: dict[str, Any] = {"prompt": prompt, "seeds": seeds or _make_seeds(None, len(out_paths))}
         if Config.ENABLE_CONTROLNET and control_image and Path(control_image).exists():
-            pipe = _get_controlnet_pipeline()
+            kind = "controlnet"
             control_img = Image.open(control_image).convert("RGB")
             # Resize control image to match SDXL's expected resolution (1024x1024 or similar)
-            control_img = control_img.resize((1024, 1024), Image.Resampling.LANCZOS)
-            
-            image = pipe(
-                prompt=prompt,
-                image=control_img,
-                num_inference_steps=steps,
-                controlnet_conditioning_scale=Config.CONTROLNET_CONDITIONING_SCALE,
-            ).images[0]
+            control_size = size or 1024
+            job["control_image"] = control_img.resize((control_size, control_size), Image.Resampling.LANCZOS)
         else:
             # Fallback to standard SDXL without ControlNet
-            pipe = _get_sdxl_pipeline()
-            image = pipe(prompt=prompt, num_inference_steps=steps).images[0]
-        
-        image.save(str(out_path))
+            kind = "sdxl"
+
+        if Config.ENABLE_RENDER_QUEUE:
+            images = _get_render_queue().submit((kind, steps, size), job).result()
+        else:
+            images = _run_sdxl_batch((kind, steps, size), [job])[0]
+
+        for image, out_path in zip(images, out_paths):
+            image.save(str(out_path))
         return True
     except Exception as e:
         print(f"⚠️  SDXL render failed ({e})")
         return False
 
 
-def renderer(state: DesignBridgeState) -> dict[str, Any]:
+def _make_seeds(base_seed: int | None, count: int) -> list[int]:
+    """Distinct, recorded seeds for count candidates (random base when none is given)."""
+    if base_seed is None:
+        import random
+
+        base_seed = random.randrange(2**31)
+    return [base_seed + i for i in range(count)]
+
+
+def _generate_imagen_bytes(response: Any) -> list[bytes]:
+    """Return the images' bytes from an Imagen generate_images response. Raises if none."""
+    if not response.generated_images:
+        raise RuntimeError("Imagen returned no images")
+    images: list[bytes] = []
+    for gen_img in response.generated_images:
+        if hasattr(gen_img, "image") and gen_img.image is not None and hasattr(gen_img.image, "image_bytes"):
+            images.append(gen_img.image.image_bytes)
+    if not images:
+        raise RuntimeError("Imagen response missing image_bytes")
+    return images
+
+
+def _save_image_bytes(images: list[bytes], out_paths: list[Path]) -> list[Path]:
+    """Save each image to its out_path; returns the paths written."""
+    from io import BytesIO
+    from PIL import Image
+    written: list[Path] = []
+    for image_bytes, out_path in zip(images, out_paths):
+        img = Image.open(BytesIO(image_bytes))
+        img.save(str(out_path))
+        written.append(out_path)
+    return written
+
+
+_genai_client: Any = None
+_genai_client_key: str | None = None
+_imagen_breaker: CircuitBreaker | None = None
+
+
+def _get_genai_client() -> Any:
+    """Return the process-wide google-genai client (rebuilt only if the API key changes)."""
+    global _genai_client, _genai_client_key
+    api_key = Config.get_gemini_api_key()
+    if _genai_client is None or _genai_client_key != api_key:
+        from google import genai
+
+        _genai_client = genai.Client(api_key=api_key)
+        _genai_client_key = api_key
+    return _genai_client
+
+
+def _get_imagen_breaker() -> CircuitBreaker:
+    """Return the process-wide Imagen circuit breaker."""
+    global _imagen_breaker
+    if _imagen_breaker is None:
+        _imagen_breaker = CircuitBreaker(
+            "imagen",
+            failure_threshold=Config.IMAGEN_BREAKER_THRESHOLD,
+            cooldown_s=Config.IMAGEN_BREAKER_COOLDOWN_S,
+        )
+    return _imagen_breaker
+
+
+def _render_imagen(prompt: str, out_paths: list[Path]) -> list[Path]:
+    """Generate len(out_paths) images with one Imagen API call (requires billed account).
+    Returns the paths written. Raises on failure.
     """
-    Renderer: generate image from structured_requirement.
-    Order: Imagen API (if billing) -> local SDXL (free) -> placeholder.
+    from google.genai import types
+
+    client = _get_genai_client()
+    response = client.models.generate_images(
+        model=Config.IMAGEN_MODEL,
+        prompt=prompt,
+        config=types.GenerateImagesConfig(number_of_images=len(out_paths)),
+    )
+    return _save_image_bytes(_generate_imagen_bytes(response), out_paths)
+
+
+async def _arender_imagen(prompt: str, out_paths: list[Path]) -> list[Path]:
+    """Async _render_imagen using the google-genai aio client."""
+    from google.genai import types
+
+    client = _get_genai_client()
+    response = await client.aio.models.generate_images(
+        model=Config.IMAGEN_MODEL,
+        prompt=prompt,
+        config=types.GenerateImagesConfig(number_of_images=len(out_paths)),
+    )
+    return await asyncio.to_thread(_save_image_bytes, _generate_imagen_bytes(response), out_paths)
+
+
+_render_cache: ArtifactCache | None = None
+
+
+def _get_render_cache() -> ArtifactCache | None:
+    """Return the process-wide render result cache, or None if disabled."""
+    global _render_cache
+    if not Config.ENABLE_RENDER_CACHE:
+        return None
+    if _render_cache is None:
+        _render_cache = ArtifactCache(
+            Config.RENDER_CACHE_DIR, max_bytes=Config.RENDER_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _render_cache
+
+
+def _render_cache_key(ctx: dict[str, Any], backend: str) -> str:
+    """Key a render by prompt, backend, model, generation params and (for ControlNet) control image hash.
+    The seed is only part of the key when it is fixed (requested, or carried over from the
+    preview); otherwise any cached sample of the same request is reused and its recorded
+    seeds are reported.
+    """
+    seed = ctx["seeds"][0] if ctx["fixed_seed"] else None
+    if backend == "imagen":
+        return make_key("render", backend, Config.IMAGEN_MODEL, ctx["prompt"], len(ctx["out_paths"]))
+    depth_path = ctx["depth_path"]
+    control_hash = None
+    params: tuple[Any, ...] = ()
+    if Config.ENABLE_CONTROLNET and depth_path and Path(depth_path).exists():
+        control_hash = hash_file(depth_path)
+        params = (Config.CONTROLNET_DEPTH_MODEL, Config.CONTROLNET_CONDITIONING_SCALE)
+    model = _sdxl_model_name()
+    if _diffusion_precision() != "fp32":
+        model = f"{model}@{_diffusion_precision()}"
+    return make_key(
+        "render", backend, model, ctx["prompt"], control_hash, params,
+        resolve_sampler(), _sdxl_steps(), len(ctx["out_paths"]), seed,
+    )
+
+
+def _load_cached_render(ctx: dict[str, Any], backend: str) -> bool:
+    """Copy a cached render for this backend into ctx's out_paths. Returns True on a hit."""
+    cache = _get_render_cache()
+    if cache is None:
+        return False
+    try:
+        key = _render_cache_key(ctx, backend)
+        out_paths: list[Path] = ctx["out_paths"]
+        with tempfile.TemporaryDirectory(dir=out_paths[0].parent) as tmp:
+            cached = cache.get(key, Path(tmp))
+            if not cached:
+                return False
+            meta = json.loads(Path(cached["meta.json"]).read_text(encoding="utf-8"))
+            written = []
+            for i, out_path in enumerate(out_paths[: meta["count"]]):
+                os.replace(cached[f"{i}.png"], out_path)
+                written.append(out_path)
+    except Exception as e:
+        print(f"⚠️  Render cache read failed ({e})")
+        return False
+    ctx["written_paths"] = written
+    ctx["generation_params"]["cache"] = "hit"
+    if meta.get("seeds"):
+        ctx["generation_params"]["seeds"] = meta["seeds"]
+    return True
+
+
+def _store_render(ctx: dict[str, Any], backend: str) -> None:
+    """Store a freshly rendered result (all candidates + seeds) in the render cache."""
+    cache = _get_render_cache()
+    if cache is None:
+        return
+    ctx["generation_params"]["cache"] = "miss"
+    written: list[Path] = ctx["written_paths"]
+    try:
+        with tempfile.TemporaryDirectory(dir=written[0].parent) as tmp:
+            meta_path = Path(tmp) / "meta.json"
+            meta = {"count": len(written), "seeds": ctx["generation_params"].get("seeds")}
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            files: dict[str, str | Path] = {f"{i}.png": p for i, p in enumerate(written)}
+            files["meta.json"] = meta_path
+            cache.put(_render_cache_key(ctx, backend), files)
+    except Exception as e:
+        print(f"⚠️  Render cache write failed ({e})")
+
+
+def _prepare_render(state: DesignBridgeState) -> dict[str, Any]:
+    """Collect everything the renderer needs from state: task_id, output paths, prompt,
+    candidate seeds and ControlNet inputs.
     """
     task_id = state.get("task_id") or str(uuid.uuid4())
     req = state.get("structured_requirement") or {}
+    user = state.get("user_input") or {}
     artifacts_root = Path(Config.ARTIFACTS_DIR)
     render_dir = artifacts_root / "render"
     render_dir.mkdir(parents=True, exist_ok=True)
-    out_path = render_dir / f"{task_id}.png"
+
+    # Candidate 0 keeps the <task_id>.png name; further candidates get a _<i> suffix
+    num_candidates = max(1, int(user.get("num_candidates") or Config.RENDER_NUM_CANDIDATES))
+    out_paths = [render_dir / f"{task_id}.png"] + [
+        render_dir / f"{task_id}_{i}.png" for i in range(1, num_candidates)
+    ]
+    seed = user.get("seed", Config.RENDER_SEED)
+    preview = state.get("render_preview") or {}
+    # Without an explicit seed, reuse the preview's seed so candidate 0 matches the preview
+    base_seed = seed if seed is not None else preview.get("seed")
+    seeds = _make_seeds(None if base_seed is None else int(base_seed), num_candidates)
 
     prompt = _build_imagen_prompt_from_requirement(req)
-    generation_params: dict[str, Any] = {"prompt_preview": prompt[:200]}
-    backend = "placeholder"
-    
+
     # Get vision features for ControlNet (if available)
     vision = state.get("vision_features") or {}
     depth_path = vision.get("depth")
@@ -459,65 +1044,218 @@ def renderer(state: DesignBridgeState) -> dict[str, Any]:
     if seg_path:
         controlnet_inputs["segmentation"] = str(seg_path)
 
-    # 1. Try Imagen (requires billed account)
-    try:
-        api_key = Config.get_gemini_api_key()
-        from google import genai
-        from google.genai import types
+    ctx: dict[str, Any] = {
+        "task_id": task_id,
+        "out_paths": out_paths,
+        "written_paths": [],
+        "seeds": seeds,
+        "fixed_seed": base_seed is not None,
+        "prompt": prompt,
+        "depth_path": depth_path,
+        "controlnet_inputs": controlnet_inputs,
+        "generation_params": {"prompt_preview": prompt[:200], "num_candidates": num_candidates},
+    }
+    if preview:
+        ctx["generation_params"]["preview"] = {
+            k: preview[k] for k in ("image_path", "size", "steps", "latency_s") if k in preview
+        }
+    return ctx
 
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_images(
-            model=Config.IMAGEN_MODEL,
-            prompt=prompt,
-            config=types.GenerateImagesConfig(number_of_images=1),
-        )
-        if response.generated_images:
-            gen_img = response.generated_images[0]
-            if hasattr(gen_img, "image") and gen_img.image is not None and hasattr(gen_img.image, "image_bytes"):
-                from io import BytesIO
-                from PIL import Image
-                img = Image.open(BytesIO(gen_img.image.image_bytes))
-                img.save(str(out_path))
-                backend = "imagen"
-                generation_params["model"] = Config.IMAGEN_MODEL
-            else:
-                raise RuntimeError("Imagen response missing image_bytes")
-        else:
-            raise RuntimeError("Imagen returned no images")
-    except Exception as e:
-        print(f"⚠️  Imagen render failed ({e})")
-        generation_params["imagen_error"] = str(e)
+
+def _finish_render(ctx: dict[str, Any], backend: str) -> dict[str, Any]:
+    """Run the local fallbacks (SDXL, then placeholder) if needed and build the renderer state update."""
+    task_id = ctx["task_id"]
+    out_paths: list[Path] = ctx["out_paths"]
+    prompt: str = ctx["prompt"]
+    depth_path = ctx["depth_path"]
+    generation_params: dict[str, Any] = ctx["generation_params"]
 
     # 2. If Imagen failed, try local SDXL (free, with ControlNet if depth available)
     if backend == "placeholder" and Config.ENABLE_SDXL_FALLBACK:
         # Use depth image for ControlNet guidance if available
         control_img = depth_path if depth_path and Path(depth_path).exists() else None
-        if _render_sdxl(prompt, out_path, control_image=control_img):
+        if _load_cached_render(ctx, "sdxl"):
             backend = "sdxl"
-            generation_params["model"] = Config.SDXL_MODEL
-            if control_img:
-                generation_params["controlnet"] = "depth"
-                generation_params["controlnet_scale"] = Config.CONTROLNET_CONDITIONING_SCALE
+        elif _render_sdxl(prompt, out_paths, control_image=control_img, seeds=ctx["seeds"]):
+            backend = "sdxl"
+            ctx["written_paths"] = out_paths
+            generation_params["seeds"] = ctx["seeds"]
+            _store_render(ctx, backend)
         else:
             generation_params["sdxl_error"] = "SDXL render failed"
+        if backend == "sdxl":
+            generation_params["model"] = _sdxl_model_name()
+            generation_params["steps"] = _sdxl_steps()
+            generation_params["sampler"] = resolve_sampler().describe()
+            generation_params["precision"] = _diffusion_precision()
+            if control_img and Config.ENABLE_CONTROLNET:
+                generation_params["controlnet"] = "depth"
+                generation_params["controlnet_scale"] = Config.CONTROLNET_CONDITIONING_SCALE
 
     # 3. Fallback to placeholder
     if backend == "placeholder":
-        _renderer_placeholder_image(out_path, task_id, prompt)
+        _renderer_placeholder_image(out_paths[0], task_id, prompt)
+        ctx["written_paths"] = out_paths[:1]
         generation_params["fallback"] = "placeholder"
 
     generation_params["backend"] = backend
-    path_str = str(out_path)
+    candidate_paths = [str(p) for p in ctx["written_paths"]]
+    path_str = candidate_paths[0]
     render_result: dict[str, Any] = {
         "generated_image_path": path_str,
+        "candidate_paths": candidate_paths,
         "generation_params": generation_params,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
     # Add controlnet_inputs if any were used
-    if controlnet_inputs:
-        render_result["controlnet_inputs"] = controlnet_inputs
-    
+    if ctx["controlnet_inputs"]:
+        render_result["controlnet_inputs"] = ctx["controlnet_inputs"]
+
     return {
         "generated_image": path_str,
         "render_result": render_result,
     }
+
+
+def _imagen_expected() -> bool:
+    """Whether the renderer will try Imagen first (API key set, circuit not open). Doesn't consume a trial."""
+    breaker = _get_imagen_breaker()
+    return bool(Config.GEMINI_API_KEY) and not (breaker.state == "open" and breaker.retry_in_s() > 0)
+
+
+def _preview_enabled(state: DesignBridgeState) -> bool:
+    user = state.get("user_input") or {}
+    if not (user.get("preview", Config.ENABLE_RENDER_PREVIEW) and Config.ENABLE_SDXL_FALLBACK):
+        return False
+    # The preview is an SDXL render: when Imagen serves the final image it would load SDXL for nothing
+    return not _imagen_expected()
+
+
+def preview_renderer(state: DesignBridgeState) -> dict[str, Any]:
+    """
+    Preview renderer (two-phase render, phase 1): fast low-res, low-step SDXL render of
+    candidate 0, written to state["render_preview"] so streaming callers can show it while
+    the full-quality render runs. No-op unless enabled (user_input["preview"] or Config), and
+    while Imagen is expected to serve the final render.
+    """
+    if not _preview_enabled(state):
+        return {}
+    ctx = _prepare_render(state)
+    out_path = ctx["out_paths"][0].with_name(f"{ctx['task_id']}_preview.png")
+    depth_path = ctx["depth_path"]
+    control_img = depth_path if depth_path and Path(depth_path).exists() else None
+
+    # Few-step samplers already need fewer steps than the preview default
+    preview_steps = min(Config.PREVIEW_STEPS, _sdxl_steps())
+    t0 = time.perf_counter()
+    ok = _render_sdxl(
+        ctx["prompt"],
+        [out_path],
+        control_image=control_img,
+        seeds=ctx["seeds"][:1],
+        steps=preview_steps,
+        size=Config.PREVIEW_SIZE,
+    )
+    latency_s = time.perf_counter() - t0
+    if not ok:
+        return {}
+    return {
+        "render_preview": {
+            "image_path": str(out_path),
+            "size": Config.PREVIEW_SIZE,
+            "steps": preview_steps,
+            "seed": ctx["seeds"][0],
+            "latency_s": round(latency_s, 4),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+    }
+
+
+async def apreview_renderer(state: DesignBridgeState) -> dict[str, Any]:
+    """Async preview_renderer (local SDXL runs in a worker thread)."""
+    if not _preview_enabled(state):
+        return {}
+    return await asyncio.to_thread(preview_renderer, state)
+
+
+def _imagen_allowed(ctx: dict[str, Any]) -> bool:
+    """Ask the Imagen circuit breaker; while it is open, record the skip and go straight to SDXL."""
+    breaker = _get_imagen_breaker()
+    if breaker.allow():
+        return True
+    retry_in = breaker.retry_in_s()
+    print(f"ℹ️  Imagen circuit open, skipping to local fallback (retry in {retry_in:.0f}s)")
+    ctx["generation_params"]["imagen_skipped"] = {"reason": "circuit_open", "retry_in_s": round(retry_in, 1)}
+    return False
+
+
+def _record_imagen_seeds(ctx: dict[str, Any]) -> None:
+    """Imagen takes no seed through the Gemini API: record every candidate as unseeded (not reproducible)."""
+    ctx["generation_params"]["seeds"] = [None] * len(ctx["written_paths"])
+    ctx["generation_params"]["seed_control"] = "unsupported"
+
+
+def _record_imagen_failure(ctx: dict[str, Any], error: Exception) -> None:
+    print(f"⚠️  Imagen render failed ({error})")
+    ctx["generation_params"]["imagen_error"] = str(error)
+    _get_imagen_breaker().record_failure(error)
+
+
+def renderer(state: DesignBridgeState) -> dict[str, Any]:
+    """
+    Renderer: generate num_candidates images from structured_requirement in one batched call.
+    Order: Imagen API (if billing) -> local SDXL (free) -> placeholder.
+    Imagen is skipped while its circuit breaker is open (repeated or billing/quota/auth failures).
+    """
+    ctx = _prepare_render(state)
+    backend = "placeholder"
+
+    # 1. Try Imagen (requires billed account); identical requests are served from the render cache
+    if _load_cached_render(ctx, "imagen"):
+        backend = "imagen"
+        ctx["generation_params"]["model"] = Config.IMAGEN_MODEL
+        _record_imagen_seeds(ctx)
+        return _finish_render(ctx, backend)
+    if _imagen_allowed(ctx):
+        try:
+            ctx["written_paths"] = _render_imagen(ctx["prompt"], ctx["out_paths"])
+            _get_imagen_breaker().record_success()
+            backend = "imagen"
+            ctx["generation_params"]["model"] = Config.IMAGEN_MODEL
+            _record_imagen_seeds(ctx)
+            _store_render(ctx, backend)
+        except Exception as e:
+            _record_imagen_failure(ctx, e)
+        except BaseException:
+            # Cancelled (e.g. CancelledError) or interrupted: free the half-open trial and propagate
+            _get_imagen_breaker().release()
+            raise
+
+    return _finish_render(ctx, backend)
+
+
+async def arenderer(state: DesignBridgeState) -> dict[str, Any]:
+    """Async renderer: awaits Imagen; SDXL / placeholder rendering runs in a worker thread."""
+    ctx = await asyncio.to_thread(_prepare_render, state)
+    backend = "placeholder"
+
+    if await asyncio.to_thread(_load_cached_render, ctx, "imagen"):
+        ctx["generation_params"]["model"] = Config.IMAGEN_MODEL
+        _record_imagen_seeds(ctx)
+        return await asyncio.to_thread(_finish_render, ctx, "imagen")
+    if _imagen_allowed(ctx):
+        try:
+            ctx["written_paths"] = await _arender_imagen(ctx["prompt"], ctx["out_paths"])
+            _get_imagen_breaker().record_success()
+            backend = "imagen"
+            ctx["generation_params"]["model"] = Config.IMAGEN_MODEL
+            _record_imagen_seeds(ctx)
+            await asyncio.to_thread(_store_render, ctx, backend)
+        except Exception as e:
+            _record_imagen_failure(ctx, e)
+        except BaseException:
+            # Cancelled (e.g. CancelledError) or interrupted: free the half-open trial and propagate
+            _get_imagen_breaker().release()
+            raise
+
+    return await asyncio.to_thread(_finish_render, ctx, backend)
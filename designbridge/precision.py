@@ -0,0 +1,69 @@
+# designbridge/precision.py
+"""Reduced-precision CPU inference modes for the local models.
+
+- "fp32": full precision (default).
+- "bf16": weights and activations in bfloat16 (fast on CPUs with AVX512-BF16 / AMX,
+  half the weight memory everywhere).
+- "int8": dynamic int8 quantization of nn.Linear layers (weights int8, activations
+  quantized on the fly); convolutions stay fp32.
+
+Modes only apply on CPU; CUDA keeps its existing dtypes (fp32 vision, fp16 diffusion).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+PRECISIONS: tuple[str, ...] = ("fp32", "bf16", "int8")
+
+
+def resolve_precision(mode: str, device: str) -> str:
+    """Validate a precision mode; CUDA always resolves to "fp32" (the existing CUDA path)."""
+    if mode not in PRECISIONS:
+        print(f"⚠️  Unknown precision '{mode}', using fp32")
+        return "fp32"
+    return "fp32" if device == "cuda" else mode
+
+
+def torch_dtype(mode: str) -> Any:
+    """Weight dtype to load with for a mode (int8 loads fp32, then quantizes)."""
+    import torch
+
+    return torch.bfloat16 if mode == "bf16" else torch.float32
+
+
+def apply_precision(module: Any, mode: str) -> Any:
+    """Convert an nn.Module to the given mode (in place where possible) and return it."""
+    import torch
+
+    if mode == "bf16":
+        return module.to(torch.bfloat16)
+    if mode == "int8":
+        return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return module
+
+
+def model_dtype(module: Any) -> Any:
+    """dtype of the module's first floating-point parameter (inputs are cast to it)."""
+    import torch
+
+    for p in module.parameters():
+        if p.is_floating_point():
+            return p.dtype
+    return torch.float32
+
+
+def cast_inputs(inputs: dict[str, Any], dtype: Any) -> dict[str, Any]:
+    """Cast floating-point model inputs (e.g. pixel_values) to dtype."""
+    return {k: v.to(dtype) if v.is_floating_point() else v for k, v in inputs.items()}
+
+
+def weight_bytes(module: Any) -> int:
+    """Serialized size of a module's state_dict (counts int8 packed weights, unlike parameters())."""
+    import io
+
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.tell()
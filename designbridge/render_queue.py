@@ -0,0 +1,117 @@
+# designbridge/render_queue.py
+"""Request-batching queue in front of the local diffusion pipelines.
+
+Renderer calls submit one job each and block on a Future. A single worker thread collects
+the jobs that arrive within a short window, groups them by key (pipeline type, step count),
+runs each group as one batched pipeline call and hands every caller its own result.
+max_batch bounds the summed job weight (e.g. images per job), not the number of jobs.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+
+@dataclass
+class _Job:
+    key: Hashable
+    payload: Any
+    future: Future = field(default_factory=Future)
+
+
+class RenderQueue:
+    """Collect jobs for up to window_s, then run them in batches of at most max_batch weight.
+
+    weight(payload) is a job's share of the batch (default 1 per job); a job heavier than
+    max_batch still runs, alone.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, list[Any]], list[Any]],
+        *,
+        window_s: float = 0.05,
+        max_batch: int = 4,
+        weight: Callable[[Any], int] | None = None,
+    ) -> None:
+        self._run_batch = run_batch
+        self.window_s = window_s
+        self.max_batch = max(1, max_batch)
+        self._weight = weight or (lambda payload: 1)
+        self._pending: queue.Queue[_Job] = queue.Queue()
+        # A job that didn't fit the previous batch; it opens the next one
+        self._carry: _Job | None = None
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self.jobs = 0
+        self.batches = 0
+
+    def submit(self, key: Hashable, payload: Any) -> Future:
+        """Queue one job; the Future resolves to run_batch's result for this payload."""
+        job = _Job(key, payload)
+        self._pending.put(job)
+        self._ensure_worker()
+        return job.future
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, name="render-queue", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list[_Job]:
+        """Block for the first job, then gather more until the window closes or the batch is full."""
+        first, self._carry = self._carry or self._pending.get(), None
+        jobs = [first]
+        total = self._weight(first.payload)
+        deadline = time.monotonic() + self.window_s
+        while total < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            weight = self._weight(job.payload)
+            if total + weight > self.max_batch:
+                self._carry = job
+                break
+            jobs.append(job)
+            total += weight
+        return jobs
+
+    def _loop(self) -> None:
+        while True:
+            groups: dict[Hashable, list[_Job]] = {}
+            for job in self._collect():
+                groups.setdefault(job.key, []).append(job)
+            for key, jobs in groups.items():
+                self._run_group(key, jobs)
+
+    def _run_group(self, key: Hashable, jobs: list[_Job]) -> None:
+        try:
+            results = self._run_batch(key, [job.payload for job in jobs])
+            if len(results) != len(jobs):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(jobs)} jobs")
+        except Exception as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        self.jobs += len(jobs)
+        self.batches += 1
+        for job, result in zip(jobs, results):
+            job.future.set_result(result)
+
+    def stats(self) -> dict[str, float]:
+        """Jobs served, batched calls made, and the average batch size."""
+        return {
+            "jobs": self.jobs,
+            "batches": self.batches,
+            "avg_batch_size": round(self.jobs / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,186 @@
+# designbridge/requirement_cache.py
+"""In-process cache of Gemini requirement analysis results.
+
+Exact hits key on (normalized text_prompt, edit_scope bucket, image content hash, model).
+Near-duplicates (same bucket / image / model, slightly different wording) are opt-in
+(similarity_threshold < 1.0). They are found through a character n-gram index and accepted
+above a Jaccard similarity threshold, and only if both prompts name the same rooms, styles,
+colours and negations: one swapped keyword (北歐 -> 日式, 淺灰 -> 深灰, 換成 -> 不換成) barely
+moves the similarity but changes the requirement. Entries expire after ttl_s and the least
+recently used ones are evicted beyond max_entries.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from designbridge.keywords import ROOM_TABLE, STYLE_TABLE
+
+# Whitespace and punctuation (ASCII + CJK) are ignored when comparing prompts
+_PUNCT_RE = re.compile(r"[\s\u3000-\u303f\uff00-\uff0f\uff1a-\uff20!-/:-@\[-`{-~]+")
+
+
+def normalize_prompt(text: str) -> str:
+    """NFKC-normalize, lowercase and drop whitespace/punctuation."""
+    return _PUNCT_RE.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def char_ngrams(text: str, n: int = 2) -> frozenset[str]:
+    """Character n-grams of a normalized prompt (bigrams suit Chinese text without tokenization)."""
+    if len(text) <= n:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i : i + n] for i in range(len(text) - n + 1))
+
+
+def _terms_regex(terms: list[str]) -> re.Pattern[str]:
+    # Longest first, so 淺灰色 is one term rather than 淺 + 灰
+    return re.compile("|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)))
+
+
+_COLOURS = ["白", "黑", "灰", "紅", "橙", "橘", "黃", "綠", "藍", "紫", "粉", "棕", "褐", "咖啡", "米", "金", "銀", "原木",
+            "white", "black", "gray", "grey", "red", "orange", "yellow", "green", "blue", "purple", "pink",
+            "brown", "beige", "gold", "silver"]
+_SHADES = ["", "淺", "深", "亮", "暗", "淡", "霧", "light", "dark", "pale"]
+# Terms that must agree between a prompt and its near-duplicate: rooms and styles (the analyzer's
+# own tables plus common styles it doesn't map), shaded colours, and negations
+_GUARD_RE = _terms_regex(
+    [term for table in (ROOM_TABLE, STYLE_TABLE) for _, synonyms in table.entries for term in synonyms]
+    + ["日式", "和風", "美式", "法式", "英式", "中式", "新中式", "韓系", "無印", "侘寂", "鄉村", "復古", "奢華", "輕奢",
+       "地中海", "japanese", "industrial", "rustic", "vintage", "luxury", "bohemian", "wabi"]
+    + [shade + colour + suffix for shade in _SHADES for colour in _COLOURS for suffix in ("", "色")]
+    + ["不", "沒", "別", "勿", "無", "非", "no", "not", "dont", "without"]
+)
+
+
+def keyword_signature(normalized: str) -> tuple[str, ...]:
+    """Sorted guard terms (with repeats) of a normalized prompt; near matches need equal signatures."""
+    return tuple(sorted(_GUARD_RE.findall(normalized)))
+
+
+def scope_bucket(edit_scope: float, width: float) -> int:
+    """Bucket index of edit_scope (e.g. width 0.1: 0.60-0.69 -> 6)."""
+    return int(math.floor(round(edit_scope / width, 6)))
+
+
+@dataclass
+class _Entry:
+    partition: tuple[Any, ...]  # (scope bucket, image hash, model): near matches stay within it
+    normalized: str
+    grams: frozenset[str]
+    signature: tuple[str, ...]
+    value: dict[str, Any]
+    created: float
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """A cache hit: the stored requirement plus how it matched."""
+
+    value: dict[str, Any]
+    match: str  # "exact" | "near"
+    similarity: float
+    age_s: float
+
+
+class RequirementCache:
+    """TTL + LRU bounded cache with exact and n-gram near-duplicate lookup."""
+
+    def __init__(
+        self,
+        *,
+        ttl_s: float = 86400.0,
+        max_entries: int = 512,
+        similarity_threshold: float = 1.0,
+        scope_bucket_width: float = 0.1,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, max_entries)
+        self.similarity_threshold = similarity_threshold
+        self.scope_bucket_width = scope_bucket_width
+        self._entries: OrderedDict[tuple[Any, ...], _Entry] = OrderedDict()
+        self._index: dict[str, set[tuple[Any, ...]]] = {}
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "near": 0}
+        self.misses = 0
+
+    def _key(self, text_prompt: str, edit_scope: float, image_hash: str | None, model: str) -> tuple[tuple[Any, ...], str]:
+        normalized = normalize_prompt(text_prompt)
+        partition = (scope_bucket(edit_scope, self.scope_bucket_width), image_hash, model)
+        return (*partition, normalized), normalized
+
+    def get(self, text_prompt: str, edit_scope: float, image_hash: str | None, model: str) -> CacheLookup | None:
+        """Exact match first, then (if enabled) the most similar near-duplicate above the threshold."""
+        key, normalized = self._key(text_prompt, edit_scope, image_hash, model)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            match, similarity = "exact", 1.0
+            if entry is None and self.similarity_threshold < 1.0:
+                entry, similarity = self._nearest(key[:3], char_ngrams(normalized), keyword_signature(normalized))
+                match = "near"
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry.partition + (entry.normalized,))
+            self.hits[match] += 1
+            return CacheLookup(copy.deepcopy(entry.value), match, round(similarity, 4), round(now - entry.created, 1))
+
+    def _nearest(
+        self, partition: tuple[Any, ...], grams: frozenset[str], signature: tuple[str, ...]
+    ) -> tuple[_Entry | None, float]:
+        candidates: set[tuple[Any, ...]] = set()
+        for gram in grams:
+            candidates |= self._index.get(gram, set())
+        best, best_sim = None, 0.0
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.partition != partition or entry.signature != signature:
+                continue
+            sim = len(grams & entry.grams) / len(grams | entry.grams)
+            if sim > best_sim:
+                best, best_sim = entry, sim
+        if best is None or best_sim < self.similarity_threshold:
+            return None, 0.0
+        return best, best_sim
+
+    def put(self, text_prompt: str, edit_scope: float, image_hash: str | None, model: str, value: dict[str, Any]) -> None:
+        key, normalized = self._key(text_prompt, edit_scope, image_hash, model)
+        entry = _Entry(
+            key[:3], normalized, char_ngrams(normalized), keyword_signature(normalized), copy.deepcopy(value), time.time()
+        )
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            for gram in entry.grams:
+                self._index.setdefault(gram, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple[Any, ...]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            keys = self._index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
+
+    def _expire(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if now - e.created > self.ttl_s]
+        for key in expired:
+            self._remove(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": dict(self.hits), "misses": self.misses}
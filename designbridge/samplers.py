@@ -0,0 +1,111 @@
+# designbridge/samplers.py
+"""Sampler profiles for the local SDXL fallback.
+
+A profile bundles the scheduler, step count, guidance scale and optional few-step
+distillation (LCM LoRA or an SDXL-Turbo checkpoint). Select one with
+DESIGNBRIDGE_SDXL_SAMPLER; individual fields can be overridden through Config.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from designbridge.config import Config
+
+# Scheduler name -> (diffusers class name, from_config overrides)
+SCHEDULERS: dict[str, tuple[str, dict[str, Any]]] = {
+    "euler": ("EulerDiscreteScheduler", {}),
+    "euler_a": ("EulerAncestralDiscreteScheduler", {}),
+    "euler_a_trailing": ("EulerAncestralDiscreteScheduler", {"timestep_spacing": "trailing"}),
+    "dpmpp_2m": ("DPMSolverMultistepScheduler", {}),
+    "dpmpp_2m_karras": ("DPMSolverMultistepScheduler", {"use_karras_sigmas": True}),
+    "unipc": ("UniPCMultistepScheduler", {}),
+    "ddim": ("DDIMScheduler", {}),
+    "lcm": ("LCMScheduler", {}),
+}
+
+
+@dataclass(frozen=True)
+class SamplerProfile:
+    """How the SDXL fallback samples: scheduler, steps, guidance and distillation weights."""
+
+    name: str
+    scheduler: Optional[str] = None  # Key of SCHEDULERS; None keeps the checkpoint's scheduler
+    steps: Optional[int] = None  # None = Config.SDXL_STEPS
+    guidance_scale: Optional[float] = None  # None = pipeline default (5.0)
+    lora: Optional[str] = None  # Distillation LoRA fused into the UNet (e.g. LCM-LoRA)
+    model: Optional[str] = None  # Checkpoint override (e.g. SDXL-Turbo); None = Config.SDXL_MODEL
+
+    def describe(self) -> dict[str, Any]:
+        """Fields recorded in generation_params."""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+PRESETS: dict[str, SamplerProfile] = {
+    "default": SamplerProfile("default"),
+    "dpmpp_2m_karras": SamplerProfile("dpmpp_2m_karras", scheduler="dpmpp_2m_karras", steps=15),
+    "unipc": SamplerProfile("unipc", scheduler="unipc", steps=12),
+    "lcm_lora": SamplerProfile(
+        "lcm_lora", scheduler="lcm", steps=4, guidance_scale=1.0, lora="latent-consistency/lcm-lora-sdxl"
+    ),
+    "turbo": SamplerProfile(
+        "turbo", scheduler="euler_a_trailing", steps=2, guidance_scale=0.0, model="stabilityai/sdxl-turbo"
+    ),
+}
+
+
+# Config problems already reported (resolve_sampler runs on every render)
+_warned: set[str] = set()
+
+
+def _warn_once(message: str) -> None:
+    if message not in _warned:
+        _warned.add(message)
+        print(message)
+
+
+def resolve_sampler() -> SamplerProfile:
+    """The active profile: Config.SDXL_SAMPLER preset plus any per-field Config overrides.
+
+    Unknown preset or scheduler names fall back to the default / the preset's scheduler,
+    with one warning per bad value.
+    """
+    profile = PRESETS.get(Config.SDXL_SAMPLER)
+    if profile is None:
+        _warn_once(f"⚠️  Unknown SDXL sampler '{Config.SDXL_SAMPLER}', using default")
+        profile = PRESETS["default"]
+    overrides: dict[str, Any] = {}
+    if Config.SDXL_SCHEDULER:
+        if Config.SDXL_SCHEDULER in SCHEDULERS:
+            overrides["scheduler"] = Config.SDXL_SCHEDULER
+        else:
+            _warn_once(
+                f"⚠️  Unknown SDXL scheduler '{Config.SDXL_SCHEDULER}', "
+                f"using {profile.scheduler or 'the checkpoint default'} (choices: {', '.join(SCHEDULERS)})"
+            )
+    if Config.SDXL_GUIDANCE_SCALE is not None:
+        overrides["guidance_scale"] = Config.SDXL_GUIDANCE_SCALE
+    if Config.SDXL_LORA:
+        overrides["lora"] = Config.SDXL_LORA
+    return replace(profile, **overrides) if overrides else profile
+
+
+def configure_pipeline(pipe: Any, profile: SamplerProfile) -> Any:
+    """Swap in the profile's scheduler and fuse its distillation LoRA (in place).
+
+    A scheduler this diffusers install doesn't have keeps the checkpoint's own (one warning).
+    """
+    if profile.scheduler:
+        import diffusers
+
+        class_name, kwargs = SCHEDULERS.get(profile.scheduler, (None, {}))
+        scheduler_cls = getattr(diffusers, class_name, None) if class_name else None
+        if scheduler_cls is None:
+            _warn_once(f"⚠️  SDXL scheduler '{profile.scheduler}' unavailable, keeping the checkpoint's scheduler")
+        else:
+            pipe.scheduler = scheduler_cls.from_config(pipe.scheduler.config, **kwargs)
+    if profile.lora:
+        pipe.load_lora_weights(profile.lora)
+        pipe.fuse_lora()
+    return pipe
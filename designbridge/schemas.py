@@ -82,6 +82,7 @@ class VisionJSON(TypedDict):
     depth: NotRequired[str | Any]  # path or tensor
     geometry_constraints: NotRequired[dict[str, Any]]  # Immutable regions, spatial relations
     scene_objects: NotRequired[list[dict[str, Any]]]  # Detected objects for cross-validation
+    cache: NotRequired[dict[str, Any]]  # {"depth": "hit", "segmentation": "miss", "hits": 1, "misses": 1, "total": {...}}
 
 
 # ========== Task/Plan JSON ==========
@@ -129,11 +130,22 @@ class AdjustPlanJSON(TypedDict):
 class RenderResultJSON(TypedDict):
     """Output of Renderer: generated image + metadata."""
 
-    generated_image_path: str
-    generation_params: dict[str, Any]  # Model, seed, steps, etc.
+    generated_image_path: str  # First candidate
+    candidate_paths: NotRequired[list[str]]  # All candidates rendered for this task (first == generated_image_path)
+    generation_params: dict[str, Any]  # Model, seeds, steps, etc.
     controlnet_inputs: NotRequired[dict[str, str]]  # {"depth": ..., "segmentation": ...}
     timestamp: str
 
+class RenderPreviewJSON(TypedDict):
+    """Output of Preview Renderer: fast low-res preview of the first candidate."""
+
+    image_path: str
+    size: int  # Square preview resolution (px)
+    steps: int
+    seed: int  # Shared with the full render's first candidate
+    latency_s: float
+    timestamp: str
+
 # ========== Eval/Feedback JSON ==========
 class EvalFeedbackJSON(TypedDict):
     """Output of Evaluator: scores and decision."""
@@ -1,12 +1,14 @@
 # designbridge/state.py
 """DesignBridge LangGraph state schema per DesignBridge.md."""
 
-from typing import Any, Literal
+import operator
+from typing import Annotated, Any, Literal
 from typing_extensions import NotRequired, TypedDict
 
 from designbridge.schemas import (
     EvalFeedbackJSON,
     RequirementJSON,
+    RenderPreviewJSON,
     RenderResultJSON,
     SceneGraphJSON,
     StyleParamsJSON,
@@ -24,6 +26,9 @@ class UserInput(TypedDict):
     initial_image: NotRequired[str]  # image_path_or_id, optional for empty layout
     text_prompt: str
     edit_scope: float  # 0~1
+    num_candidates: NotRequired[int]  # images rendered per task (default Config.RENDER_NUM_CANDIDATES)
+    seed: NotRequired[int]  # base render seed; candidate i uses seed + i
+    preview: NotRequired[bool]  # low-res preview before the full render (default Config.ENABLE_RENDER_PREVIEW)
 
 
 class DesignBridgeState(TypedDict):
@@ -35,6 +40,9 @@ class DesignBridgeState(TypedDict):
     user_input: NotRequired[UserInput]
     # Requirement Analyzer output (RequirementJSON)
     structured_requirement: NotRequired[RequirementJSON]
+    # Where structured_requirement came from: {"source": "gemini" | "cache" | "rule_based", ...}
+    # (cache hits also carry "match": "exact" | "near", "similarity" and "age_s"; rule_based a "reason")
+    requirement_source: NotRequired[dict[str, Any]]
     # Vision Preprocessor output (VisionJSON)
     vision_features: NotRequired[VisionJSON]
     # Design Director output (TaskPlanJSON)
@@ -43,6 +51,8 @@ class DesignBridgeState(TypedDict):
     # Agent outputs
     style_params: NotRequired[StyleParamsJSON]
     scene_graph: NotRequired[SceneGraphJSON]
+    # Preview Renderer output (two-phase render)
+    render_preview: NotRequired[RenderPreviewJSON]
     # Renderer output
     render_result: NotRequired[RenderResultJSON]
     generated_image: NotRequired[str]
@@ -50,3 +60,5 @@ class DesignBridgeState(TypedDict):
     evaluation_result: NotRequired[EvalFeedbackJSON]
     # Legacy / intermediate outputs (can be refactored later)
     intermediate_outputs: NotRequired[dict[str, Any]]
+    # Per-node timing records when instrumentation is enabled (appended by each node)
+    node_timings: NotRequired[Annotated[list[dict[str, Any]], operator.add]]
@@ -0,0 +1,209 @@
+# designbridge/uploads.py
+"""Room photos sent to Gemini: downscaling and reuse of uploaded file handles.
+
+prepare_image() shrinks oversized photos (longest side > max_side, or file larger than
+max_kb) to a JPEG before they are uploaded or inlined; small images are sent unchanged.
+UploadRegistry remembers the Gemini file handle of every uploaded image by content hash
+(plus preparation settings and API key) and reuses it until it expires, so the same
+photo is not re-uploaded on every run. Expired handles are pruned on insert and at most
+max_handles are kept (least recently used dropped first).
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from designbridge.cache import hash_file, make_key
+
+MIME_TYPES: dict[str, str] = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Bytes to send for an image, and whether they were re-encoded."""
+
+    data: bytes
+    mime_type: str
+    size: tuple[int, int]
+    original_bytes: int
+    resized: bool
+
+    @property
+    def suffix(self) -> str:
+        return ".jpg" if self.mime_type == "image/jpeg" else f".{self.mime_type.split('/')[-1]}"
+
+
+def prepare_image(path: str | Path, *, max_side: int, max_kb: int, jpeg_quality: int = 85) -> PreparedImage:
+    """Downscale / recompress an image to JPEG when it exceeds max_side px or max_kb; else pass it through."""
+    from PIL import Image, ImageOps
+
+    path = Path(path)
+    raw = path.read_bytes()
+    mime_type = MIME_TYPES.get(path.suffix.lower(), "image/jpeg")
+    with Image.open(BytesIO(raw)) as img:
+        size = img.size
+        too_large = max_side > 0 and max(size) > max_side
+        too_heavy = max_kb > 0 and len(raw) > max_kb * 1024
+        if not (too_large or too_heavy) or getattr(img, "is_animated", False):
+            return PreparedImage(raw, mime_type, size, len(raw), False)
+        # Re-encoding drops EXIF, so apply the orientation tag first (phone photos)
+        out = ImageOps.exif_transpose(img).convert("RGB")
+    if too_large:
+        out.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    out.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+    data = buffer.getvalue()
+    if not too_large and len(data) >= len(raw):
+        return PreparedImage(raw, mime_type, size, len(raw), False)
+    return PreparedImage(data, "image/jpeg", out.size, len(raw), True)
+
+
+def _handle_expiry(handle: Any, ttl_s: float, now: float) -> float:
+    """Reuse deadline: ttl_s from now, capped by the handle's own expiration_time (if it has one)."""
+    deadline = now + ttl_s
+    expiration = getattr(handle, "expiration_time", None)
+    if expiration is not None and hasattr(expiration, "timestamp"):
+        # Keep a margin so a handle is never used right as Gemini deletes it
+        deadline = min(deadline, expiration.timestamp() - 300)
+    return deadline
+
+
+class UploadRegistry:
+    """Content-hash keyed cache of uploaded Gemini file handles and prepared inline images."""
+
+    def __init__(
+        self,
+        *,
+        ttl_s: float,
+        max_side: int,
+        max_kb: int,
+        jpeg_quality: int = 85,
+        max_prepared: int = 16,
+        max_handles: int = 256,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_side = max_side
+        self.max_kb = max_kb
+        self.jpeg_quality = jpeg_quality
+        self.max_prepared = max_prepared
+        self.max_handles = max(1, max_handles)
+        # key -> (handle, reuse deadline, bytes sent), in LRU order
+        self._handles: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._prepared: OrderedDict[str, PreparedImage] = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> (lock, callers holding or waiting for it); removed when the last one leaves
+        self._key_locks: dict[str, list[Any]] = {}
+        self.uploads = 0
+        self.reused = 0
+        self.bytes_saved = 0
+
+    def _key(self, path: str | Path, *extra: object) -> str:
+        return make_key(hash_file(path), self.max_side, self.max_kb, self.jpeg_quality, *extra)
+
+    def prepare(self, path: str | Path) -> PreparedImage:
+        """prepare_image() with the registry's limits, memoized by content hash."""
+        key = self._key(path)
+        with self._lock:
+            prepared = self._prepared.get(key)
+            if prepared is not None:
+                self._prepared.move_to_end(key)
+                return prepared
+        prepared = prepare_image(path, max_side=self.max_side, max_kb=self.max_kb, jpeg_quality=self.jpeg_quality)
+        with self._lock:
+            self._prepared[key] = prepared
+            while len(self._prepared) > self.max_prepared:
+                self._prepared.popitem(last=False)
+        return prepared
+
+    def inline_part(self, path: str | Path) -> dict[str, Any]:
+        """Gemini inline_data part for the prepared image (base64)."""
+        import base64
+
+        prepared = self.prepare(path)
+        return {"inline_data": {"mime_type": prepared.mime_type, "data": base64.b64encode(prepared.data).decode("ascii")}}
+
+    def upload(self, path: str | Path, uploader: Callable[..., Any], *, namespace: str = "") -> Any:
+        """Return a live file handle for the image, calling uploader(path=..., mime_type=...) only when needed.
+        namespace separates handles that are not interchangeable (e.g. different API keys / projects).
+        """
+        key = self._key(path, make_key(namespace))
+        with self._key_lock(key):
+            now = time.time()
+            with self._lock:
+                cached = self._handles.get(key)
+                if cached is not None and now < cached[1]:
+                    self._handles.move_to_end(key)
+                    self.reused += 1
+                    self.bytes_saved += cached[2]
+                    return cached[0]
+            prepared = self.prepare(path)
+            if prepared.resized:
+                fd, tmp = tempfile.mkstemp(suffix=prepared.suffix)
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(prepared.data)
+                    handle = uploader(path=tmp, mime_type=prepared.mime_type)
+                finally:
+                    Path(tmp).unlink(missing_ok=True)
+            else:
+                handle = uploader(path=str(path), mime_type=prepared.mime_type)
+            with self._lock:
+                if self.ttl_s > 0:
+                    self._store_handle(key, (handle, _handle_expiry(handle, self.ttl_s, now), len(prepared.data)), now)
+                self.uploads += 1
+                self.bytes_saved += prepared.original_bytes - len(prepared.data)
+            return handle
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """One upload per key at a time; the lock entry lives only while someone uses it."""
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _store_handle(self, key: str, cached: tuple[Any, float, int], now: float) -> None:
+        """Insert under self._lock: prune expired handles, then cap at max_handles."""
+        for expired in [k for k, entry in self._handles.items() if now >= entry[1]]:
+            del self._handles[expired]
+        self._handles[key] = cached
+        self._handles.move_to_end(key)
+        while len(self._handles) > self.max_handles:
+            self._handles.popitem(last=False)
+
+    def forget(self, handle: Any) -> None:
+        """Drop a handle that Gemini rejected (e.g. deleted early) so the next call re-uploads."""
+        with self._lock:
+            for key in [k for k, entry in self._handles.items() if entry[0] is handle]:
+                del self._handles[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "handles": len(self._handles),
+                "uploads": self.uploads,
+                "reused": self.reused,
+                "bytes_saved": self.bytes_saved,
+            }
@@ -7,14 +7,23 @@ Implements:
 - Semantic segmentation (UPerNet) via HuggingFace Transformers
 
 Outputs are saved to disk and returned as file paths, so they can be stored in LangGraph state.
+When an ArtifactCache is given, outputs are looked up by image content hash + model name first.
+With concurrent=True, the image is decoded once and depth + segmentation run in parallel threads
+(each on its own CUDA stream when a GPU is available; torch kernels release the GIL on CPU).
+On CPU, Config.VISION_PRECISION selects fp32 / bf16 / int8 (dynamic quantization) inference.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, ContextManager
+
+from designbridge.cache import ArtifactCache, hash_file, make_key
+from designbridge.config import Config
+from designbridge.models import get_model_registry
+from designbridge.precision import apply_precision, cast_inputs, model_dtype, resolve_precision
 
 
 @dataclass(frozen=True)
@@ -24,6 +33,8 @@ class VisionArtifacts:
     depth_path: str | None = None
     segmentation_path: str | None = None
     segmentation_meta_path: str | None = None
+    # Per-stage cache outcome: {"depth": "hit" | "miss", "segmentation": ...}
+    cache_status: dict[str, str] = field(default_factory=dict)
 
 
 def ensure_dir(path: Path) -> Path:
@@ -31,6 +42,35 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
+def load_image(image_path: str) -> Any:
+    """Decode an image file to an RGB PIL image."""
+    from PIL import Image
+
+    return Image.open(image_path).convert("RGB")
+
+
+def image_size(image_path: str) -> tuple[int, int]:
+    """(width, height) from the file header, without decoding the pixels."""
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        return img.size
+
+
+def _run_on_side_stream(fn: Any, *args: Any, **kwargs: Any) -> Any:
+    """Run fn on a dedicated CUDA stream (if CUDA is available) so concurrent models can overlap."""
+    device, _ = _get_device()
+    if device != "cuda":
+        return fn(*args, **kwargs)
+    import torch
+
+    stream = torch.cuda.Stream()
+    with torch.cuda.stream(stream):
+        result = fn(*args, **kwargs)
+    stream.synchronize()
+    return result
+
+
 def _get_device() -> tuple[str, int]:
     """Return (device_str, device_index_for_pipeline)."""
     try:
@@ -44,9 +84,28 @@ def _get_device() -> tuple[str, int]:
     return ("cpu", -1)
 
 
-@lru_cache(maxsize=1)
+def _vision_precision() -> str:
+    """Active vision precision mode (always fp32 on CUDA)."""
+    return resolve_precision(Config.VISION_PRECISION, _get_device()[0])
+
+
+def _model_key(model_name: str) -> str:
+    """Model name plus precision (non-fp32 only), for registry entries and cache keys."""
+    precision = _vision_precision()
+    return model_name if precision == "fp32" else f"{model_name}@{precision}"
+
+
 def _load_depth_model(model_name: str) -> Any:
-    """Load Depth Anything V2 model and processor once (cached)."""
+    """Load Depth Anything V2 model and processor (kept in the model registry)."""
+    return get_model_registry().get(f"depth:{_model_key(model_name)}", lambda: _build_depth_model(model_name))
+
+
+def _lease_depth_model(model_name: str) -> ContextManager[Any]:
+    """_load_depth_model, pinned in the registry for the duration of an inference."""
+    return get_model_registry().lease(f"depth:{_model_key(model_name)}", lambda: _build_depth_model(model_name))
+
+
+def _build_depth_model(model_name: str) -> Any:
     from transformers import AutoImageProcessor, AutoModelForDepthEstimation
 
     processor = AutoImageProcessor.from_pretrained(model_name)
@@ -58,53 +117,79 @@ def _load_depth_model(model_name: str) -> Any:
 
         model = model.to(torch.device("cuda"))
     model.eval()
-    return processor, model
+    return processor, apply_precision(model, _vision_precision())
 
 
-def run_depth_estimation(image_path: str, *, model_name: str, out_dir: Path) -> tuple[str, Path]:
-    """Run depth estimation and save a PNG depth map."""
+def _infer_depth(images: list[Any], *, model_name: str) -> list[Any]:
+    """Run depth estimation on a batch of same-size images; return uint8 depth maps (H, W)."""
     import numpy as np
     import torch
     import torch.nn.functional as F
-    from PIL import Image
 
-    processor, model = _load_depth_model(model_name)
-
-    image = Image.open(image_path).convert("RGB")
-    inputs = processor(images=image, return_tensors="pt")
     device, _ = _get_device()
-    if device == "cuda":
-        inputs = {k: v.to("cuda") for k, v in inputs.items()}
-
-    with torch.no_grad():
-        outputs = model(**inputs)
-        predicted_depth = outputs.predicted_depth  # (B, H, W)
-
-    # Upsample to original size
-    depth = F.interpolate(
-        predicted_depth.unsqueeze(1),
-        size=image.size[::-1],
-        mode="bicubic",
-        align_corners=False,
-    ).squeeze()
-
-    depth_np = depth.cpu().numpy()
-    # Normalize to 0..255 for visualization
-    d_min, d_max = float(depth_np.min()), float(depth_np.max())
-    if d_max - d_min < 1e-8:
-        depth_norm = np.zeros_like(depth_np, dtype=np.uint8)
-    else:
-        depth_norm = ((depth_np - d_min) / (d_max - d_min) * 255.0).astype(np.uint8)
+    with _lease_depth_model(model_name) as (processor, model):
+        inputs = processor(images=images, return_tensors="pt")
+        if device == "cuda":
+            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        inputs = cast_inputs(inputs, model_dtype(model))
+
+        with torch.no_grad():
+            outputs = model(**inputs)
+            predicted_depth = outputs.predicted_depth.float()  # (B, H, W)
+
+    results: list[Any] = []
+    for i, image in enumerate(images):
+        # Upsample to original size
+        depth = F.interpolate(
+            predicted_depth[i : i + 1].unsqueeze(1),
+            size=image.size[::-1],
+            mode="bicubic",
+            align_corners=False,
+        ).squeeze()
+
+        depth_np = depth.cpu().numpy()
+        # Normalize to 0..255 for visualization
+        d_min, d_max = float(depth_np.min()), float(depth_np.max())
+        if d_max - d_min < 1e-8:
+            depth_norm = np.zeros_like(depth_np, dtype=np.uint8)
+        else:
+            depth_norm = ((depth_np - d_min) / (d_max - d_min) * 255.0).astype(np.uint8)
+        results.append(depth_norm)
+    return results
+
+
+def _save_depth(depth_norm: Any, out_dir: Path) -> Path:
+    """Save a uint8 depth map as depth.png in out_dir."""
+    from PIL import Image
 
     ensure_dir(out_dir)
     depth_out = out_dir / "depth.png"
     Image.fromarray(depth_norm).save(depth_out)
+    return depth_out
+
+
+def run_depth_estimation(
+    image_path: str, *, model_name: str, out_dir: Path, image: Any = None
+) -> tuple[str, Path]:
+    """Run depth estimation and save a PNG depth map. Pass an already-decoded image to skip decoding."""
+    if image is None:
+        image = load_image(image_path)
+    depth_norm = _infer_depth([image], model_name=model_name)[0]
+    depth_out = _save_depth(depth_norm, out_dir)
     return str(depth_out), depth_out
 
 
-@lru_cache(maxsize=1)
 def _load_upernet(model_name: str) -> Any:
-    """Load UPerNet segmentation model and processor once (cached)."""
+    """Load UPerNet segmentation model and processor (kept in the model registry)."""
+    return get_model_registry().get(f"segmentation:{_model_key(model_name)}", lambda: _build_upernet(model_name))
+
+
+def _lease_upernet(model_name: str) -> ContextManager[Any]:
+    """_load_upernet, pinned in the registry for the duration of an inference."""
+    return get_model_registry().lease(f"segmentation:{_model_key(model_name)}", lambda: _build_upernet(model_name))
+
+
+def _build_upernet(model_name: str) -> Any:
     from transformers import AutoImageProcessor, UperNetForSemanticSegmentation
 
     processor = AutoImageProcessor.from_pretrained(model_name)
@@ -116,43 +201,106 @@ def _load_upernet(model_name: str) -> Any:
 
         model = model.to(torch.device("cuda"))
     model.eval()
-    return processor, model
+    return processor, apply_precision(model, _vision_precision())
 
 
-def run_segmentation(
-    image_path: str,
-    *,
-    model_name: str,
-    out_dir: Path,
-) -> tuple[str, str, Path]:
-    """Run semantic segmentation and save label map PNG + a JSON metadata file."""
-    import json
+# "auto" upsample mode switches to label upsampling when the full-resolution logits would exceed this.
+AUTO_LOGITS_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _resolve_upsample_mode(mode: str, num_classes: int, size: tuple[int, int]) -> str:
+    """Resolve "auto" to "logits" or "labels" based on the full-resolution logits footprint."""
+    if mode != "auto":
+        return mode
+    width, height = size
+    logits_bytes = num_classes * width * height * 4
+    return "labels" if logits_bytes > AUTO_LOGITS_MAX_BYTES else "logits"
+
+
+def _upsample_labels_nearest(labels: Any, size: tuple[int, int]) -> Any:
+    """Nearest-neighbour upsample of an (h, w) label map to size=(W, H), same sampling as torch "nearest"."""
+    import numpy as np
+
+    width, height = size
+    h, w = labels.shape
+    rows = np.arange(height) * h // height
+    cols = np.arange(width) * w // width
+    return labels[rows[:, None], cols[None, :]]
+
+
+def _infer_segmentation(
+    images: list[Any], *, model_name: str, upsample: str = "auto"
+) -> tuple[list[tuple[Any, dict[str, Any]]], dict[int, str]]:
+    """Run UPerNet on a batch of same-size images; return (uint16 label map (H, W), stats) per image,
+    plus the model's id2label (read under the lease, so saving never has to load the model again).
+
+    upsample selects how model-resolution output is brought to the photo size:
+    - "logits": bilinear upsample of the (C, h, w) logits, then argmax (C x H x W floats).
+    - "labels": argmax at model resolution, then nearest upsample of the label map only (H x W ints).
+    - "auto": "labels" when the full-resolution logits would exceed AUTO_LOGITS_MAX_BYTES.
+    stats reports the resolved mode, latency and peak memory of the upsampling step.
+    """
+    import time
 
     import numpy as np
     import torch
     import torch.nn.functional as F
-    from PIL import Image
-
-    processor, model = _load_upernet(model_name)
-    image = Image.open(image_path).convert("RGB")
-    inputs = processor(images=image, return_tensors="pt")
 
     device, _ = _get_device()
-    if device == "cuda":
-        inputs = {k: v.to("cuda") for k, v in inputs.items()}
-
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits  # (B, C, h, w)
-
-    # Upsample logits to original size
-    up = F.interpolate(
-        logits,
-        size=image.size[::-1],
-        mode="bilinear",
-        align_corners=False,
-    )
-    seg = up.argmax(dim=1)[0].detach().cpu().numpy().astype(np.uint16)
+    with _lease_upernet(model_name) as (processor, model):
+        inputs = processor(images=images, return_tensors="pt")
+        if device == "cuda":
+            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        inputs = cast_inputs(inputs, model_dtype(model))
+
+        t0 = time.perf_counter()
+        with torch.no_grad():
+            outputs = model(**inputs)
+            logits = outputs.logits.float()  # (B, C, h, w)
+        id2label = dict(getattr(model.config, "id2label", None) or {})
+    inference_s = (time.perf_counter() - t0) / len(images)
+
+    results: list[tuple[Any, dict[str, Any]]] = []
+    for i, image in enumerate(images):
+        mode = _resolve_upsample_mode(upsample, logits.shape[1], image.size)
+        if device == "cuda":
+            torch.cuda.reset_peak_memory_stats()
+        t0 = time.perf_counter()
+        if mode == "labels":
+            labels = logits[i].argmax(dim=0).detach().cpu().numpy().astype(np.uint16)
+            seg = _upsample_labels_nearest(labels, image.size)
+            peak_bytes = seg.nbytes + labels.nbytes
+        else:
+            # Upsample logits to original size (one image at a time to bound memory)
+            up = F.interpolate(
+                logits[i : i + 1],
+                size=image.size[::-1],
+                mode="bilinear",
+                align_corners=False,
+            )
+            seg = up.argmax(dim=1)[0].detach().cpu().numpy().astype(np.uint16)
+            peak_bytes = up.element_size() * up.nelement() + seg.nbytes
+            del up
+        stats: dict[str, Any] = {
+            "upsample": mode,
+            "inference_s": round(inference_s, 4),
+            "upsample_s": round(time.perf_counter() - t0, 4),
+            "upsample_peak_bytes": int(peak_bytes),
+        }
+        if device == "cuda":
+            stats["cuda_peak_bytes"] = int(torch.cuda.max_memory_allocated())
+        results.append((seg, stats))
+    return results, id2label
+
+
+def _save_segmentation(
+    seg: Any, *, model_name: str, out_dir: Path, id2label: dict[int, str], stats: dict[str, Any] | None = None
+) -> tuple[Path, Path]:
+    """Save a label map as 16-bit segmentation.png plus segmentation_meta.json in out_dir."""
+    import json
+
+    import numpy as np
+    from PIL import Image
 
     ensure_dir(out_dir)
     seg_out = out_dir / "segmentation.png"
@@ -160,7 +308,6 @@ def run_segmentation(
     Image.fromarray(seg, mode="I;16").save(seg_out)
 
     # Build simple metadata: id2label + present class ids
-    id2label = getattr(model.config, "id2label", {}) or {}
     present_ids = sorted({int(x) for x in np.unique(seg).tolist()})
     present_labels = {str(i): id2label.get(i, "unknown") for i in present_ids}
 
@@ -169,9 +316,29 @@ def run_segmentation(
         "present_class_ids": present_ids,
         "present_labels": present_labels,
     }
+    if stats:
+        meta["postprocess"] = stats
     meta_out = out_dir / "segmentation_meta.json"
     meta_out.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    return seg_out, meta_out
+
 
+def run_segmentation(
+    image_path: str,
+    *,
+    model_name: str,
+    out_dir: Path,
+    image: Any = None,
+    upsample: str = "auto",
+) -> tuple[str, str, Path]:
+    """Run semantic segmentation and save label map PNG + a JSON metadata file.
+    Pass an already-decoded image to skip decoding. See _infer_segmentation for upsample modes.
+    """
+    if image is None:
+        image = load_image(image_path)
+    results, id2label = _infer_segmentation([image], model_name=model_name, upsample=upsample)
+    seg, stats = results[0]
+    seg_out, meta_out = _save_segmentation(seg, model_name=model_name, out_dir=out_dir, id2label=id2label, stats=stats)
     return str(seg_out), str(meta_out), meta_out
 
 
@@ -184,25 +351,205 @@ def run_visual_preprocessing(
     depth_model: str,
     segmentation_model: str,
     artifacts_root: Path,
+    cache: ArtifactCache | None = None,
+    concurrent: bool = False,
+    segmentation_upsample: str = "auto",
 ) -> VisionArtifacts:
-    """Run local visual preprocessing and save outputs."""
+    """Run local visual preprocessing and save outputs (reusing cached outputs when possible).
+    With concurrent=True, decode the image once and run depth + segmentation in parallel.
+    """
     out_dir = ensure_dir(artifacts_root / "vision" / task_id)
 
     depth_path: str | None = None
     seg_path: str | None = None
     seg_meta_path: str | None = None
+    cache_status: dict[str, str] = {}
+    image_hash = hash_file(image_path) if cache is not None else None
+    depth_key = make_key(image_hash, "depth", _model_key(depth_model))
+    seg_key = make_key(image_hash, "segmentation", _model_key(segmentation_model), segmentation_upsample)
 
+    run_depth = False
+    run_seg = False
     if enable_depth:
-        depth_path, _ = run_depth_estimation(image_path, model_name=depth_model, out_dir=out_dir)
-
+        cached = cache.get(depth_key, out_dir) if cache is not None else None
+        if cached:
+            depth_path = cached["depth.png"]
+            cache_status["depth"] = "hit"
+        else:
+            run_depth = True
     if enable_segmentation:
-        seg_path, seg_meta_path, _ = run_segmentation(
-            image_path, model_name=segmentation_model, out_dir=out_dir
-        )
+        cached = cache.get(seg_key, out_dir) if cache is not None else None
+        if cached:
+            seg_path = cached["segmentation.png"]
+            seg_meta_path = cached["segmentation_meta.json"]
+            cache_status["segmentation"] = "hit"
+        else:
+            run_seg = True
+
+    if run_depth and run_seg and concurrent:
+        # Load both models up front: concurrent first-time imports/loads from worker threads race
+        _load_depth_model(depth_model)
+        _load_upernet(segmentation_model)
+        image = load_image(image_path)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="vision") as pool:
+            depth_future = pool.submit(
+                _run_on_side_stream,
+                run_depth_estimation,
+                image_path,
+                model_name=depth_model,
+                out_dir=out_dir,
+                image=image,
+            )
+            seg_future = pool.submit(
+                _run_on_side_stream,
+                run_segmentation,
+                image_path,
+                model_name=segmentation_model,
+                out_dir=out_dir,
+                image=image,
+                upsample=segmentation_upsample,
+            )
+            depth_path, _ = depth_future.result()
+            seg_path, seg_meta_path, _ = seg_future.result()
+    else:
+        image = load_image(image_path) if run_depth and run_seg else None
+        if run_depth:
+            depth_path, _ = run_depth_estimation(
+                image_path, model_name=depth_model, out_dir=out_dir, image=image
+            )
+        if run_seg:
+            seg_path, seg_meta_path, _ = run_segmentation(
+                image_path,
+                model_name=segmentation_model,
+                out_dir=out_dir,
+                image=image,
+                upsample=segmentation_upsample,
+            )
+
+    if cache is not None:
+        if run_depth and depth_path:
+            cache.put(depth_key, {"depth.png": depth_path})
+            cache_status["depth"] = "miss"
+        if run_seg and seg_path and seg_meta_path:
+            cache.put(
+                seg_key,
+                {"segmentation.png": seg_path, "segmentation_meta.json": seg_meta_path},
+            )
+            cache_status["segmentation"] = "miss"
 
     return VisionArtifacts(
         depth_path=depth_path,
         segmentation_path=seg_path,
         segmentation_meta_path=seg_meta_path,
+        cache_status=cache_status,
     )
 
+
+def _group_by_resolution(sizes: dict[int, tuple[int, int]], batch_size: int) -> list[list[int]]:
+    """Group image indices by (width, height) and split each group into batches of batch_size."""
+    groups: dict[tuple[int, int], list[int]] = {}
+    for idx, size in sizes.items():
+        groups.setdefault(size, []).append(idx)
+    batches: list[list[int]] = []
+    for indices in groups.values():
+        for start in range(0, len(indices), batch_size):
+            batches.append(indices[start : start + batch_size])
+    return batches
+
+
+def run_visual_preprocessing_batch(
+    items: list[tuple[str, str]],
+    *,
+    enable_depth: bool,
+    enable_segmentation: bool,
+    depth_model: str,
+    segmentation_model: str,
+    artifacts_root: Path,
+    cache: ArtifactCache | None = None,
+    batch_size: int = 8,
+    segmentation_upsample: str = "auto",
+) -> list[VisionArtifacts]:
+    """Run visual preprocessing for many (image_path, task_id) pairs with batched inference.
+
+    Images are grouped by resolution (read from the file headers) so each group stacks into one
+    tensor, then run through the depth and segmentation models batch_size images at a time. Only
+    the current batch is decoded, so memory stays bounded for large inputs. Per-image outputs are
+    written to artifacts_root/vision/<task_id>, same as run_visual_preprocessing, so task_ids must
+    be unique. Returns one VisionArtifacts per input, in order.
+    """
+    task_ids = [task_id for _, task_id in items]
+    duplicates = sorted({t for t in task_ids if task_ids.count(t) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate task_id(s) in batch (outputs would overwrite each other): {duplicates}")
+
+    out_dirs = [ensure_dir(artifacts_root / "vision" / task_id) for _, task_id in items]
+    hashes = [hash_file(path) if cache is not None else None for path, _ in items]
+    depth_paths: dict[int, str] = {}
+    seg_paths: dict[int, tuple[str, str]] = {}
+    cache_status: list[dict[str, str]] = [{} for _ in items]
+
+    depth_todo: list[int] = []
+    seg_todo: list[int] = []
+    for idx in range(len(items)):
+        if enable_depth:
+            cached = (
+                cache.get(make_key(hashes[idx], "depth", _model_key(depth_model)), out_dirs[idx])
+                if cache is not None
+                else None
+            )
+            if cached:
+                depth_paths[idx] = cached["depth.png"]
+                cache_status[idx]["depth"] = "hit"
+            else:
+                depth_todo.append(idx)
+        if enable_segmentation:
+            seg_key = make_key(hashes[idx], "segmentation", _model_key(segmentation_model), segmentation_upsample)
+            cached = cache.get(seg_key, out_dirs[idx]) if cache is not None else None
+            if cached:
+                seg_paths[idx] = (cached["segmentation.png"], cached["segmentation_meta.json"])
+                cache_status[idx]["segmentation"] = "hit"
+            else:
+                seg_todo.append(idx)
+
+    # Decode one batch at a time; each decoded image is shared by both models, then released.
+    depth_set, seg_set = set(depth_todo), set(seg_todo)
+    sizes = {idx: image_size(items[idx][0]) for idx in sorted(depth_set | seg_set)}
+    for batch in _group_by_resolution(sizes, batch_size):
+        images = {idx: load_image(items[idx][0]) for idx in batch}
+        depth_batch = [i for i in batch if i in depth_set]
+        seg_batch = [i for i in batch if i in seg_set]
+
+        if depth_batch:
+            depth_maps = _infer_depth([images[i] for i in depth_batch], model_name=depth_model)
+            for idx, depth_norm in zip(depth_batch, depth_maps):
+                depth_paths[idx] = str(_save_depth(depth_norm, out_dirs[idx]))
+                if cache is not None:
+                    cache.put(make_key(hashes[idx], "depth", _model_key(depth_model)), {"depth.png": depth_paths[idx]})
+                    cache_status[idx]["depth"] = "miss"
+
+        if seg_batch:
+            label_maps, id2label = _infer_segmentation(
+                [images[i] for i in seg_batch], model_name=segmentation_model, upsample=segmentation_upsample
+            )
+            for idx, (seg, stats) in zip(seg_batch, label_maps):
+                seg_out, meta_out = _save_segmentation(
+                    seg, model_name=segmentation_model, out_dir=out_dirs[idx], id2label=id2label, stats=stats
+                )
+                seg_paths[idx] = (str(seg_out), str(meta_out))
+                if cache is not None:
+                    cache.put(
+                        make_key(hashes[idx], "segmentation", _model_key(segmentation_model), segmentation_upsample),
+                        {"segmentation.png": str(seg_out), "segmentation_meta.json": str(meta_out)},
+                    )
+                    cache_status[idx]["segmentation"] = "miss"
+        del images
+
+    return [
+        VisionArtifacts(
+            depth_path=depth_paths.get(idx),
+            segmentation_path=seg_paths[idx][0] if idx in seg_paths else None,
+            segmentation_meta_path=seg_paths[idx][1] if idx in seg_paths else None,
+            cache_status=cache_status[idx],
+        )
+        for idx in range(len(items))
+    ]
@@ -0,0 +1,164 @@
+# designbridge/warmup.py
+"""Background warm-up of the heavy local models.
+
+warmup() loads the configured models (depth, segmentation, SDXL, ControlNet) in a background
+thread so the first request doesn't pay multi-GB load times, and optionally runs one tiny
+dummy inference per model to warm kernels and allocator pools. Models are loaded one after
+another in a single worker: concurrent first-time transformers/diffusers imports race. A
+request that needs a model meanwhile waits on the model registry's load lock rather than
+loading alongside the worker.
+
+    designbridge.warmup()                 # returns immediately
+    designbridge.warmup_status()          # {"depth": {"state": "ready", "load_s": ...}, ...}
+    designbridge.wait_until_ready(60)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from designbridge.config import Config
+
+MODEL_NAMES: tuple[str, ...] = ("depth", "segmentation", "sdxl", "controlnet")
+
+_status: dict[str, dict[str, Any]] = {}
+_status_lock = threading.Lock()
+_worker: threading.Thread | None = None
+
+
+def _set_status(name: str, **fields: Any) -> None:
+    with _status_lock:
+        _status.setdefault(name, {}).update(fields)
+
+
+def _blank_image(size: int) -> Any:
+    from PIL import Image
+
+    return Image.new("RGB", (size, size), (128, 128, 128))
+
+
+def _warm_depth(dummy_inference: bool) -> None:
+    from designbridge import vision
+
+    vision._load_depth_model(Config.DEPTH_MODEL)
+    if dummy_inference:
+        vision._infer_depth([_blank_image(64)], model_name=Config.DEPTH_MODEL)
+
+
+def _warm_segmentation(dummy_inference: bool) -> None:
+    from designbridge import vision
+
+    vision._load_upernet(Config.SEGMENTATION_MODEL)
+    if dummy_inference:
+        vision._infer_segmentation(
+            [_blank_image(64)], model_name=Config.SEGMENTATION_MODEL, upsample=Config.SEGMENTATION_UPSAMPLE
+        )
+
+
+def _warm_sdxl(dummy_inference: bool) -> None:
+    from designbridge import nodes
+
+    nodes._get_sdxl_pipeline()
+    if dummy_inference:
+        nodes._run_sdxl_batch(("sdxl", 1, 256), [{"prompt": "warmup", "seeds": [0]}])
+
+
+def _warm_controlnet(dummy_inference: bool) -> None:
+    from designbridge import nodes
+
+    nodes._get_controlnet_pipeline()
+    if dummy_inference:
+        job = {"prompt": "warmup", "seeds": [0], "control_image": _blank_image(256)}
+        nodes._run_sdxl_batch(("controlnet", 1, 256), [job])
+
+
+_WARMERS: dict[str, Callable[[bool], None]] = {
+    "depth": _warm_depth,
+    "segmentation": _warm_segmentation,
+    "sdxl": _warm_sdxl,
+    "controlnet": _warm_controlnet,
+}
+
+
+def _skip_reason(name: str) -> str | None:
+    """Models the current Config would never use are not loaded."""
+    if name in ("sdxl", "controlnet") and not Config.ENABLE_SDXL_FALLBACK:
+        return "SDXL fallback disabled"
+    if name == "controlnet" and not Config.ENABLE_CONTROLNET:
+        return "ControlNet disabled"
+    return None
+
+
+def _run(names: list[str], dummy_inference: bool) -> None:
+    for name in names:
+        reason = _skip_reason(name)
+        if reason:
+            _set_status(name, state="skipped", reason=reason)
+            continue
+        _set_status(name, state="loading")
+        t0 = time.perf_counter()
+        try:
+            _WARMERS[name](dummy_inference)
+        except Exception as e:
+            print(f"⚠️  Warm-up of {name} failed ({e})")
+            _set_status(name, state="failed", error=str(e), load_s=round(time.perf_counter() - t0, 3))
+            continue
+        _set_status(name, state="ready", load_s=round(time.perf_counter() - t0, 3), dummy_inference=dummy_inference)
+
+
+def warmup(
+    models: Iterable[str] | None = None,
+    *,
+    background: bool = True,
+    dummy_inference: bool | None = None,
+) -> threading.Thread | None:
+    """
+    Load models ahead of the first request. models defaults to Config.WARMUP_MODELS,
+    dummy_inference to Config.WARMUP_DUMMY_INFERENCE. With background=True this returns the
+    worker thread immediately (repeated calls don't reload warmed models, so it is safe to call
+    on every app rerun); otherwise it blocks until every model is loaded and returns None.
+    """
+    global _worker
+    names = list(models) if models is not None else [m.strip() for m in Config.WARMUP_MODELS.split(",") if m.strip()]
+    unknown = [n for n in names if n not in _WARMERS]
+    if unknown:
+        raise ValueError(f"Unknown warm-up model(s): {unknown}; expected {list(MODEL_NAMES)}")
+    if dummy_inference is None:
+        dummy_inference = Config.WARMUP_DUMMY_INFERENCE
+
+    with _status_lock:
+        if _worker is not None and _worker.is_alive():
+            return _worker
+        # Models already warmed (or skipped) are not loaded again; failed ones are retried
+        todo = [n for n in names if _status.get(n, {}).get("state") not in ("ready", "skipped")]
+        if not todo:
+            return _worker if background else None
+        for name in todo:
+            _status[name] = {"state": "pending"}
+        if background:
+            _worker = threading.Thread(target=_run, args=(todo, dummy_inference), name="designbridge-warmup", daemon=True)
+            _worker.start()
+            return _worker
+    _run(todo, dummy_inference)
+    return None
+
+
+def warmup_status() -> dict[str, dict[str, Any]]:
+    """Per-model readiness: state is pending | loading | ready | failed | skipped."""
+    with _status_lock:
+        return {name: dict(fields) for name, fields in _status.items()}
+
+
+def is_ready(name: str) -> bool:
+    """True once the given model has been loaded by warm-up."""
+    return warmup_status().get(name, {}).get("state") == "ready"
+
+
+def wait_until_ready(timeout: float | None = None) -> bool:
+    """Block until the warm-up worker finishes; True if no requested model is still pending/loading."""
+    worker = _worker
+    if worker is not None:
+        worker.join(timeout)
+    return all(s.get("state") not in ("pending", "loading") for s in warmup_status().values())
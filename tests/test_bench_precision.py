@@ -0,0 +1,44 @@
+"""Smoke tests for benchmarks/bench_precision.py with tiny models (no downloads)."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from benchmarks import bench_precision  # noqa: E402
+from benchmarks.stubs import StubDiffusionPipeline  # noqa: E402
+from designbridge import nodes  # noqa: E402
+
+
+def test_vision_modes_run_through_the_lease_seam():
+    images = bench_precision.make_images(2, (64, 48))
+    results = bench_precision.bench_vision(tiny=True, images=images, repeats=1, modes=["fp32", "bf16"])
+
+    for kind in ("depth", "segmentation"):
+        assert set(results[kind]) == {"fp32", "bf16"}
+        assert not any("error" in stats for stats in results[kind].values()), results[kind]
+    assert results["depth"]["fp32"]["depth_mad"] == 0
+    assert results["segmentation"]["fp32"]["label_agreement"] == 1
+
+
+def test_diffusion_measures_the_leased_pipeline(monkeypatch):
+    import torch
+
+    built = []
+
+    def build():
+        pipe = StubDiffusionPipeline(size=32)
+        pipe.text_encoder = torch.nn.Linear(8, 8)
+        pipe.text_encoder_2 = torch.nn.Linear(8, 8)
+        built.append(pipe)
+        return pipe
+
+    monkeypatch.setattr(nodes, "_build_sdxl_pipeline", build)
+    results = bench_precision.bench_diffusion(model="stub", size=32, steps=2, modes=["fp32"])
+
+    assert "error" not in results["fp32"], results
+    assert results["fp32"]["psnr_vs_fp32_db"] == float("inf")
+    # One load; the warm-up and the measured render both used it
+    assert len(built) == 1 and built[0].calls == 2
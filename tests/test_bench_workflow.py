@@ -0,0 +1,46 @@
+"""Smoke test: the offline workflow benchmark really runs through its stubs."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from benchmarks.bench_workflow import PROMPTS, check_stubbed_run, make_corpus, run_benchmark  # noqa: E402
+from benchmarks.stubs import install_stubs  # noqa: E402
+from designbridge import get_compiled_graph  # noqa: E402
+
+
+def test_one_pass_over_the_corpus_hits_every_stub(tmp_path):
+    corpus = make_corpus(tmp_path)
+    with install_stubs(artifacts_dir=str(tmp_path / "artifacts")) as stubs, contextlib.redirect_stdout(io.StringIO()):
+        compiled = get_compiled_graph(instrument=True)
+        for state in corpus:
+            result = compiled.invoke(state)
+            check_stubbed_run(state, result)
+            assert result["render_result"]["generation_params"]["backend"] == "sdxl"
+            if state["user_input"].get("initial_image"):
+                assert {"depth", "segmentation", "segmentation_meta"} <= set(result["vision_features"])
+    assert stubs.pipeline.calls >= len(PROMPTS)
+    assert stubs.gemini.calls == len(PROMPTS)
+
+
+def test_benchmark_fails_loudly_when_a_stub_is_bypassed(monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("would download a real checkpoint")
+
+    # The stubbed vision models now fail; the node swallows that and returns empty vision_features
+    monkeypatch.setattr("benchmarks.stubs.tiny_depth_model", broken)
+    with pytest.raises(RuntimeError, match="depth \\+ segmentation"), contextlib.redirect_stdout(io.StringIO()):
+        run_benchmark(runs=1, warmup=1)
+
+
+def test_benchmark_summary(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = run_benchmark(runs=len(PROMPTS), warmup=0)
+    assert summary["runs"] == len(PROMPTS)
+    assert {"requirement_analyzer", "renderer"} <= set(summary["nodes"])
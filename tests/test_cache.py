@@ -0,0 +1,57 @@
+"""Tests for designbridge.cache."""
+
+from __future__ import annotations
+
+import os
+
+from designbridge.cache import ArtifactCache, hash_file, make_key
+
+
+def _write(path, data: bytes):
+    path.write_bytes(data)
+    return path
+
+
+def test_hash_file_depends_on_content_only(tmp_path):
+    a = _write(tmp_path / "a.png", b"same bytes")
+    b = _write(tmp_path / "b.png", b"same bytes")
+    c = _write(tmp_path / "c.png", b"other bytes")
+    assert hash_file(a) == hash_file(b)
+    assert hash_file(a) != hash_file(c)
+
+
+def test_make_key_distinguishes_parts():
+    assert make_key("img", "depth", "m") == make_key("img", "depth", "m")
+    assert make_key("img", "depth", "m") != make_key("img", "segmentation", "m")
+    # Parts are separated, so concatenations don't collide
+    assert make_key("ab", "c") != make_key("a", "bc")
+
+
+def test_get_miss_then_hit_copies_files(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1 << 20)
+    src = _write(tmp_path / "depth.png", b"depth")
+    assert cache.get("k" * 64, tmp_path / "out1") is None
+
+    cache.put("k" * 64, {"depth.png": src})
+    got = cache.get("k" * 64, tmp_path / "out2")
+
+    assert got == {"depth.png": str(tmp_path / "out2" / "depth.png")}
+    assert (tmp_path / "out2" / "depth.png").read_bytes() == b"depth"
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_put_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=250)
+    src = _write(tmp_path / "f.bin", b"x" * 100)
+    keys = [c * 64 for c in "abc"]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, {"f.bin": src})
+        # Distinct mtimes so the LRU order is deterministic
+        entry = cache._entry_dir(key)
+        os.utime(entry, (1000 + i, 1000 + i))
+
+    cache.put(keys[2], {"f.bin": src})
+
+    assert cache.get(keys[0], tmp_path / "out") is None
+    assert cache.get(keys[1], tmp_path / "out") is not None
+    assert cache.get(keys[2], tmp_path / "out") is not None
@@ -0,0 +1,157 @@
+"""Tests for designbridge.gemini_client (google.generativeai replaced by a fake module)."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from designbridge import gemini_client
+from designbridge.gemini_client import GeminiBusyError, GeminiClient, GeminiTimeoutError, is_retryable_error
+
+
+class ApiError(Exception):
+    def __init__(self, code: int, message: str = "") -> None:
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeModel:
+    """Plays back a script of results: an exception is raised, anything else returned as .text."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+
+    def _next(self, request):
+        self.requests.append(request)
+        item = self.script.pop(0)
+        if callable(item):
+            item = item()
+        if isinstance(item, BaseException):
+            raise item
+        return types.SimpleNamespace(text=item)
+
+    def generate_content(self, **request):
+        return self._next(request)
+
+    async def generate_content_async(self, **request):
+        return self._next(request)
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda api_key: None
+    genai.GenerativeModel = lambda name: None
+    genai.GenerationConfig = lambda temperature: {"temperature": temperature}
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    # Zero backoff: no real waiting between attempts
+    monkeypatch.setattr(gemini_client.random, "uniform", lambda a, b: 0.0)
+
+    def make(script, **kwargs):
+        options = {"model_name": "m", "temperature": 0.3, "timeout_s": 1.0, "max_retries": 2, "backoff_s": 0.01,
+                   "budget_s": 5.0, **kwargs}
+        client = GeminiClient("key", **options)
+        client.model = FakeModel(script)
+        return client
+
+    return make
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (ApiError(503, "Service Unavailable"), True),
+        (ApiError(500), True),
+        (ConnectionError("reset by peer"), True),
+        (ApiError(429, "Resource exhausted"), False),
+        (ApiError(400, "Invalid argument"), False),
+        (ValueError("prompt has 5000 tokens"), False),
+        (ValueError("took 502ms to parse"), False),
+    ],
+)
+def test_is_retryable_error(error, retryable):
+    assert is_retryable_error(error) is retryable
+
+
+def test_retries_transient_errors_then_succeeds(make_client):
+    client = make_client([ApiError(503), ApiError(500), "ok"])
+    assert client.generate("prompt") == "ok"
+    assert client.stats()["calls"] == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries(make_client):
+    client = make_client([ApiError(503)] * 3)
+    with pytest.raises(ApiError):
+        client.generate("prompt")
+    assert client.stats()["calls"] == 3
+
+
+def test_fatal_error_is_not_retried(make_client):
+    client = make_client([ApiError(429, "quota"), "ok"])
+    with pytest.raises(ApiError):
+        client.generate("prompt")
+    assert client.stats()["calls"] == 1
+
+
+def test_attempt_timeout_is_capped_by_the_budget(make_client):
+    client = make_client(["ok"], timeout_s=20.0)
+    client.generate("prompt", deadline=time.monotonic() + 2.0)
+    assert client.model.requests[0]["request_options"]["timeout"] <= 2.0
+
+
+def test_exhausted_budget_raises_without_calling(make_client):
+    client = make_client(["ok"])
+    with pytest.raises(GeminiTimeoutError, match="budget"):
+        client.generate("prompt", deadline=time.monotonic() - 1)
+    assert client.stats()["calls"] == 0
+
+
+def test_hung_call_times_out(make_client):
+    release = threading.Event()
+    client = make_client([lambda: release.wait(5) and "late"], timeout_s=0.05, max_retries=0)
+    try:
+        with pytest.raises(GeminiTimeoutError):
+            client.generate("prompt")
+        assert client.stats()["timeouts"] == 1
+    finally:
+        release.set()
+
+
+def test_fails_fast_when_every_worker_is_hung(make_client):
+    release = threading.Event()
+    client = make_client([], timeout_s=0.05, max_retries=0, max_in_flight=2)
+    try:
+        for _ in range(2):
+            with pytest.raises(GeminiTimeoutError):
+                client.run(lambda: release.wait(5), deadline=time.monotonic() + 5)
+        t0 = time.monotonic()
+        with pytest.raises(GeminiBusyError):
+            client.run(lambda: "ok", deadline=time.monotonic() + 5)
+        assert time.monotonic() - t0 < 0.05
+    finally:
+        release.set()
+    # Slots come back once the abandoned calls return
+    for _ in range(500):
+        try:
+            assert client.run(lambda: "ok", deadline=time.monotonic() + 5) == "ok"
+            break
+        except GeminiBusyError:
+            time.sleep(0.01)
+    else:
+        pytest.fail("slots were not released")
+
+
+def test_agenerate_retries(make_client):
+    client = make_client([ApiError(502), "ok"])
+    assert asyncio.run(client.agenerate("prompt")) == "ok"
+    assert client.stats()["retries"] == 1
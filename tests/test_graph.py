@@ -0,0 +1,32 @@
+"""Tests for designbridge.graph diagram caching."""
+
+from __future__ import annotations
+
+from designbridge import graph
+
+
+class _FlakyDrawer:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def get_graph(self):
+        return self
+
+    def draw_mermaid_png(self) -> bytes:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("mermaid.ink unavailable")
+        return b"\x89PNG"
+
+
+def test_diagram_failure_is_not_cached(monkeypatch):
+    drawer = _FlakyDrawer(failures=1)
+    monkeypatch.setattr(graph, "_diagram_png", None)
+    monkeypatch.setattr(graph, "get_compiled_graph", lambda: drawer)
+
+    assert graph.get_graph_diagram_png() is None
+    assert graph.get_graph_diagram_png() == b"\x89PNG"
+    # Success is cached: no further renders
+    assert graph.get_graph_diagram_png() == b"\x89PNG"
+    assert drawer.calls == 2
@@ -0,0 +1,97 @@
+"""Tests for designbridge.health."""
+
+from __future__ import annotations
+
+import pytest
+
+from designbridge.health import CircuitBreaker, error_status_code, is_fatal_error
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class ApiError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ApiError(429, "Too many requests"),
+        ApiError(403, "Forbidden"),
+        ResourceExhausted("try later"),
+        RuntimeError("401 Request had invalid authentication credentials"),
+        RuntimeError("HTTP status code: 403"),
+        RuntimeError("Imagen is only available on billed accounts"),
+    ],
+)
+def test_fatal_errors(error):
+    assert is_fatal_error(error)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ApiError(503, "The service is unavailable"),
+        RuntimeError("request 7f3a4030 took 4290ms"),
+        RuntimeError("bad value at line 401"),
+        TimeoutError("timed out after 429.5s"),
+    ],
+)
+def test_numbers_in_text_are_not_status_codes(error):
+    assert not is_fatal_error(error)
+
+
+def test_error_status_code_sources():
+    class Response:
+        status_code = 502
+
+    class HttpError(Exception):
+        response = Response()
+
+    assert error_status_code(ApiError(404, "x")) == 404
+    assert error_status_code(HttpError("bad gateway")) == 502
+    assert error_status_code(RuntimeError("503 Service Unavailable")) == 503
+    assert error_status_code(RuntimeError("took 503ms")) is None
+
+
+def test_opens_after_threshold_then_half_open_trial(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("designbridge.health.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("imagen", failure_threshold=2, cooldown_s=10)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 11
+    assert breaker.allow()  # the trial
+    assert not breaker.allow()  # only one at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_fatal_error_opens_immediately():
+    breaker = CircuitBreaker("imagen", failure_threshold=5)
+    breaker.allow()
+    breaker.record_failure(ApiError(429, "quota"))
+    assert breaker.state == "open"
+
+
+def test_release_frees_the_trial(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("designbridge.health.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("imagen", failure_threshold=1, cooldown_s=10)
+    breaker.allow()
+    breaker.record_failure(RuntimeError("boom"))
+    now[0] += 11
+
+    assert breaker.allow()
+    breaker.release()  # e.g. the request was cancelled mid-call
+    assert breaker.state == "half_open"
+    assert breaker.allow()
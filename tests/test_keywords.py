@@ -0,0 +1,80 @@
+"""Tests for designbridge.keywords."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from designbridge.keywords import (
+    HINT_TABLES,
+    REQUIREMENT_MATCHER,
+    ROOM_TABLE,
+    STYLE_TABLE,
+    KeywordMatcher,
+    KeywordTable,
+    _trie_regex,
+)
+
+TABLES = (ROOM_TABLE, STYLE_TABLE, *HINT_TABLES)
+
+
+def _linear(tables, text):
+    """Reference: check each value's synonyms with `in`, in priority order."""
+    found = {}
+    for table in tables:
+        for value, synonyms in table.entries:
+            if any(term in text for term in synonyms):
+                found[table.field] = value
+                break
+    return found
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "把客廳改成北歐風格，動線順暢",
+        "臥室與書房都想要現代簡約的感覺",
+        "modern scandinavian living_room layout",
+        "廚房局部微調材質",
+        "沒有任何關鍵字",
+        "",
+    ],
+)
+def test_matches_linear_scan(text):
+    assert REQUIREMENT_MATCHER.match(text.lower()) == _linear(TABLES, text.lower())
+
+
+def test_highest_priority_value_wins():
+    # 客廳 comes before 臥室 in ROOM_TABLE, whatever their order in the text
+    assert REQUIREMENT_MATCHER.match("臥室和客廳")["room"] == "living_room"
+
+
+def test_overlapping_terms_all_count():
+    # "ab" is matched as the longest term at its position; "b" inside it still counts
+    tables = (
+        KeywordTable("x", (("long", ("ab",)),)),
+        KeywordTable("y", (("short", ("b",)),)),
+    )
+    assert KeywordMatcher(tables).match("zab") == {"x": "long", "y": "short"}
+
+
+def test_term_in_several_fields():
+    tables = (
+        KeywordTable("a", (("one", ("style",)),)),
+        KeywordTable("b", (("two", ("style",)),)),
+    )
+    assert KeywordMatcher(tables).match("style") == {"a": "one", "b": "two"}
+
+
+def test_trie_regex_matches_exactly_the_terms():
+    terms = ["北歐", "北", "modern", "mode", "a.b"]
+    pattern = re.compile(_trie_regex(terms))
+    for term in terms:
+        assert pattern.fullmatch(term)
+    for other in ("北歐歐", "mod", "axb", ""):
+        assert not pattern.fullmatch(other)
+
+
+def test_empty_tables():
+    assert KeywordMatcher(()).match("anything") == {}
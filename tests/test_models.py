@@ -0,0 +1,124 @@
+"""Tests for designbridge.models.ModelRegistry (plain objects stand in for models)."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from designbridge import models
+from designbridge.models import ModelRegistry
+
+
+def test_get_loads_once_and_caches():
+    registry = ModelRegistry()
+    calls = []
+    loader = lambda: calls.append(1) or object()  # noqa: E731
+
+    first = registry.get("depth", loader)
+    assert registry.get("depth", loader) is first
+    assert len(calls) == 1
+    assert registry.stats()["loads"] == {"depth": 1}
+
+
+def test_loads_of_different_models_never_overlap():
+    registry = ModelRegistry()
+    active, overlaps = [0], []
+
+    def loader():
+        active[0] += 1
+        overlaps.append(active[0])
+        time.sleep(0.05)
+        active[0] -= 1
+        return object()
+
+    # e.g. the warm-up thread loading SDXL while a request loads the depth model
+    threads = [threading.Thread(target=registry.get, args=(name, loader)) for name in ("sdxl", "depth", "seg")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(overlaps) == 1
+    assert sorted(registry.stats()["loads"]) == ["depth", "sdxl", "seg"]
+
+
+def test_nested_load_of_a_dependency():
+    registry = ModelRegistry()
+
+    def controlnet_loader():
+        # Loaders may load their dependencies (the ControlNet pipeline gets the SDXL base)
+        return ("controlnet", registry.get("sdxl", object))
+
+    pipe = registry.get("controlnet", controlnet_loader, depends_on=("sdxl",))
+    assert pipe[1] is registry.peek("sdxl")
+
+
+class _Model:
+    """Stand-in whose size the registry reads through a patched tensor_storage."""
+
+    def __init__(self, nbytes: int) -> None:
+        self.nbytes = nbytes
+
+
+@pytest.fixture
+def sized(monkeypatch):
+    monkeypatch.setattr(models, "tensor_storage", lambda obj: {id(obj): obj.nbytes} if isinstance(obj, _Model) else {})
+    monkeypatch.setattr(models, "_release_memory", lambda: None)
+
+
+def test_budget_evicts_least_recently_used(sized):
+    registry = ModelRegistry(budget_bytes=100)
+    registry.get("a", lambda: _Model(60))
+    registry.get("b", lambda: _Model(60))
+    assert list(registry.residency()) == ["b"]
+    assert registry.stats()["evictions"] == {"a": 1}
+
+
+def test_leased_model_is_not_evicted(sized, capsys):
+    registry = ModelRegistry(budget_bytes=100)
+    with registry.lease("a", lambda: _Model(60)) as a:
+        registry.get("b", lambda: _Model(60))
+        assert registry.peek("a") is a
+        assert registry.residency()["a"]["leases"] == 1
+        assert not registry.evict("a")
+    assert "budget exceeded" in capsys.readouterr().out
+
+    assert registry.residency()["a"]["leases"] == 0
+    registry.get("c", lambda: _Model(60))
+    assert registry.peek("a") is None
+
+
+def test_lease_pins_dependencies(sized):
+    registry = ModelRegistry(budget_bytes=100)
+    registry.get("sdxl", lambda: _Model(50))
+    with registry.lease("controlnet", lambda: _Model(10), depends_on=("sdxl",)):
+        registry.get("depth", lambda: _Model(60))
+        assert registry.peek("sdxl") is not None
+        assert registry.peek("controlnet") is not None
+
+
+def test_offloaded_lease_does_not_offload_running_model(sized, monkeypatch):
+    # Offloading moves weights to CPU; record it instead of touching devices
+    monkeypatch.setattr(models, "_device_of", lambda obj: "cuda")
+    monkeypatch.setattr(models, "_move", lambda obj, device: obj)
+    registry = ModelRegistry(budget_bytes=100, offload="cpu")
+    registry.get("a", lambda: _Model(60))
+    registry.get("b", lambda: _Model(60))  # offloads a
+    assert registry.residency()["a"]["state"] == "offloaded"
+
+    with registry.lease("b", lambda: _Model(60)):
+        # Restoring a must not offload b, which another thread is running
+        registry.get("a", lambda: _Model(60))
+        assert registry.residency()["b"]["state"] == "resident"
+
+
+def test_tensor_storage_counts_int8_packed_weights():
+    torch = pytest.importorskip("torch")
+    from designbridge.precision import apply_precision
+
+    module = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.LayerNorm(64))
+    quantized = apply_precision(module, "int8")
+    # int8 weight + fp32 bias of the Linear, fp32 LayerNorm weight and bias
+    assert sum(models.tensor_storage(quantized).values()) == 64 * 64 + 64 * 4 + 2 * 64 * 4
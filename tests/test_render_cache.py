@@ -0,0 +1,148 @@
+"""Tests for the render result cache in designbridge.nodes (_render_cache_key / _load_cached_render / _store_render)."""
+
+from __future__ import annotations
+
+from unittest import mock
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("torch")
+
+from benchmarks.stubs import install_stubs  # noqa: E402
+from designbridge import nodes  # noqa: E402
+from designbridge.config import Config  # noqa: E402
+
+REQUIREMENT = {"meta": {"room_type": "living_room"}, "style_preferences": {"primary_style": "scandinavian"}}
+
+
+@pytest.fixture(autouse=True)
+def render_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(Config, "ENABLE_RENDER_CACHE", True)
+    monkeypatch.setattr(Config, "RENDER_CACHE_DIR", str(tmp_path / "render_cache"))
+    monkeypatch.setattr(Config, "RENDER_SEED", None)
+    monkeypatch.setattr(Config, "ENABLE_CONTROLNET", False)
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "default")
+    monkeypatch.setattr(Config, "SDXL_STEPS", 10)
+    monkeypatch.setattr(nodes, "_render_cache", None)
+
+
+def _ctx(task_id="t", requirement=REQUIREMENT, depth_path=None, **user):
+    state = {
+        "task_id": task_id,
+        "structured_requirement": requirement,
+        "user_input": {"num_candidates": 2, **user},
+    }
+    if depth_path:
+        state["vision_features"] = {"depth": str(depth_path)}
+    return nodes._prepare_render(state)
+
+
+def _render(ctx, seeds):
+    """Stand-in for a fresh SDXL render: write the candidates and store them."""
+    for i, path in enumerate(ctx["out_paths"]):
+        Image.new("RGB", (8, 8), (i * 40, 0, 0)).save(path)
+    ctx["written_paths"] = ctx["out_paths"]
+    ctx["generation_params"]["seeds"] = seeds
+    nodes._store_render(ctx, "sdxl")
+
+
+def _depth(tmp_path, name, value):
+    path = tmp_path / name
+    Image.new("L", (8, 8), value).save(path)
+    return path
+
+
+def test_miss_then_hit_reports_recorded_seeds():
+    first = _ctx("a")
+    assert not nodes._load_cached_render(first, "sdxl")
+    _render(first, [100, 101])
+    assert first["generation_params"]["cache"] == "miss"
+
+    second = _ctx("b")
+    assert nodes._load_cached_render(second, "sdxl")
+    assert second["generation_params"]["cache"] == "hit"
+    assert second["generation_params"]["seeds"] == [100, 101]
+    assert second["written_paths"] == second["out_paths"]
+    for cached, fresh in zip(second["written_paths"], first["out_paths"]):
+        assert cached.read_bytes() == fresh.read_bytes()
+
+
+def test_disabled_cache_never_hits(monkeypatch):
+    _render(_ctx("a"), [1, 2])
+    monkeypatch.setattr(Config, "ENABLE_RENDER_CACHE", False)
+    assert not nodes._load_cached_render(_ctx("b"), "sdxl")
+
+
+def test_key_ignores_seed_unless_explicit():
+    assert nodes._render_cache_key(_ctx("a"), "sdxl") == nodes._render_cache_key(_ctx("b"), "sdxl")
+    assert nodes._render_cache_key(_ctx(seed=1), "sdxl") != nodes._render_cache_key(_ctx(seed=2), "sdxl")
+    assert nodes._render_cache_key(_ctx(seed=1), "sdxl") != nodes._render_cache_key(_ctx(), "sdxl")
+
+
+def test_key_includes_seed_carried_over_from_preview():
+    assert nodes._render_cache_key(_ctx(), "sdxl") != nodes._render_cache_key(
+        nodes._prepare_render({"task_id": "t", "structured_requirement": REQUIREMENT,
+                               "user_input": {"num_candidates": 2}, "render_preview": {"seed": 7}}),
+        "sdxl",
+    )
+
+
+def test_key_changes_with_prompt():
+    other = {**REQUIREMENT, "style_preferences": {"primary_style": "industrial"}}
+    assert nodes._render_cache_key(_ctx(), "sdxl") != nodes._render_cache_key(_ctx(requirement=other), "sdxl")
+
+
+def test_key_changes_with_steps(monkeypatch):
+    before = nodes._render_cache_key(_ctx(), "sdxl")
+    monkeypatch.setattr(Config, "SDXL_STEPS", 12)
+    assert nodes._render_cache_key(_ctx(), "sdxl") != before
+
+
+def test_key_changes_with_sampler(monkeypatch):
+    monkeypatch.setattr(Config, "SDXL_STEPS", 12)
+    before = nodes._render_cache_key(_ctx(), "sdxl")
+    # Same step count: only the scheduler differs
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "unipc")
+    assert nodes._render_cache_key(_ctx(), "sdxl") != before
+
+
+def test_key_changes_with_controlnet_depth(tmp_path, monkeypatch):
+    dark, light = _depth(tmp_path, "dark.png", 10), _depth(tmp_path, "light.png", 200)
+    copy = _depth(tmp_path, "copy.png", 10)
+    # Without ControlNet the depth map does not affect the render
+    assert nodes._render_cache_key(_ctx(depth_path=dark), "sdxl") == nodes._render_cache_key(_ctx(), "sdxl")
+
+    monkeypatch.setattr(Config, "ENABLE_CONTROLNET", True)
+    key = nodes._render_cache_key(_ctx(depth_path=dark), "sdxl")
+    assert key != nodes._render_cache_key(_ctx(), "sdxl")
+    assert key != nodes._render_cache_key(_ctx(depth_path=light), "sdxl")
+    # Keyed on content, not path
+    assert key == nodes._render_cache_key(_ctx(depth_path=copy), "sdxl")
+
+
+def test_backends_do_not_share_entries():
+    _render(_ctx("a"), [1, 2])
+    assert not nodes._load_cached_render(_ctx("b"), "imagen")
+
+
+def test_render_after_preview_keeps_the_preview_seed(tmp_path):
+    state = {"structured_requirement": REQUIREMENT, "user_input": {"num_candidates": 2, "preview": True}}
+    # Imagen unavailable, so the preview (an SDXL render) runs
+    with install_stubs(artifacts_dir=str(tmp_path / "stubbed"), enable_render_cache=True), \
+            mock.patch.object(Config, "GEMINI_API_KEY", ""):
+        # Warm the cache with an unseeded sample of the same request
+        nodes.renderer({**state, "task_id": "warm"})
+
+        preview = nodes.preview_renderer({**state, "task_id": "a"})["render_preview"]
+        seeds = [preview["seed"], preview["seed"] + 1]
+        first = nodes.renderer({**state, "task_id": "a", "render_preview": preview})
+        again = nodes.renderer({**state, "task_id": "b", "render_preview": preview})
+
+    params = first["render_result"]["generation_params"]
+    assert params["backend"] == "sdxl" and params["cache"] == "miss"
+    assert params["seeds"] == seeds
+    params = again["render_result"]["generation_params"]
+    assert params["cache"] == "hit"
+    assert params["seeds"] == seeds
@@ -0,0 +1,63 @@
+"""Tests for designbridge.render_queue."""
+
+from __future__ import annotations
+
+import threading
+
+from designbridge.render_queue import RenderQueue
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.batches: list[tuple[object, list[dict]]] = []
+        self.release = threading.Event()
+
+    def __call__(self, key, payloads):
+        self.release.wait(5)
+        self.batches.append((key, list(payloads)))
+        return [p["name"] for p in payloads]
+
+
+def _submit_all(q: RenderQueue, jobs):
+    return [q.submit(key, payload) for key, payload in jobs]
+
+
+def test_results_are_routed_to_each_caller():
+    run = _Recorder()
+    run.release.set()
+    q = RenderQueue(run, window_s=0.05, max_batch=4)
+    futures = _submit_all(q, [("sdxl", {"name": f"job{i}"}) for i in range(3)])
+    assert [f.result(5) for f in futures] == ["job0", "job1", "job2"]
+
+
+def test_groups_by_key():
+    run = _Recorder()
+    run.release.set()
+    q = RenderQueue(run, window_s=0.2, max_batch=8)
+    futures = _submit_all(q, [("a", {"name": "a1"}), ("b", {"name": "b1"}), ("a", {"name": "a2"})])
+    for f in futures:
+        f.result(5)
+    assert sorted((key, [p["name"] for p in payloads]) for key, payloads in run.batches) == [
+        ("a", ["a1", "a2"]),
+        ("b", ["b1"]),
+    ]
+
+
+def test_max_batch_counts_weight_not_jobs():
+    run = _Recorder()
+    q = RenderQueue(run, window_s=0.3, max_batch=4, weight=lambda p: p["images"])
+    futures = _submit_all(q, [("sdxl", {"name": f"job{i}", "images": n}) for i, n in enumerate([3, 2, 2, 5])])
+    run.release.set()
+    assert [f.result(5) for f in futures] == ["job0", "job1", "job2", "job3"]
+    # A job that would overflow the cap opens the next batch; an oversized job runs alone
+    assert [[p["images"] for p in payloads] for _, payloads in run.batches] == [[3], [2, 2], [5]]
+
+
+def test_batch_failure_is_raised_to_every_caller():
+    def boom(key, payloads):
+        raise RuntimeError("pipeline crashed")
+
+    q = RenderQueue(boom, window_s=0.05, max_batch=4)
+    futures = _submit_all(q, [("sdxl", {"name": "a"}), ("sdxl", {"name": "b"})])
+    for f in futures:
+        assert isinstance(f.exception(5), RuntimeError)
@@ -0,0 +1,76 @@
+"""Tests for designbridge.requirement_cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from designbridge.requirement_cache import RequirementCache, normalize_prompt
+
+PROMPT = "把客廳改成北歐風格，沙發換成淺灰色布面，牆面保持白色，增加木質收納櫃與暖色燈光"
+VALUE = {"room_type": "living_room", "style": "北歐"}
+
+
+def _cache(**kwargs) -> RequirementCache:
+    cache = RequirementCache(**kwargs)
+    cache.put(PROMPT, 0.6, "img", "gemini", VALUE)
+    return cache
+
+
+def test_normalize_ignores_case_width_and_punctuation():
+    assert normalize_prompt("Modern  客廳，ＯＫ!") == normalize_prompt("modern客廳ok")
+
+
+def test_exact_hit_ignores_punctuation_and_scope_within_bucket():
+    cache = _cache()
+    hit = cache.get(PROMPT.replace("，", " "), 0.65, "img", "gemini")
+    assert hit is not None and hit.match == "exact" and hit.value == VALUE
+
+
+def test_near_match_is_off_by_default():
+    assert _cache().get("請" + PROMPT, 0.6, "img", "gemini") is None
+
+
+def test_near_match_when_enabled():
+    hit = _cache(similarity_threshold=0.8).get("請" + PROMPT + "謝謝", 0.6, "img", "gemini")
+    assert hit is not None and hit.match == "near"
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        PROMPT.replace("北歐", "日式"),
+        PROMPT.replace("淺灰色", "深灰色"),
+        PROMPT.replace("換成", "不換成"),
+        PROMPT.replace("客廳", "臥室"),
+    ],
+)
+def test_near_match_requires_same_keywords(changed):
+    # Each swap stays above the similarity threshold but changes the requirement
+    assert _cache(similarity_threshold=0.8).get(changed, 0.6, "img", "gemini") is None
+
+
+def test_partition_mismatch_misses():
+    cache = _cache(similarity_threshold=0.8)
+    assert cache.get(PROMPT, 0.9, "img", "gemini") is None
+    assert cache.get(PROMPT, 0.6, "other", "gemini") is None
+    assert cache.get(PROMPT, 0.6, "img", "other-model") is None
+
+
+def test_ttl_and_lru_bounds(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("designbridge.requirement_cache.time.time", lambda: now[0])
+    cache = RequirementCache(ttl_s=10, max_entries=2)
+    for prompt in ("客廳", "臥室", "書房"):
+        cache.put(prompt, 0.5, None, "m", {"p": prompt})
+    assert cache.get("客廳", 0.5, None, "m") is None
+    assert cache.get("書房", 0.5, None, "m") is not None
+
+    now[0] += 11
+    assert cache.get("書房", 0.5, None, "m") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_returns_copies():
+    cache = _cache()
+    cache.get(PROMPT, 0.6, "img", "gemini").value["style"] = "mutated"
+    assert cache.get(PROMPT, 0.6, "img", "gemini").value == VALUE
@@ -0,0 +1,95 @@
+"""Tests for designbridge.nodes.analyze_requirements_batch / aanalyze_requirements_batch (Gemini stubbed)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from designbridge import nodes
+from designbridge.config import Config
+from designbridge.nodes import RequirementBatchResult, aanalyze_requirements_batch, analyze_requirements_batch
+
+
+class FakeAnalyzer:
+    """Async stand-in for _acall_gemini_requirement_analyzer that tracks calls in flight."""
+
+    def __init__(self, fail_on=(), delay_s=0.01):
+        self.fail_on = set(fail_on)
+        self.delay_s = delay_s
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, text_prompt, edit_scope, initial_image, api_key):
+        self.calls.append(text_prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_s)
+            if text_prompt in self.fail_on:
+                raise RuntimeError("503 Service Unavailable")
+            return {"meta": {"prompt": text_prompt}}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setattr(Config, "GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(Config, "ENABLE_REQUIREMENT_CACHE", False)
+    monkeypatch.setattr(nodes, "_requirement_cache", None)
+
+    def install(**kwargs):
+        fake = FakeAnalyzer(**kwargs)
+        monkeypatch.setattr(nodes, "_acall_gemini_requirement_analyzer", fake)
+        return fake
+
+    return install
+
+
+def _inputs(*prompts):
+    return [{"text_prompt": p, "edit_scope": 0.5} for p in prompts]
+
+
+def test_results_follow_input_order(analyzer):
+    fake = analyzer()
+    prompts = [f"客廳 {i}" for i in range(6)]
+    batch = analyze_requirements_batch(_inputs(*prompts))
+
+    assert isinstance(batch, RequirementBatchResult)
+    assert [r["meta"]["prompt"] for r in batch.requirements] == prompts
+    assert [s["source"] for s in batch.sources] == ["gemini"] * 6
+    assert sorted(fake.calls) == sorted(prompts)
+
+
+def test_identical_inputs_are_analyzed_once(analyzer):
+    fake = analyzer()
+    batch = analyze_requirements_batch(_inputs("客廳", "臥室", " 客廳 ", "客廳"))
+
+    assert sorted(fake.calls) == ["客廳", "臥室"]
+    assert [r["meta"]["prompt"] for r in batch.requirements] == ["客廳", "臥室", "客廳", "客廳"]
+    # Duplicates are independent copies
+    batch.requirements[0]["meta"]["prompt"] = "mutated"
+    assert batch.requirements[2]["meta"]["prompt"] == "客廳"
+    assert batch.report()["sources"] == {"gemini": 4}
+
+
+@pytest.mark.parametrize("concurrency, config_value, bound", [(None, 3, 3), (2, 8, 2), (0, 8, 8)])
+def test_calls_in_flight_are_bounded(analyzer, monkeypatch, concurrency, config_value, bound):
+    monkeypatch.setattr(Config, "REQUIREMENT_BATCH_CONCURRENCY", config_value)
+    fake = analyzer(delay_s=0.02)
+    analyze_requirements_batch(_inputs(*(f"p{i}" for i in range(12))), concurrency=concurrency)
+
+    assert len(fake.calls) == 12
+    assert fake.max_in_flight == bound
+
+
+def test_failed_item_falls_back_to_rule_based(analyzer):
+    analyzer(fail_on={"把客廳改成北歐風格"})
+    batch = asyncio.run(aanalyze_requirements_batch(_inputs("臥室", "把客廳改成北歐風格", "書房")))
+
+    assert [s["source"] for s in batch.sources] == ["gemini", "rule_based", "gemini"]
+    assert "503" in batch.sources[1]["reason"]
+    assert batch.requirements[1] == nodes._rule_based_requirement_analyzer("把客廳改成北歐風格", 0.5)
+    assert batch.report()["sources"] == {"gemini": 2, "rule_based": 1}
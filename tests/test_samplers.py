@@ -0,0 +1,51 @@
+"""Tests for designbridge.samplers."""
+
+from __future__ import annotations
+
+import pytest
+
+from designbridge import samplers
+from designbridge.config import Config
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(samplers, "_warned", set())
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "default")
+    monkeypatch.setattr(Config, "SDXL_SCHEDULER", None)
+    monkeypatch.setattr(Config, "SDXL_GUIDANCE_SCALE", None)
+    monkeypatch.setattr(Config, "SDXL_LORA", None)
+
+
+def test_scheduler_override_applies(monkeypatch):
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "unipc")
+    monkeypatch.setattr(Config, "SDXL_SCHEDULER", "ddim")
+    profile = samplers.resolve_sampler()
+    assert profile.scheduler == "ddim"
+    assert profile.steps == 12
+
+
+def test_unknown_scheduler_keeps_preset_and_warns_once(monkeypatch, capsys):
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "unipc")
+    monkeypatch.setattr(Config, "SDXL_SCHEDULER", "dpm++")
+    profiles = [samplers.resolve_sampler() for _ in range(3)]
+
+    assert all(p.scheduler == "unipc" for p in profiles)
+    assert capsys.readouterr().out.count("Unknown SDXL scheduler") == 1
+
+
+def test_unknown_preset_warns_once(monkeypatch, capsys):
+    monkeypatch.setattr(Config, "SDXL_SAMPLER", "fastest")
+    assert samplers.resolve_sampler() == samplers.PRESETS["default"]
+    samplers.resolve_sampler()
+    assert capsys.readouterr().out.count("Unknown SDXL sampler") == 1
+
+
+def test_configure_pipeline_keeps_scheduler_when_unknown():
+    class Pipe:
+        scheduler = object()
+
+    pipe = Pipe()
+    original = pipe.scheduler
+    samplers.configure_pipeline(pipe, samplers.SamplerProfile("custom", scheduler="nope"))
+    assert pipe.scheduler is original
@@ -0,0 +1,96 @@
+"""Tests for designbridge.uploads."""
+
+from __future__ import annotations
+
+from PIL import Image
+
+from designbridge.uploads import UploadRegistry, prepare_image
+
+
+def _image(tmp_path, name="room.png", size=(64, 48), color=(10, 20, 30)):
+    path = tmp_path / name
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+class _Uploader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *, path, mime_type):
+        self.calls.append((path, mime_type))
+        return object()
+
+
+def _registry(**kwargs) -> UploadRegistry:
+    return UploadRegistry(**{"ttl_s": 3600, "max_side": 0, "max_kb": 0, **kwargs})
+
+
+def test_prepare_passes_small_images_through(tmp_path):
+    path = _image(tmp_path)
+    prepared = prepare_image(path, max_side=128, max_kb=0)
+    assert not prepared.resized
+    assert prepared.data == path.read_bytes()
+    assert prepared.mime_type == "image/png"
+
+
+def test_prepare_downscales_large_images_to_jpeg(tmp_path):
+    prepared = prepare_image(_image(tmp_path, size=(400, 200)), max_side=100, max_kb=0)
+    assert prepared.resized
+    assert prepared.size == (100, 50)
+    assert prepared.mime_type == "image/jpeg"
+
+
+def test_upload_reuses_handle_per_content_and_namespace(tmp_path):
+    registry, uploader = _registry(), _Uploader()
+    a = _image(tmp_path, "a.png")
+    copy = _image(tmp_path, "copy.png")
+
+    first = registry.upload(a, uploader, namespace="key1")
+    assert registry.upload(copy, uploader, namespace="key1") is first
+    assert registry.upload(a, uploader, namespace="key2") is not first
+    assert len(uploader.calls) == 2
+    assert registry.stats()["reused"] == 1
+
+
+def test_expired_handles_are_pruned_on_insert(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("designbridge.uploads.time.time", lambda: now[0])
+    registry, uploader = _registry(ttl_s=10), _Uploader()
+    registry.upload(_image(tmp_path, "a.png", color=(1, 1, 1)), uploader)
+
+    now[0] += 11
+    registry.upload(_image(tmp_path, "b.png", color=(2, 2, 2)), uploader)
+
+    assert registry.stats()["handles"] == 1
+
+
+def test_handles_are_capped_lru(tmp_path):
+    registry, uploader = _registry(max_handles=2), _Uploader()
+    paths = [_image(tmp_path, f"{i}.png", color=(i, i, i)) for i in range(3)]
+    registry.upload(paths[0], uploader)
+    registry.upload(paths[1], uploader)
+    registry.upload(paths[0], uploader)  # touch: paths[1] is now least recently used
+    registry.upload(paths[2], uploader)
+
+    assert registry.stats()["handles"] == 2
+    registry.upload(paths[0], uploader)
+    assert len(uploader.calls) == 3
+    registry.upload(paths[1], uploader)
+    assert len(uploader.calls) == 4
+
+
+def test_key_locks_do_not_accumulate(tmp_path):
+    registry, uploader = _registry(), _Uploader()
+    for i in range(5):
+        registry.upload(_image(tmp_path, f"{i}.png", color=(i, 0, 0)), uploader)
+    assert registry._key_locks == {}
+
+
+def test_forget_forces_reupload(tmp_path):
+    registry, uploader = _registry(), _Uploader()
+    path = _image(tmp_path)
+    handle = registry.upload(path, uploader)
+    registry.forget(handle)
+    assert registry.upload(path, uploader) is not handle
+    assert len(uploader.calls) == 2
@@ -0,0 +1,112 @@
+"""Tests for designbridge.vision with the tiny random-weight models from benchmarks/stubs.py."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from benchmarks.stubs import leased, tiny_depth_model, tiny_upernet  # noqa: E402
+from designbridge import vision  # noqa: E402
+
+
+@pytest.fixture
+def tiny_models(monkeypatch):
+    monkeypatch.setattr(vision, "_load_depth_model", lambda name: tiny_depth_model())
+    monkeypatch.setattr(vision, "_load_upernet", lambda name: tiny_upernet())
+    monkeypatch.setattr(vision, "_lease_depth_model", lambda name: leased(tiny_depth_model()))
+    monkeypatch.setattr(vision, "_lease_upernet", lambda name: leased(tiny_upernet()))
+
+
+def _room(tmp_path, size=(96, 72)):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "room.png"
+    Image.fromarray(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)).save(path)
+    return str(path)
+
+
+def _preprocess(image_path, root, *, concurrent):
+    return vision.run_visual_preprocessing(
+        image_path,
+        task_id="t",
+        enable_depth=True,
+        enable_segmentation=True,
+        depth_model="depth",
+        segmentation_model="seg",
+        artifacts_root=root,
+        concurrent=concurrent,
+    )
+
+
+def test_concurrent_matches_sequential(tmp_path, tiny_models):
+    image_path = _room(tmp_path)
+    sequential = _preprocess(image_path, tmp_path / "seq", concurrent=False)
+    concurrent = _preprocess(image_path, tmp_path / "par", concurrent=True)
+
+    for attr in ("depth_path", "segmentation_path"):
+        a = np.asarray(Image.open(getattr(sequential, attr)))
+        b = np.asarray(Image.open(getattr(concurrent, attr)))
+        assert a.shape == b.shape == (72, 96)
+        assert np.array_equal(a, b)
+    meta_a = json.loads(open(sequential.segmentation_meta_path, encoding="utf-8").read())
+    meta_b = json.loads(open(concurrent.segmentation_meta_path, encoding="utf-8").read())
+    assert meta_a["present_labels"] == meta_b["present_labels"]
+
+
+@pytest.mark.parametrize("src, size", [((16, 16), (70, 53)), ((7, 5), (64, 64)), ((32, 24), (32, 24)), ((20, 20), (9, 13))])
+def test_label_upsample_matches_torch_nearest(src, size):
+    import torch
+    import torch.nn.functional as F
+
+    logits = torch.randn(1, 12, *src, generator=torch.Generator().manual_seed(0))
+    labels = logits[0].argmax(dim=0)
+    expected = F.interpolate(labels[None, None].float(), size=size[::-1], mode="nearest")[0, 0].long().numpy()
+
+    assert np.array_equal(vision._upsample_labels_nearest(labels.numpy(), size), expected)
+
+
+def test_auto_upsample_switches_on_logits_footprint(monkeypatch):
+    monkeypatch.setattr(vision, "AUTO_LOGITS_MAX_BYTES", 150 * 100 * 100 * 4)
+    assert vision._resolve_upsample_mode("auto", 150, (100, 100)) == "logits"  # exactly at the limit
+    assert vision._resolve_upsample_mode("auto", 150, (101, 100)) == "labels"
+    assert vision._resolve_upsample_mode("logits", 150, (4000, 3000)) == "logits"
+    assert vision._resolve_upsample_mode("labels", 150, (10, 10)) == "labels"
+
+
+def test_segmentation_stats_report_resolved_mode(tmp_path, tiny_models, monkeypatch):
+    monkeypatch.setattr(vision, "AUTO_LOGITS_MAX_BYTES", 0)
+    image = Image.open(_room(tmp_path)).convert("RGB")
+    results, id2label = vision._infer_segmentation([image], model_name="seg", upsample="auto")
+    seg, stats = results[0]
+    assert stats["upsample"] == "labels"
+    assert seg.shape == (72, 96) and seg.dtype == np.uint16
+    assert len(id2label) == 150
+
+
+def test_upsample_mode_is_part_of_the_cache_key(tmp_path, tiny_models):
+    from designbridge.cache import ArtifactCache
+
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1 << 26)
+    image_path = _room(tmp_path)
+
+    def run(task_id, upsample):
+        return vision.run_visual_preprocessing(
+            image_path,
+            task_id=task_id,
+            enable_depth=True,
+            enable_segmentation=True,
+            depth_model="depth",
+            segmentation_model="seg",
+            artifacts_root=tmp_path / "artifacts",
+            cache=cache,
+            segmentation_upsample=upsample,
+        ).cache_status
+
+    assert run("a", "labels") == {"depth": "miss", "segmentation": "miss"}
+    assert run("b", "logits") == {"depth": "hit", "segmentation": "miss"}
+    assert run("c", "labels") == {"depth": "hit", "segmentation": "hit"}
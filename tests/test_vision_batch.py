@@ -0,0 +1,92 @@
+"""Tests for designbridge.vision.run_visual_preprocessing_batch (models replaced by fakes)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from designbridge import vision
+
+
+def _images(tmp_path, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"room_{i}.png"
+        Image.new("RGB", size, (i * 20, 80, 120)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    """Fake inference that records the batches it sees and how many images were decoded at once."""
+    seen = {"depth": [], "segmentation": [], "live": 0, "max_live": 0}
+
+    class Decoded:
+        def __init__(self, path):
+            with Image.open(path) as img:
+                self.size = img.size
+            seen["live"] += 1
+            seen["max_live"] = max(seen["max_live"], seen["live"])
+
+        def __del__(self):
+            seen["live"] -= 1
+
+    def infer_depth(images, *, model_name):
+        seen["depth"].append(len(images))
+        return [np.zeros(img.size[::-1], dtype=np.uint8) for img in images]
+
+    def infer_segmentation(images, *, model_name, upsample):
+        seen["segmentation"].append(len(images))
+        return [(np.zeros(img.size[::-1], dtype=np.uint16), {"upsample": "labels"}) for img in images], {0: "wall"}
+
+    def save_segmentation(seg, *, model_name, out_dir, id2label, stats=None):
+        vision.ensure_dir(out_dir)
+        seg_out, meta_out = out_dir / "segmentation.png", out_dir / "segmentation_meta.json"
+        seg_out.write_bytes(b"seg")
+        meta_out.write_text("{}", encoding="utf-8")
+        return seg_out, meta_out
+
+    monkeypatch.setattr(vision, "load_image", Decoded)
+    monkeypatch.setattr(vision, "_infer_depth", infer_depth)
+    monkeypatch.setattr(vision, "_infer_segmentation", infer_segmentation)
+    monkeypatch.setattr(vision, "_save_segmentation", save_segmentation)
+    return seen
+
+
+def _run(paths, task_ids, tmp_path, batch_size=2):
+    return vision.run_visual_preprocessing_batch(
+        list(zip(paths, task_ids)),
+        enable_depth=True,
+        enable_segmentation=True,
+        depth_model="depth",
+        segmentation_model="seg",
+        artifacts_root=tmp_path / "artifacts",
+        batch_size=batch_size,
+    )
+
+
+def test_batches_by_resolution_and_keeps_input_order(tmp_path, fake_models):
+    paths = _images(tmp_path, [(32, 24), (24, 32), (32, 24), (32, 24)])
+    results = _run(paths, ["t0", "t1", "t2", "t3"], tmp_path)
+
+    assert sorted(fake_models["depth"]) == [1, 1, 2]
+    assert fake_models["segmentation"] == fake_models["depth"]
+    assert [r.depth_path for r in results] == [
+        str(tmp_path / "artifacts" / "vision" / f"t{i}" / "depth.png") for i in range(4)
+    ]
+
+
+def test_decodes_one_batch_at_a_time(tmp_path, fake_models):
+    paths = _images(tmp_path, [(32, 24)] * 7)
+    _run(paths, [f"t{i}" for i in range(7)], tmp_path, batch_size=2)
+
+    assert fake_models["max_live"] <= 2
+    assert fake_models["live"] == 0
+
+
+def test_rejects_duplicate_task_ids(tmp_path, fake_models):
+    paths = _images(tmp_path, [(32, 24), (32, 24)])
+    with pytest.raises(ValueError, match="Duplicate task_id"):
+        _run(paths, ["same", "same"], tmp_path)